@@ -4,52 +4,12 @@ PRO уровень - продвинутые действия с телепорт
 import logging
 from core.keygen import PERMISSION_PRO, PERMISSION_DEV
 from config.constants import (
-    DUNGEON_POINTS, 
     LONG_LEFT_POINT, 
     LONG_RIGHT_POINT, 
     EXIT_POINT,
     MAIN_POINT
 )
 
-def get_point_type(point_name: str) -> str:
-    """
-    Определить тип точки по имени
-    
-    Args:
-        point_name: название точки
-    
-    Returns:
-        "FROST", "QB" или None
-    """
-    if "FROST" in point_name:
-        return "FROST"
-    elif "QB" in point_name:
-        return "QB"
-    return None
-
-
-def can_use_point(point_name: str, permission_level: str) -> bool:
-    """
-    Проверить доступность точки для уровня доступа
-    
-    Args:
-        point_name: название точки
-        permission_level: "try", "pro", "dev"
-    
-    Returns:
-        bool: True если точка доступна
-    """
-    point_type = get_point_type(point_name)
-    
-    if permission_level == "dev":
-        return True  # DEV видит ВСЕ точки
-    elif permission_level == "pro":
-        return point_type in "FROST"  # PRO только FROST
-    elif permission_level == "try":
-        return False  # TRY не видит точки
-    
-    return False
-
 
 def register_pro_actions(action_manager, multibox_manager, app_state, action_limiter):
     """
@@ -109,7 +69,7 @@ def register_pro_actions(action_manager, multibox_manager, app_state, action_lim
         active_char = app_state.last_active_character
         
         if not active_char:
-            print("\n[NEXT >>] Нет активного окна")
+            logging.info("[NEXT >>] Нет активного окна")
             return
         
         # Обновляем координаты активного персонажа
@@ -120,81 +80,74 @@ def register_pro_actions(action_manager, multibox_manager, app_state, action_lim
         char_z = active_char.char_base.char_pos_z
         
         if char_x is None or char_y is None:
-            print("\n[NEXT >>] Не удалось прочитать координаты")
+            logging.info("[NEXT >>] Не удалось прочитать координаты")
             return
         
         # Получаем уровень доступа
         permission = app_state.permission_level
         
-        # Проверяем все точки
-        for point in DUNGEON_POINTS:
-            # Проверяем доступность точки по permission
-            if not can_use_point(point['name'], permission):
-                continue
-            
+        # Ищем триггер-зону в индексе (точки уже отфильтрованы по permission)
+        point = multibox_manager.point_index.find(char_x, char_y, permission)
+        
+        if point:
             trigger_x, trigger_y = point['trigger']
-            radius = point.get('radius', 15.0)
-            count_in_limits = point.get('count_in_limits', True)
+            radius = point['radius']
+            count_in_limits = point['count_in_limits']
             
-            # Дистанция до триггера (только X и Y)
-            dx = abs(char_x - trigger_x)
-            dy = abs(char_y - trigger_y)
+            # НАШЛИ ТРИГГЕР-ЗОНУ!
+            logging.info(f"[NEXT >>] В триггер-зоне точки: {point['name']}")
+            logging.info(f"  Текущие координаты: X={char_x:.1f}, Y={char_y:.1f}, Z={char_z:.1f}")
+            logging.info(f"  Триггер: X={trigger_x}, Y={trigger_y}, радиус={radius}")
             
-            if dx <= radius and dy <= radius:
-                # НАШЛИ ТРИГГЕР-ЗОНУ!
-                print(f"\n[NEXT >>] В триггер-зоне точки: {point['name']}")
-                print(f"  Текущие координаты: X={char_x:.1f}, Y={char_y:.1f}, Z={char_z:.1f}")
-                print(f"  Триггер: X={trigger_x}, Y={trigger_y}, радиус={radius}")
-                
-                # Определяем тип точки
-                point_type = get_point_type(point['name'])
-                
-                if not point_type:
-                    print(f"\n[NEXT >>] Неизвестный тип точки: {point['name']}")
-                    print(f"  Текущие координаты: X={char_x:.1f}, Y={char_y:.1f}, Z={char_z:.1f}")
-                    return
-                
-                # ПРОВЕРКА ЛИМИТА для данного типа
-                if count_in_limits and not action_limiter.can_use(point_type):
-                    print(f"\n[NEXT >>] ⛔ Лимит {point_type} достигнут")
-                    return
-                
-                target_x, target_y, target_z = point['target']
-                
-                print(f"  Целевые координаты: X={target_x}, Y={target_y}, Z={target_z}")
-                
-                # СОХРАНЯЕМ ТОЧКУ ДЛЯ REDO
-                multibox_manager.last_teleport_destination = (target_x, target_y, target_z)
-                
-                # Получаем группу (всегда работаем с группой, даже если она из 1 человека)
-                _, group = multibox_manager.get_leader_and_group()
-                
-                if not group:
-                    print(f"\n[NEXT >>] Нет группы")
-                    return
-                
-                # ГРУППОВОЙ ТЕЛЕПОРТ
-                success_count = multibox_manager.teleport_group(
-                    group,
-                    target_x,
-                    target_y,
-                    target_z,
-                    send_space=True
-                )
-                
-                if success_count > 0:
-                    print(f"\n[NEXT >>] {point['name']}: телепортировано {success_count} персонажей\n")
-                    
-                    # Записываем использование по типу точки
-                    if count_in_limits:
-                        action_limiter.record_usage(point_type)
-                else:
-                    print(f"\n[NEXT >>] {point['name']}: никто не был телепортирован\n")
-                
+            # Тип точки посчитан при построении индекса
+            point_type = point['type']
+            
+            if not point_type:
+                logging.info(f"[NEXT >>] Неизвестный тип точки: {point['name']}")
+                logging.info(f"  Текущие координаты: X={char_x:.1f}, Y={char_y:.1f}, Z={char_z:.1f}")
                 return
+            
+            # ПРОВЕРКА ЛИМИТА для данного типа
+            if count_in_limits and not action_limiter.can_use(point_type):
+                logging.info(f"[NEXT >>] ⛔ Лимит {point_type} достигнут")
+                return
+            
+            target_x, target_y, target_z = point['target']
+            
+            logging.info(f"  Целевые координаты: X={target_x}, Y={target_y}, Z={target_z}")
+            
+            # СОХРАНЯЕМ ТОЧКУ ДЛЯ REDO
+            multibox_manager.last_teleport_destination = (target_x, target_y, target_z)
+            
+            # Получаем группу (всегда работаем с группой, даже если она из 1 человека)
+            _, group = multibox_manager.get_leader_and_group()
+            
+            if not group:
+                logging.info(f"[NEXT >>] Нет группы")
+                return
+            
+            # ГРУППОВОЙ ТЕЛЕПОРТ
+            success_count = multibox_manager.teleport_group(
+                group,
+                target_x,
+                target_y,
+                target_z,
+                send_space=True
+            )
+            
+            if success_count > 0:
+                logging.info(f"[NEXT >>] {point['name']}: телепортировано {success_count} персонажей")
+                
+                # Записываем использование по типу точки
+                if count_in_limits:
+                    action_limiter.record_usage(point_type)
+            else:
+                logging.info(f"[NEXT >>] {point['name']}: никто не был телепортирован")
+            
+            return
         
-        print(f"\n[NEXT >>] Не в триггере ни одной точки")
-        print(f"  Текущие координаты: X={char_x:.1f}, Y={char_y:.1f}, Z={char_z:.1f}\n")
+        logging.info(f"[NEXT >>] Не в триггере ни одной точки")
+        logging.info(f"  Текущие координаты: X={char_x:.1f}, Y={char_y:.1f}, Z={char_z:.1f}")
     
     action_manager.register(
         'tp_next',
@@ -252,7 +205,7 @@ def register_pro_actions(action_manager, multibox_manager, app_state, action_lim
     def action_redo():
         """Телепортировать на последнюю сохраненную точку из NEXT (НЕ расходует лимиты)"""
         if not multibox_manager.last_teleport_destination:
-            print("\n[REDO >>] Нет сохраненной точки для REDO телепорта\n")
+            logging.info("[REDO >>] Нет сохраненной точки для REDO телепорта")
             return
         
         target_x, target_y, target_z = multibox_manager.last_teleport_destination
@@ -261,7 +214,7 @@ def register_pro_actions(action_manager, multibox_manager, app_state, action_lim
         _, group = multibox_manager.get_leader_and_group()
         
         if not group:
-            print(f"\n[REDO >>] Нет группы")
+            logging.info(f"[REDO >>] Нет группы")
             return
         
         # ГРУППОВОЙ ТЕЛЕПОРТ (НЕ ЗАПИСЫВАЕМ ЛИМИТЫ!)
@@ -274,9 +227,9 @@ def register_pro_actions(action_manager, multibox_manager, app_state, action_lim
         )
         
         if success_count > 0:
-            print(f"\n[REDO >>] Телепортировано {success_count} персонажей\n")
+            logging.info(f"[REDO >>] Телепортировано {success_count} персонажей")
         else:
-            print(f"\n[REDO >>] Никто не был телепортирован\n")
+            logging.info(f"[REDO >>] Никто не был телепортирован")
     
     action_manager.register(
         'tp_redo',
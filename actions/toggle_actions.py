@@ -22,11 +22,11 @@ def register_toggle_actions(action_manager, multibox_manager, ahk_manager, app_s
         is_active = app_state.is_action_active('follow')
         
         if is_active:
-            print("Follow: STARTED")
+            logging.info("Follow: STARTED")
             multibox_manager.start_follow_freeze()
             main_window._start_action_loop('follow', lambda: follow_loop_callback(multibox_manager, ahk_manager))
         else:
-            print("Follow: STOPPED")
+            logging.info("Follow: STOPPED")
             main_window._stop_action_loop('follow')
             multibox_manager.stop_follow_freeze()
     
@@ -33,13 +33,13 @@ def register_try_actions(action_manager, ahk_manager, app_state, multibox_manage
     # === follow_leader ===
     def ahk_follow_leader():
         """ПКМ + Ассист + ПКМ + Follow для членов группы (БЕЗ лидера)"""
-        logging.info("🎯 ahk_follow_leader called")
+        logging.debug("🎯 ahk_follow_leader called")
         
         # Получаем лидера и группу
         leader, group = multibox_manager.get_leader_and_group()
         
-        logging.info(f"   Leader: {leader.char_base.char_name if leader else None}")
-        logging.info(f"   Group size: {len(group) if group else 0}")
+        logging.debug("   Leader: %s, group size: %d",
+                      leader.char_base.char_name if leader else None, len(group) if group else 0)
         
         if not leader or not group:
             logging.warning("⚠️ No leader or group!")
@@ -61,7 +61,7 @@ def register_try_actions(action_manager, ahk_manager, app_state, multibox_manage
             logging.warning("⚠️ No party_leader_id!")
             return
         
-        logging.info(f"   Party leader ID: {party_leader_id}")
+        logging.debug("   Party leader ID: %s", party_leader_id)
         
         # Фильтруем: исключаем реального лидера + тех у кого нет группы
         target_pids = []
@@ -74,19 +74,18 @@ def register_try_actions(action_manager, ahk_manager, app_state, multibox_manage
             member_party_ptr = resolve_offset(member.memory, OFFSETS["party_ptr"], member.char_base.cache)
             
             if not member_party_ptr or member_party_ptr == 0:
-                logging.info(f"   {member.char_base.char_name}: skipped (no party)")
+                logging.debug("   %s: skipped (no party)", member.char_base.char_name)
                 continue
             
             # Проверяем кто лидер
             if member.char_base.char_id == party_leader_id:
                 real_leader_pid = member.pid
-                logging.info(f"   {member.char_base.char_name}: REAL LEADER (excluded)")
+                logging.debug("   %s: REAL LEADER (excluded)", member.char_base.char_name)
             else:
                 target_pids.append(member.pid)
-                logging.info(f"   {member.char_base.char_name}: added to targets")
+                logging.debug("   %s: added to targets", member.char_base.char_name)
         
-        logging.info(f"   Real leader PID: {real_leader_pid}")
-        logging.info(f"   Target PIDs: {target_pids}")
+        logging.debug("   Real leader PID: %s, target PIDs: %s", real_leader_pid, target_pids)
         
         if target_pids:
             ahk_manager.follow_leader(target_pids=target_pids)
@@ -6,16 +6,45 @@ import configparser
 import time  # ← ДОБАВЬ
 from pathlib import Path
 from typing import List, Optional
-from ahk import AHK
-from ahk.directives import NoTrayIcon
 import sys
+import threading
+
+from core.metrics import metrics
 
 
 class AHKManager:
     """Управление окнами через Python AHK API"""
     
-    def __init__(self):
-        """Инициализация менеджера"""
+    def __init__(self, start_engine: bool = True):
+        """
+        Инициализация менеджера
+        
+        Args:
+            start_engine: сразу запустить движок AHK (False - позже через start(),
+                          до этого окна не находятся и действия ничего не делают)
+        """
+        self.ahk = None
+        self.ready = threading.Event()
+        
+        # Загружаем координаты
+        self.coords = self._load_coordinates()
+        
+        # Кеш окон
+        self.windows = []
+        self.pid_to_hwnd = {}
+        self.pid_to_window = {}
+        
+        if start_engine:
+            self.start()
+    
+    def start(self):
+        """Запустить движок AHK и найти окна"""
+        if self.ahk is not None:
+            return
+        
+        from ahk import AHK
+        from ahk.directives import NoTrayIcon
+        
         # НОВОЕ: Определяем путь к AutoHotkey.exe
         if getattr(sys, 'frozen', False):
             # Режим EXE - AutoHotkey.exe упакован в _internal
@@ -39,14 +68,8 @@ class AHKManager:
             version='v1'
         )
         
-        # Загружаем координаты
-        self.coords = self._load_coordinates()
-        
-        # Кеш окон
-        self.windows = []
-        self.pid_to_hwnd = {}
-        
         self.refresh_windows()
+        self.ready.set()
         
         logging.info("✅ AHK Manager initialized")
     
@@ -88,27 +111,32 @@ class AHKManager:
         with open(settings_file, 'w', encoding='utf-8') as f:
             config.write(f)
     
+    @metrics.timed('ahk.refresh_windows')
     def refresh_windows(self):
         """Обновить список окон и кеш PID→HWND"""
+        if self.ahk is None:
+            return
+        
         self.windows = self.ahk.find_windows(title='Asgard Perfect World')
         self.pid_to_hwnd.clear()
+        self.pid_to_window.clear()
         
         for window in self.windows:
             try:
                 pid = window.get_pid()
                 hwnd = window.id
                 self.pid_to_hwnd[pid] = hwnd
-                logging.debug(f"   Cached: PID={pid} → HWND={hwnd}")
+                self.pid_to_window[pid] = window
+                logging.debug("   Cached: PID=%s → HWND=%s", pid, hwnd)
             except Exception as e:
                 logging.error(f"   Failed to cache window: {e}")
                 continue
         
-        logging.info(f"🔄 Found {len(self.windows)} windows, cached {len(self.pid_to_hwnd)} PIDs")
+        logging.debug("🔄 Found %d windows, cached %d PIDs", len(self.windows), len(self.pid_to_hwnd))
     
     def _get_windows_by_pids(self, target_pids: List[int]):
         """Получить Window объекты по списку PIDs"""
-        logging.info(f"🔍 Getting windows for PIDs: {target_pids}")
-        logging.info(f"   Cache has: {list(self.pid_to_hwnd.keys())}")
+        logging.debug("🔍 Getting windows for PIDs: %s (cached: %s)", target_pids, list(self.pid_to_hwnd.keys()))
         
         filtered = []
         
@@ -118,16 +146,19 @@ class AHKManager:
                 
                 if pid in target_pids:
                     filtered.append(window)
-                    logging.info(f"   ✓ Found: PID={pid}, HWND={window.id}")
             except Exception as e:
-                logging.error(f"   ✗ Failed to get PID: {e}")
+                logging.error("   ✗ Failed to get PID: %s", e)
                 continue
         
-        logging.info(f"✅ Filtered: {len(filtered)}/{len(target_pids)} windows")
+        logging.debug("✅ Filtered: %d/%d windows", len(filtered), len(target_pids))
         return filtered
     
+    @metrics.timed('ahk.click_at_mouse')
     def click_at_mouse(self, target_pids: Optional[List[int]] = None) -> bool:
         """Клик ЛКМ по позиции курсора"""
+        if self.ahk is None:
+            return False
+        
         try:
             self.refresh_windows()
             
@@ -147,6 +178,7 @@ class AHKManager:
             logging.error(f"❌ click_at_mouse failed: {e}")
             return False
     
+    @metrics.timed('ahk.send_key')
     def send_key(self, key: str = 'space', target_pids: Optional[List[int]] = None) -> bool:
         """Отправить клавишу"""
         try:
@@ -166,9 +198,34 @@ class AHKManager:
             logging.error(f"❌ send_key failed: {e}")
             return False
     
+    def get_window(self, pid: int):
+        """Окно из кеша по PID (без обращения к AHK), None если не найдено"""
+        return self.pid_to_window.get(pid)
+    
+    @metrics.timed('ahk.send_key_to_windows')
+    def send_key_to_windows(self, key: str, windows) -> list:
+        """
+        Отправить клавишу в уже известные окна (быстрый путь телепорта, БЕЗ refresh)
+        
+        Окно, которое не ответило, пропускается - остальные получают клавишу.
+        
+        Returns:
+            list: окна, в которые отправить не удалось (кеш устарел); [] - все ок
+        """
+        failed = []
+        for window in windows:
+            try:
+                window.click(x=115, y=75, button='L')
+                window.send(f'{{{key}}}')
+            except Exception as e:
+                logging.warning(f"⚠️ send_key_to_windows failed, cache stale: {e}")
+                failed.append(window)
+        return failed
+    
+    @metrics.timed('ahk.follow_leader')
     def follow_leader(self, target_pids: Optional[List[int]] = None) -> bool:
         """Follow Leader (ПКМ→Ассист→ПКМ→Follow)"""
-        logging.info(f"👣 follow_leader called with target_pids={target_pids}")
+        logging.debug("👣 follow_leader called with target_pids=%s", target_pids)
         
         try:
             if not target_pids:
@@ -183,7 +240,7 @@ class AHKManager:
                 logging.warning("⚠️ No windows after filtering!")
                 return False
             
-            logging.info(f"✅ Will execute follow for {len(windows)} windows")
+            logging.debug("✅ Will execute follow for %d windows", len(windows))
             
             leader_x = self.coords.get('leader_x', 411)
             leader_y = self.coords.get('leader_y', 666)
@@ -193,14 +250,12 @@ class AHKManager:
             
             for window in windows:
                 # window.click(x=115, y=75, button='L')
-                pid = window.get_pid()
-                logging.info(f"   Executing follow for PID={pid}, HWND={window.id}")
                 window.click(x=leader_x, y=leader_y, button='R')
                 window.click(x=offset_x, y=assist_y, button='L')
                 window.click(x=leader_x, y=leader_y, button='R')
                 window.click(x=offset_x, y=follow_y, button='L')
             
-            logging.info("✅ Follow sequence completed!")
+            logging.debug("✅ Follow sequence completed!")
             return True
         except Exception as e:
             logging.error(f"❌ follow_leader failed: {e}", exc_info=True)
@@ -209,6 +264,7 @@ class AHKManager:
     def stop(self):
         """Остановить менеджер"""
         self.pid_to_hwnd.clear()
+        self.pid_to_window.clear()
         self.windows.clear()
         logging.info("🛑 AHK Manager stopped")
     
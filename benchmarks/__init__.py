@@ -0,0 +1,19 @@
+"""
+Бенчмарки горячих путей на симулированных клиентах (любая ОС)
+
+    python -m benchmarks                          - все наборы
+    python -m benchmarks offsets characters       - выбранные
+    python -m benchmarks -o out.json              - записать JSON
+    python -m benchmarks --save-baseline base.json
+    python -m benchmarks -b base.json             - сравнить с базой (код 1 при регрессии)
+
+Наборы: offsets (resolve_offset), memory (цена вызова Memory),
+characters (CharBase, MultiboxManager, телепорт), core (HotkeyManager, ActionLimiter),
+modules (подключение клиентов через реестр сборок), point_index (поиск триггер-зон),
+log_pipeline (цена logging.info), action_limiter (старт журнала лимитов),
+config_fetch (загрузка конфигов), hwid (пробы и кеш HWID), control_api (API управления),
+workers (опрос в рабочих процессах), state_ring (кадры состояния в shared memory).
+"""
+from benchmarks.runner import benchmark, measure, run
+
+__all__ = ['benchmark', 'measure', 'run']
@@ -0,0 +1,27 @@
+"""
+python -m benchmarks [наборы...] [--output results.json] [--baseline base.json]
+"""
+import argparse
+import sys
+
+from benchmarks.runner import DEFAULT_THRESHOLD, run
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("names", nargs="*", help="наборы (по умолчанию все)")
+    parser.add_argument("--output", "-o", metavar="FILE", help="записать результаты в JSON")
+    parser.add_argument("--baseline", "-b", metavar="FILE", help="сравнить с сохраненной базой")
+    parser.add_argument("--save-baseline", metavar="FILE", help="сохранить прогон как базу")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="порог регрессии (доля, по умолчанию %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    return run(args.names, args.output, args.baseline, args.threshold, args.save_baseline)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
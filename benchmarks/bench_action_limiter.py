@@ -0,0 +1,68 @@
+"""
+Старт ActionLimiter на синтетической истории: старый JSON-массив, журнал
+от контрольной точки, теплый старт по сводке и полная проверка цепочки
+"""
+import json
+import time
+from datetime import datetime, timedelta
+
+from benchmarks import fixtures
+from benchmarks.runner import benchmark
+
+HISTORY_SIZES = (1000, 10000, 100000)
+
+
+def _elapsed_ms(func):
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+@benchmark('action_limiter')
+def bench_action_limiter(results):
+    from core.action_limiter import MSK, ActionLimiter, UsageJournal, compute_chain_hash
+
+    today = datetime.now(MSK)
+    for total in HISTORY_SIZES:
+        directory = fixtures.tmp_dir() / f"startup-{total}"
+        directory.mkdir(parents=True, exist_ok=True)
+        main_path = directory / "app.log"
+        decoy_path = directory / "action_usage.log"
+
+        # Синтетическая история: по 150 записей в день
+        journal = UsageJournal(main_path)
+        legacy = []
+        parts = []
+        for i in range(total):
+            date = (today - timedelta(days=(total - i) // 150)).strftime('%Y-%m-%d')
+            point_type = 'FROST' if i % 3 else 'QB'
+            parts.append(journal.append(date, point_type))
+            legacy.append({'date': date, 'action_group': point_type, 'hash': journal.head})
+        text = "".join(parts)
+
+        # Старый формат: полный разбор JSON-массива и проверка всей цепочки
+        legacy_path = directory / "legacy.log"
+        legacy_path.write_text(json.dumps(legacy, indent=2), encoding='utf-8')
+
+        def legacy_load():
+            prev_hash = ""
+            for record in json.loads(legacy_path.read_text(encoding='utf-8')):
+                prev_hash = compute_chain_hash(f"{record['date']}:{record['action_group']}", prev_hash)
+
+        legacy_ms, _ = _elapsed_ms(legacy_load)
+
+        # Журнал без сводки (от последней контрольной точки)
+        main_path.write_text(text, encoding='utf-8')
+        decoy_path.write_text(text, encoding='utf-8')
+        checkpoint_ms, limiter = _elapsed_ms(lambda: ActionLimiter(main_path, decoy_path, verify_in_background=False))
+        limiter.close()  # пишет сводку
+
+        # Теплый старт по сводке
+        summary_ms, limiter = _elapsed_ms(lambda: ActionLimiter(main_path, decoy_path, verify_in_background=False))
+        limiter.writer.close()
+
+        verify_ms, _ = _elapsed_ms(lambda: UsageJournal(main_path).verify_full())
+
+        for name, value in (('legacy_array', legacy_ms), ('checkpoint', checkpoint_ms),
+                            ('summary', summary_ms), ('full_verify', verify_ms)):
+            results.value(f'startup.{name}.{total}', value, 'ms', records=total)
@@ -0,0 +1,95 @@
+"""
+CharBase и MultiboxManager: refresh, needs_refresh, группа, телепорт
+"""
+import statistics
+import time
+
+from benchmarks import fixtures
+from benchmarks.runner import benchmark
+
+CLIENT_COUNTS = (1, 10, 25, 50)
+COLD_REPEAT = 3
+TELEPORT_ROUNDS = 50
+
+
+def _stats_us(samples) -> dict:
+    return {
+        'median_us': statistics.median(samples),
+        'min_us': min(samples),
+        'max_us': max(samples),
+        'number': 1,
+        'repeat': len(samples),
+    }
+
+
+def _teleport_skew(multibox_manager, rounds: int = TELEPORT_ROUNDS):
+    """
+    Разброс моментов записи координат внутри одного teleport_group
+
+    Returns:
+        (skew_samples_us, total_samples_us)
+    """
+    characters = multibox_manager.get_all_characters()
+    stamps = []
+
+    for char in characters:
+        write_block = char.memory.write_block
+
+        def timed_write(address, data, write_block=write_block):
+            ok = write_block(address, data)
+            stamps.append(time.perf_counter())
+            return ok
+
+        char.memory.write_block = timed_write
+
+    # Планы строятся на первом вызове - его не считаем
+    multibox_manager.teleport_group(characters, 100.0, 200.0, 50.0)
+
+    skews, totals = [], []
+    for i in range(rounds):
+        stamps.clear()
+        start = time.perf_counter()
+        multibox_manager.teleport_group(characters, 100.0 + i, 200.0, 50.0)
+        totals.append((time.perf_counter() - start) * 1e6)
+        if len(stamps) > 1:
+            skews.append((stamps[-1] - stamps[0]) * 1e6)
+    return skews or [0.0], totals
+
+
+@benchmark('characters')
+def bench_characters(results):
+    # CharBase.refresh одного клиента
+    backend = fixtures.fleet(1)
+    multibox_manager, _ = fixtures.manager(backend)
+    char = next(iter(multibox_manager.characters.values()))
+    results.measure('char_base.refresh', char.char_base.refresh)
+    results.measure('char_base.get_position', char.char_base.get_position)
+    fixtures.close(multibox_manager)
+
+    for count in CLIENT_COUNTS:
+        backend = fixtures.fleet(count)
+
+        # Холодный refresh: подключение всех клиентов новым менеджером
+        samples = []
+        for _ in range(COLD_REPEAT):
+            cold_manager, _ = fixtures.manager(backend, refresh=False)
+            start = time.perf_counter()
+            cold_manager.refresh()
+            samples.append((time.perf_counter() - start) * 1e6)
+            for cold_char in cold_manager.characters.values():
+                cold_char.memory.close()
+            fixtures.close(cold_manager)
+        results.add(f'manager.refresh_cold.{count}', _stats_us(samples), clients=count)
+
+        multibox_manager, _ = fixtures.manager(backend)
+        results.measure(f'manager.refresh_warm.{count}', multibox_manager.refresh, extra={'clients': count})
+        results.measure(f'manager.needs_refresh.{count}', multibox_manager.needs_refresh, extra={'clients': count})
+        results.measure(f'manager.get_leader_and_group.{count}', multibox_manager.get_leader_and_group,
+                        extra={'clients': count})
+
+        skews, totals = _teleport_skew(multibox_manager)
+        results.add(f'teleport_group.total.{count}', _stats_us(totals), clients=count)
+        results.value(f'teleport_group.skew_p50.{count}', statistics.median(skews), 'us', clients=count)
+        results.value(f'teleport_group.skew_max.{count}', max(skews), 'us', clients=count)
+
+        fixtures.close(multibox_manager)
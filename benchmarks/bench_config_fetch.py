@@ -0,0 +1,112 @@
+"""
+ConfigFetcher на локальном HTTP сервере с задержкой: последовательно против
+параллельно, холодный кеш против теплого (304), подмена кеша licenses.json
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import fixtures
+from benchmarks.runner import benchmark
+
+REQUEST_DELAY = 0.2
+
+FILES = {
+    'licenses.json': {'users': {'Tester': {'hwid': 'X', 'server': 'alure'}}, 'apps': {}},
+    'global.json': {'base_address': '0x00400000', 'delays': {'click': 50}},
+    'alure.json': {'offsets': {'char_base': '0x1C'}},
+}
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Сервер конфигов: задержка, ETag, 304 на If-None-Match, /time"""
+
+    bodies = {f"/{name}": json.dumps(data).encode() for name, data in FILES.items()}
+
+    def _send(self, with_body: bool):
+        time.sleep(REQUEST_DELAY)
+        if self.path == '/time':
+            body = json.dumps({'datetime': '2026-01-15T12:00:00+00:00'}).encode()
+            etag = None
+        elif self.path in self.bodies:
+            body = self.bodies[self.path]
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        if with_body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._send(True)
+
+    def do_HEAD(self):
+        self._send(False)
+
+    def log_message(self, *args):
+        pass
+
+
+@benchmark('config_fetch')
+def bench_config_fetch(results):
+    from core.config_fetch import ConfigFetcher, HttpCache
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    cache_dir = fixtures.tmp_dir() / "http-cache"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def fetch_all(concurrent: bool):
+        fetcher = ConfigFetcher(base_url, timeout=5, cache=HttpCache(cache_dir, salt="bench"),
+                                time_servers=(f"{base_url}/time", "http://127.0.0.1:9/time"),
+                                always_fetch=("licenses.json",))
+        start = time.perf_counter()
+        if concurrent:
+            for name in FILES:
+                fetcher.submit(name)
+            fetcher.submit_date()
+        fetched = [fetcher.fetch_json(name) for name in FILES]
+        date = fetcher.submit_date().result()
+        elapsed = time.perf_counter() - start
+        fetcher.close()
+        assert all(fetched) and date == '2026-01-15'
+        return elapsed * 1000, fetcher.revalidated
+
+    try:
+        for label, concurrent in (("sequential", False), ("concurrent", True)):
+            for path in list(cache_dir.iterdir()):
+                path.unlink()
+            cold_ms, _ = fetch_all(concurrent)
+            warm_ms, revalidated = fetch_all(concurrent)
+            results.value(f'{label}.cold', cold_ms, 'ms', delay_ms=REQUEST_DELAY * 1000)
+            results.value(f'{label}.warm', warm_ms, 'ms', delay_ms=REQUEST_DELAY * 1000, revalidated=revalidated)
+
+        # Подмена кеша licenses.json с пересчитанной подписью (соль известна)
+        cache = HttpCache(cache_dir, salt="bench")
+        url = f"{base_url}/licenses.json"
+        _, meta = cache.load(url)
+        forged = json.dumps({'users': {'Tester': {'hwid': 'FORGED'}}, 'apps': {}}).encode()
+        cache.store(url, forged, meta.get('etag'), meta.get('last_modified'))
+        fetcher = ConfigFetcher(base_url, timeout=5, cache=cache, always_fetch=("licenses.json",))
+        served = fetcher.fetch_json("licenses.json")
+        fetcher.close()
+        results.value('forged_cache_ignored', float(served == FILES['licenses.json']), 'bool',
+                      lower_is_better=False)
+    finally:
+        server.shutdown()
+        server.server_close()
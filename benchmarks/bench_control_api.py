@@ -0,0 +1,38 @@
+"""
+API управления: запрос по постоянному соединению против соединения на запрос (старый протокол)
+"""
+import json
+import socket
+
+from benchmarks.runner import benchmark
+
+
+@benchmark('control_api')
+def bench_control_api(results):
+    from core.control_api import ControlClient, ControlServer
+    from core.metrics import metrics
+
+    server = ControlServer(port=0)
+    server.register_legacy(b'METRICS', lambda: json.dumps(metrics.snapshot()).encode('utf-8'))
+    server.register('metrics.snapshot', metrics.snapshot, blocking=False)
+    server.register('echo', lambda **params: params)
+
+    # Порт 0 - выбирает ОС
+    server.start()
+    port = server._server.sockets[0].getsockname()[1]
+
+    def legacy_request():
+        with socket.create_connection(('127.0.0.1', port)) as sock:
+            sock.sendall(b'METRICS')
+            while sock.recv(65536):
+                pass
+
+    client = ControlClient(port=port)
+    try:
+        results.measure('legacy_connect_per_request', legacy_request)
+        results.measure('persistent.ping', lambda: client.call('ping'))
+        results.measure('persistent.metrics_snapshot', lambda: client.call('metrics.snapshot'))
+        results.measure('persistent.echo_worker_thread', lambda: client.call('echo', value=1))
+    finally:
+        client.close()
+        server.stop()
@@ -0,0 +1,73 @@
+"""
+HotkeyManager (разбор события клавиши) и ActionLimiter.record_usage
+"""
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from benchmarks import fixtures
+from benchmarks.runner import benchmark
+
+KeyEvent = namedtuple('KeyEvent', ['name', 'event_type'])
+
+HOTKEY_BINDINGS = 30
+HISTORY_SIZES = (1000, 10000, 100000)
+
+
+class _NullActionManager:
+    def execute(self, action_id):
+        return True
+
+
+def _write_history(path, records: int):
+    """Синтетический журнал за прошлые дни (по 150 записей в день, с контрольными точками)"""
+    from core.action_limiter import MSK, UsageJournal
+
+    today = datetime.now(MSK)
+    journal = UsageJournal(path)
+    parts = []
+    for i in range(records):
+        date = (today - timedelta(days=(records - i) // 150 + 1)).strftime('%Y-%m-%d')
+        parts.append(journal.append(date, 'FROST' if i % 3 else 'QB'))
+    path.write_text("".join(parts), encoding='utf-8')
+
+
+@benchmark('core')
+def bench_core(results):
+    from core.hotkey_manager import HotkeyManager
+
+    hotkeys = HotkeyManager(_NullActionManager(), start_hook=False)
+    for i in range(HOTKEY_BINDINGS):
+        hotkeys.bind(f"ctrl+f{i + 1}" if i < 12 else f"alt+{chr(ord('a') + i - 12)}", f"action_{i}")
+
+    miss_down, miss_up = KeyEvent('q', 'down'), KeyEvent('q', 'up')
+    results.measure('hotkey.dispatch_miss', lambda: (hotkeys._on_key_event(miss_down), hotkeys._on_key_event(miss_up)),
+                    extra={'bindings': HOTKEY_BINDINGS})
+
+    # Совпадение: listener уже крутится для этого экшена - только обновление времени
+    hotkeys.listener_active = True
+    hotkeys.current_action_id = 'action_29'
+    hit = [KeyEvent('left alt', 'down'), KeyEvent('r', 'down'), KeyEvent('r', 'up'), KeyEvent('left alt', 'up')]
+
+    def dispatch_hit():
+        for event in hit:
+            hotkeys._on_key_event(event)
+
+    results.measure('hotkey.dispatch_hit_last', dispatch_hit, extra={'bindings': HOTKEY_BINDINGS})
+    hotkeys.listener_active = False
+
+    from core.action_limiter import ActionLimiter
+
+    for size in HISTORY_SIZES:
+        directory = fixtures.tmp_dir() / f"limiter-{size}"
+        directory.mkdir(parents=True, exist_ok=True)
+        _write_history(directory / "app.log", size)
+        _write_history(directory / "action_usage.log", size)
+
+        limiter = ActionLimiter(directory / "app.log", directory / "action_usage.log", verify_in_background=False)
+        limiter.LIMITS = {'FROST': 10 ** 9, 'QB': 10 ** 9}
+
+        def record():
+            limiter.record_usage('FROST')
+
+        results.measure(f'action_limiter.record_usage.{size}', record, repeat=3, extra={'history': size})
+        limiter.close()
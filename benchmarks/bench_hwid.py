@@ -0,0 +1,78 @@
+"""
+Пробы HWID на подставном runner (имитация wmic с задержкой):
+последовательно против параллельно, старт из кеша, фоновая сверка подмены
+"""
+import hashlib
+import json
+import time
+
+from benchmarks import fixtures
+from benchmarks.runner import benchmark
+
+PROBE_DELAY = 0.3
+
+
+def _stand_in_runner(delay: float, fail_wmic: bool):
+    from core.hwid import CommandRunner
+
+    class StandInRunner(CommandRunner):
+        """Имитация wmic: задержка и ответ как у настоящей команды"""
+
+        def run(self, command: str, timeout: float) -> str:
+            time.sleep(min(delay, timeout))
+            if delay > timeout:
+                raise TimeoutError(command)
+            if command.startswith("wmic"):
+                if fail_wmic:
+                    raise RuntimeError("wmic not found")
+                return "Header\nVALUE-" + hashlib.md5(command.encode()).hexdigest()[:8] + "\n"
+            return "VALUE-" + hashlib.md5(command.encode()).hexdigest()[:8] + "\n"
+
+    return StandInRunner()
+
+
+def _elapsed_ms(func):
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+@benchmark('hwid')
+def bench_hwid(results):
+    from core.hwid import HWID_PROBE_TIMEOUT, HWID_PROBES, HwidProber
+
+    cache_file = fixtures.tmp_dir() / "hwid.json"
+
+    for fail_wmic in (False, True):
+        runner = _stand_in_runner(PROBE_DELAY, fail_wmic)
+        label = "wmic_missing" if fail_wmic else "wmic_ok"
+
+        # Как раньше: пробы по очереди
+        def sequential():
+            for _, commands in HWID_PROBES:
+                for command, parse in commands:
+                    try:
+                        parse(runner.run(command, HWID_PROBE_TIMEOUT))
+                        break
+                    except Exception:
+                        continue
+
+        sequential_ms, _ = _elapsed_ms(sequential)
+
+        if cache_file.exists():
+            cache_file.unlink()
+        prober = HwidProber(runner, cache_file=cache_file)
+        concurrent_ms, _ = _elapsed_ms(prober.get_components)
+        cached_ms, _ = _elapsed_ms(prober.get_components)
+
+        # Подмена одного компонента: старт берет кеш, фоновая сверка находит подмену
+        data = json.loads(cache_file.read_text(encoding='utf-8'))
+        data['components']['disk_serial'] = "FORGED"
+        cache_file.write_text(json.dumps(data), encoding='utf-8')
+        detected = prober.verify(prober.get_components()) is not None
+
+        extra = {'delay_ms': PROBE_DELAY * 1000}
+        results.value(f'{label}.sequential', sequential_ms, 'ms', **extra)
+        results.value(f'{label}.concurrent', concurrent_ms, 'ms', **extra)
+        results.value(f'{label}.cached', cached_ms, 'ms', **extra)
+        results.value(f'{label}.forged_cache_detected', float(detected), 'bool', lower_is_better=False)
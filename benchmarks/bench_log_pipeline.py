@@ -0,0 +1,46 @@
+"""
+Цена logging.info в горячем цикле: синхронный FileHandler против очереди с ограничением частоты
+"""
+import logging
+
+from benchmarks import fixtures
+from benchmarks.runner import benchmark
+
+ITERATIONS = 20000
+
+
+@benchmark('log_pipeline')
+def bench_log_pipeline(results):
+    from core.log_pipeline import LOG_FORMAT, setup_logging, stop_logging
+
+    path = fixtures.tmp_dir() / "bench.log"
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+
+    # Раннер выключает логирование целиком - здесь оно и есть предмет замера
+    logging.disable(logging.NOTSET)
+    try:
+        # Синхронная запись (как basicConfig)
+        logging.basicConfig(level=logging.INFO, format=LOG_FORMAT,
+                            handlers=[logging.FileHandler(path, encoding='utf-8')], force=True)
+        counter = iter(range(10 ** 9))
+        results.measure('sync_basic_config', lambda: logging.info(f"member {next(counter)}: diff={0.1:+.1f}"),
+                        number=ITERATIONS, repeat=3)
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+            handler.close()
+
+        # Конвейер: отложенное форматирование + ограничение частоты
+        setup_logging([logging.FileHandler(path, encoding='utf-8')])
+        try:
+            results.measure('queue_rate_limited', lambda: logging.info("member %s: diff=%+.1f", next(counter), 0.1),
+                            number=ITERATIONS, repeat=3)
+        finally:
+            stop_logging()
+    finally:
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(saved_level)
+        logging.disable(logging.CRITICAL)
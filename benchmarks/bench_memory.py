@@ -0,0 +1,128 @@
+"""
+Memory: цена одного чтения (старый путь против быстрого)
+
+На Linux транспорт - process_vm_readv по своему же процессу: тот же быстрый
+путь Memory (буферы потока, restype, декодирование struct), только
+_read_raw вместо ReadProcessMemory. Старый путь повторяет прежнее тело
+Memory.read_int: новые ctypes-объекты на каждый вызов.
+
+call.* - один и тот же вызов тремя способами (почему у быстрого пути нет argtypes).
+"""
+import ctypes
+import os
+import struct
+import threading
+
+from benchmarks.runner import benchmark
+from game.memory import READ_CLOSED, READ_FAILED, Memory, _fail
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [('base', ctypes.c_void_p), ('len', ctypes.c_size_t)]
+
+
+class _VMBuffers(threading.local):
+    def __init__(self):
+        self.local = _IOVec()
+        self.remote = _IOVec()
+        self.local_ref = ctypes.byref(self.local)
+        self.remote_ref = ctypes.byref(self.remote)
+
+
+class ProcessVMMemory(Memory):
+    """Memory поверх process_vm_readv (Linux, только чтение)"""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.process_handle = pid
+        self.module_base = 0
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._readv = libc.process_vm_readv
+        self._readv.restype = ctypes.c_ssize_t
+        self._iov = _VMBuffers()
+
+    def _read_raw(self, address, buffer, size) -> int:
+        if not self.process_handle:
+            return _fail(READ_CLOSED)
+        iov = self._iov
+        iov.local.base = ctypes.addressof(buffer)
+        iov.local.len = size
+        iov.remote.base = address
+        iov.remote.len = size
+        count = self._readv(self.pid, iov.local_ref, 1, iov.remote_ref, 1, 0)
+        if count < 0:
+            return _fail(READ_FAILED, ctypes.get_errno())
+        return count
+
+
+def _legacy_reader(pid: int):
+    """Прежний шаблон read_int (ctypes-объекты на вызов)"""
+    readv = ctypes.CDLL(None).process_vm_readv
+
+    def read_int(address):
+        try:
+            buffer = ctypes.c_int()
+            bytes_read = ctypes.c_size_t()
+            local = _IOVec(ctypes.addressof(buffer), 4)
+            remote = _IOVec(ctypes.c_void_p(address).value, 4)
+            bytes_read.value = readv(pid, ctypes.byref(local), 1, ctypes.byref(remote), 1, 0)
+            if bytes_read.value != 4:
+                return None
+            return buffer.value
+        except:
+            return None
+
+    return read_int
+
+
+def _available() -> bool:
+    return hasattr(ctypes.CDLL(None), 'process_vm_readv') if os.name == 'posix' else False
+
+
+@benchmark('memory')
+def bench_memory(results):
+    if not _available():
+        print("  (process_vm_readv unavailable - skipped)")
+        return
+
+    pid = os.getpid()
+    target = ctypes.create_string_buffer(4096)
+    struct.pack_into('<ifQ', target, 0, 123456, 1.5, 0x140000000)
+    name = "Персонаж".encode('utf-16-le')
+    target[64:64 + len(name)] = name
+    base = ctypes.addressof(target)
+
+    memory = ProcessVMMemory(pid)
+    legacy_read_int = _legacy_reader(pid)
+    if legacy_read_int(base) != 123456 or memory.read_int(base) != 123456:
+        print("  (process_vm_readv denied - skipped)")
+        return
+
+    results.measure('read_int.legacy', lambda: legacy_read_int(base))
+    results.measure('read_int.fast', lambda: memory.read_int(base))
+    results.measure('read_float.fast', lambda: memory.read_float(base + 4))
+    results.measure('read_uint64.fast', lambda: memory.read_uint64(base + 8))
+    results.measure('read_result.fast', lambda: memory.read_result(base, 'int'))
+    results.measure('read_bytes_12.fast', lambda: memory.read_bytes(base, 12))
+    results.measure('read_string_256.fast', lambda: memory.read_string(base + 64))
+
+    out = bytearray(12)
+    results.measure('read_into_12.fast', lambda: memory.read_into(base, out))
+
+    # Один вызов: без прототипа / argtypes / только restype с готовыми аргументами
+    buffer = ctypes.create_string_buffer(8)
+    local, remote = _IOVec(ctypes.addressof(buffer), 4), _IOVec(base, 4)
+    local_ref, remote_ref = ctypes.byref(local), ctypes.byref(remote)
+
+    plain = ctypes.CDLL(None).process_vm_readv
+    typed = ctypes.CDLL(None).process_vm_readv
+    typed.argtypes = [ctypes.c_int, ctypes.POINTER(_IOVec), ctypes.c_ulong,
+                      ctypes.POINTER(_IOVec), ctypes.c_ulong, ctypes.c_ulong]
+    typed.restype = ctypes.c_ssize_t
+    restype_only = ctypes.CDLL(None).process_vm_readv
+    restype_only.restype = ctypes.c_ssize_t
+
+    results.measure('call.plain', lambda: plain(pid, local_ref, 1, remote_ref, 1, 0))
+    results.measure('call.argtypes', lambda: typed(pid, local_ref, 1, remote_ref, 1, 0))
+    results.measure('call.restype_only', lambda: restype_only(pid, local_ref, 1, remote_ref, 1, 0))
@@ -0,0 +1,82 @@
+"""
+Подключение клиентов: обход модулей на каждый attach против реестра сборок
+
+legacy  - как раньше: снимок списка модулей на каждого клиента
+session - пустой реестр: первый клиент - обход, остальные - заголовок по известной базе
+restart - реестр из файла прошлого запуска: без обхода
+rebased - файл есть, но база другая (перезагрузка с ASLR): один обход на всех
+
+В симуляции снимок Toolhelp - копия списка из SIM_SYSTEM_MODULES + 1 записей,
+поэтому по времени реестр здесь проигрывает legacy в 3-9 раз (чтение и сверка
+4 КБ заголовка дороже копии списка). Настоящий CreateToolhelp32Snapshot дороже
+на порядки, поэтому главное - число обходов; время на Windows здесь не замерено.
+"""
+import time
+
+from benchmarks import fixtures
+from benchmarks.bench_characters import _stats_us
+from benchmarks.runner import benchmark
+from game.module_registry import ModuleRegistry
+from game.simulated import SimulatedBackend
+
+CLIENT_COUNTS = (1, 10, 50)
+REPEAT = 5
+
+
+def _attach_all(backend, legacy: bool = False):
+    """Подключить всех клиентов; (время us, число обходов)"""
+    for client in backend.clients.values():
+        client.module_snapshots = 0
+
+    start = time.perf_counter()
+    for pid in backend.list_pids():
+        memory = backend.attach(pid)
+        if legacy:
+            memory.module_base = memory._find_module("ElementClient.exe")[0]
+    elapsed = (time.perf_counter() - start) * 1e6
+
+    return elapsed, sum(client.module_snapshots for client in backend.clients.values())
+
+
+def _rebased_fleet(count: int) -> SimulatedBackend:
+    backend = SimulatedBackend()
+    backend.module_base = 0x7FF6A0000000
+    for i in range(count):
+        backend.add_client(char_id=100000 + i, name=f"Sim{i:02d}")
+    return backend
+
+
+@benchmark('modules')
+def bench_modules(results):
+    for count in CLIENT_COUNTS:
+        backend = fixtures.fleet(count)
+        path = fixtures.tmp_dir() / f"modules-{count}.json"
+        runs = {'legacy': [], 'session': [], 'restart': [], 'rebased': []}
+        enumerations = {}
+
+        for i in range(REPEAT):
+            path.unlink(missing_ok=True)
+
+            backend.module_registry = None
+            runs['legacy'].append(_attach_all(backend, legacy=True))
+
+            registry = ModuleRegistry(path)
+            backend.module_registry = registry
+            runs['session'].append(_attach_all(backend))
+            registry.close()
+
+            backend.module_registry = ModuleRegistry(path)
+            runs['restart'].append(_attach_all(backend))
+
+            rebased = _rebased_fleet(count)
+            rebased.module_registry = backend.module_registry
+            runs['rebased'].append(_attach_all(rebased))
+            backend.module_registry.close()
+
+        for mode, samples in runs.items():
+            results.add(f'attach.{mode}.{count}', _stats_us([us for us, _ in samples]), clients=count)
+            enumerations[mode] = samples[-1][1]
+        for mode, value in enumerations.items():
+            results.value(f'enumerations.{mode}.{count}', value, 'snapshots', clients=count)
+
+        backend.module_registry = None
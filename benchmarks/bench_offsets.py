@@ -0,0 +1,40 @@
+"""
+resolve_offset: скалярные пути (с кешем и без) и массивы
+"""
+from benchmarks import fixtures
+from benchmarks.runner import benchmark
+from game.offsets import OFFSETS, resolve_offset
+from game.structs import CharBase, WorldManager
+
+
+@benchmark('offsets')
+def bench_offsets(results):
+    backend = fixtures.fleet(5)
+    fixtures.populate_world(backend, people=200, loot=50)
+    memory = backend.attach(backend.list_pids()[0])
+
+    char_base = CharBase(memory)
+    cache = dict(char_base.cache)
+
+    # Скаляры
+    results.measure('scalar.static_chain', lambda: resolve_offset(memory, OFFSETS["char_origin"], {}))
+    results.measure('scalar.float_cached', lambda: resolve_offset(memory, OFFSETS["char_pos_x"], cache))
+    results.measure('scalar.int32_cached', lambda: resolve_offset(memory, OFFSETS["char_hp"], cache))
+    results.measure('scalar.uncached_char_id', lambda: resolve_offset(memory, OFFSETS["char_id"], {}))
+    results.measure('scalar.str_name', lambda: resolve_offset(memory, OFFSETS["char_name"], cache))
+
+    # Массивы
+    party_ptr = resolve_offset(memory, OFFSETS["party_ptr"], cache)
+    cache["party_ptr"] = party_ptr
+    cache["party_members_array"] = resolve_offset(memory, OFFSETS["party_members_array"], cache)
+    results.measure('array.party_members_5', lambda: resolve_offset(memory, OFFSETS["party_members"], cache))
+
+    world = WorldManager(memory)
+    world_cache = dict(world.cache)
+    world_cache["people_container"] = resolve_offset(memory, OFFSETS["people_container"], world_cache)
+    results.measure(
+        'array.people_4096_slots_250',
+        lambda: resolve_offset(memory, OFFSETS["people_items"], world_cache, with_ptr=True),
+        repeat=3,
+    )
+    results.measure('world.scan_250', world.scan, repeat=3)
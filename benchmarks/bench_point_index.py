@@ -0,0 +1,49 @@
+"""
+PointIndex.find против линейного прохода по зонам (время не должно расти с числом зон)
+"""
+import random
+
+from benchmarks.runner import benchmark
+
+ZONE_COUNTS = (10, 100, 1000, 5000, 20000)
+QUERIES = 1000
+
+
+def _zones(count: int, rng: random.Random):
+    return [{
+        'name': f"{i} FROST BENCH",
+        'trigger': (rng.uniform(-5000, 5000), rng.uniform(-5000, 5000)),
+        'target': (0.0, 0.0, 0.0),
+        'radius': rng.choice((15, 20, 40, 60)),
+    } for i in range(count)]
+
+
+@benchmark('point_index')
+def bench_point_index(results):
+    from core.point_index import PointIndex, can_use_point
+
+    rng = random.Random(1)
+    for zone_count in ZONE_COUNTS:
+        points = _zones(zone_count, rng)
+        index = PointIndex(points)
+        queries = [(rng.uniform(-5000, 5000), rng.uniform(-5000, 5000)) for _ in range(QUERIES)]
+
+        # Старый способ - линейный проход
+        def linear():
+            for x, y in queries:
+                for point in points:
+                    if not can_use_point(point['name'], "pro"):
+                        continue
+                    trigger_x, trigger_y = point['trigger']
+                    radius = point.get('radius', 15.0)
+                    if abs(x - trigger_x) <= radius and abs(y - trigger_y) <= radius:
+                        break
+
+        def indexed():
+            for x, y in queries:
+                index.find(x, y, "pro")
+
+        extra = {'zones': zone_count, 'queries': QUERIES}
+        if zone_count <= 1000:
+            results.measure(f'linear.{zone_count}', linear, repeat=3, extra=extra)
+        results.measure(f'find.{zone_count}', indexed, repeat=3, extra=extra)
@@ -0,0 +1,27 @@
+"""
+State ring: публикация кадра и чтение последнего кадра (клиенты / сущности)
+"""
+from benchmarks.runner import benchmark
+
+CLIENTS = 50
+ENTITIES = 2000
+
+
+@benchmark('state_ring')
+def bench_state_ring(results):
+    from game.state_ring import ENTITY_PEOPLE, StateRingReader, StateRingWriter, numpy
+
+    client_rows = [(10000 + i, 100000 + i, 1, 900, 1000, 1.0 * i, 2.0 * i, 3.0, 0, 2, 10.0, 0.0, 100000, 5, 0)
+                   for i in range(CLIENTS)]
+    entity_rows = [(ENTITY_PEOPLE, i, 1.0 * i, 2.0 * i, 0.0) for i in range(ENTITIES)]
+    extra = {'clients': CLIENTS, 'entities': ENTITIES, 'numpy': numpy is not None}
+
+    writer = StateRingWriter()
+    reader = StateRingReader(writer.name)
+    try:
+        results.measure('publish', lambda: writer.publish(client_rows, entity_rows), extra=extra)
+        results.measure('latest_clients', lambda: reader.latest().clients, extra=extra)
+        results.measure('latest_entities', lambda: reader.latest().entities, extra=extra)
+    finally:
+        reader.close()
+        writer.close()
@@ -0,0 +1,42 @@
+"""
+Опрос клиентов: один процесс (CharBase.refresh по кругу) против WorkerPool
+"""
+import os
+import time
+
+from benchmarks import fixtures
+from benchmarks.runner import benchmark
+
+CLIENTS = 20
+SECONDS = 2.0
+
+
+@benchmark('workers')
+def bench_workers(results):
+    from characters.workers import WorkerPool
+    from game.structs import CharBase
+
+    spec = ('simulated', CLIENTS, 5, 0)
+    backend = fixtures.fleet(*spec[1:])
+    bases = [CharBase(backend.attach(pid)) for pid in backend.list_pids()]
+
+    samples = 0
+    deadline = time.perf_counter() + SECONDS
+    while time.perf_counter() < deadline:
+        for char_base in bases:
+            char_base.refresh()
+        samples += len(bases)
+    results.value('single_process', samples / SECONDS, 'samples/s', lower_is_better=False, clients=CLIENTS)
+
+    for shards in sorted({1, 2, max(1, (os.cpu_count() or 2) - 1)}):
+        pool = WorkerPool(spec, shards=shards, interval_ms=0)
+        pool.start(backend.list_pids())
+        try:
+            pool.wait_attached()
+            start_ticks, start = pool.ticks(), time.perf_counter()
+            time.sleep(SECONDS)
+            elapsed = time.perf_counter() - start
+            rate = (pool.ticks() - start_ticks) * CLIENTS / max(1, pool.shard_count) / elapsed
+        finally:
+            pool.stop()
+        results.value(f'pool.x{shards}', rate, 'samples/s', lower_is_better=False, clients=CLIENTS)
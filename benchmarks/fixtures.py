@@ -0,0 +1,60 @@
+"""
+Окружение бенчмарков: симулированные клиенты и менеджеры без AppData
+"""
+import random
+import tempfile
+from pathlib import Path
+
+from core.app_state import AppState
+from game.simulated import SimulatedBackend
+
+# Общая временная папка прогона (профили, журналы)
+_TMP_DIR = None
+
+
+def tmp_dir() -> Path:
+    global _TMP_DIR
+    if _TMP_DIR is None:
+        _TMP_DIR = Path(tempfile.mkdtemp(prefix="xvocmuk-bench-"))
+    return _TMP_DIR
+
+
+def fleet(count: int, party_size: int = 5, seed: int = 0) -> SimulatedBackend:
+    """Симулированные клиенты (детерминированно по seed)"""
+    return SimulatedBackend.fleet(count, party_size, seed)
+
+
+def populate_world(backend: SimulatedBackend, people: int = 200, loot: int = 50, seed: int = 0):
+    """Заполнить контейнер мира каждого клиента"""
+    rng = random.Random(seed)
+    entities = [(1, rng.uniform(0, 500), rng.uniform(0, 500), 0.0) for _ in range(loot)]
+    entities += [(1000 + i, rng.uniform(0, 500), rng.uniform(0, 500), 50.0) for i in range(people)]
+    for client in backend.clients.values():
+        client.set_entities(entities)
+
+
+def manager(backend: SimulatedBackend, refresh: bool = True):
+    """
+    MultiboxManager поверх симуляции (профили - во временной папке)
+
+    Returns:
+        (manager, app_state): активное окно - первый клиент
+    """
+    from characters.manager import MultiboxManager
+    from characters.profiles import ProfileStore
+
+    multibox_manager = MultiboxManager(backend, ProfileStore(tmp_dir() / f"profiles-{id(backend)}.json"))
+    app_state = AppState()
+    multibox_manager.set_app_state(app_state)
+    if refresh:
+        multibox_manager.refresh()
+        first = multibox_manager.characters.get(backend.foreground_pid())
+        if first is not None:
+            app_state.set_last_active_character(first)
+    return multibox_manager, app_state
+
+
+def close(multibox_manager):
+    """Освободить потоки менеджера"""
+    multibox_manager.world_view.close()
+    multibox_manager.profiles.close()
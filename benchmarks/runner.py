@@ -0,0 +1,203 @@
+"""
+Общая часть бенчмарков: регистрация, замер, JSON и сравнение с базой
+"""
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Порог регрессии по умолчанию (+20% к медиане)
+DEFAULT_THRESHOLD = 0.20
+
+# Сколько повторов замера и минимальная длительность одного повтора
+DEFAULT_REPEAT = 5
+MIN_REPEAT_TIME = 0.05
+
+_BENCHMARKS = {}  # {name: func(results)}
+
+
+def benchmark(name: str):
+    """
+    Зарегистрировать набор бенчмарков
+
+    Функция получает Results и добавляет в него замеры через results.add / measure
+    """
+    def decorator(func):
+        _BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+def registered() -> dict:
+    """{name: func} в порядке регистрации (после импорта модулей наборов)"""
+    from benchmarks import bench_offsets, bench_memory, bench_characters, bench_core, bench_modules  # noqa: F401
+    from benchmarks import bench_point_index, bench_log_pipeline, bench_action_limiter  # noqa: F401
+    from benchmarks import bench_config_fetch, bench_hwid, bench_control_api  # noqa: F401
+    from benchmarks import bench_workers, bench_state_ring  # noqa: F401
+    return dict(_BENCHMARKS)
+
+
+def measure(func, repeat: int = DEFAULT_REPEAT, number: int = None) -> dict:
+    """
+    Замерить func() как timeit: repeat повторов по number вызовов
+
+    Если number не задан - подбирается так, чтобы повтор длился >= MIN_REPEAT_TIME.
+
+    Returns:
+        dict: {'median_us', 'min_us', 'max_us', 'number', 'repeat'} на один вызов
+    """
+    if number is None:
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            if time.perf_counter() - start >= MIN_REPEAT_TIME or number >= 1_000_000:
+                break
+            number *= 4
+
+    per_call = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        per_call.append((time.perf_counter() - start) / number * 1e6)
+
+    return {
+        'median_us': statistics.median(per_call),
+        'min_us': min(per_call),
+        'max_us': max(per_call),
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+class Results:
+    """Замеры одного прогона: {имя замера: dict}"""
+
+    def __init__(self):
+        self.entries = {}
+        self._prefix = ""
+
+    def add(self, name: str, entry: dict, **extra):
+        key = f"{self._prefix}{name}"
+        self.entries[key] = dict(entry, **extra)
+        value = entry.get('median_us')
+        unit = 'us'
+        if value is None:
+            value, unit = entry.get('value'), entry.get('unit', '')
+        print(f"  {key:<52} {value:>12.2f} {unit}")
+
+    def measure(self, name: str, func, **kwargs):
+        """measure() + add()"""
+        extra = kwargs.pop('extra', {})
+        self.add(name, measure(func, **kwargs), **extra)
+
+    def value(self, name: str, value: float, unit: str, lower_is_better: bool = True, **extra):
+        """Произвольная величина (не время вызова)"""
+        self.add(name, {'value': value, 'unit': unit, 'lower_is_better': lower_is_better}, **extra)
+
+    def run(self, name: str, func):
+        self._prefix = f"{name}."
+        print(f"[{name}]")
+        try:
+            func(self)
+        finally:
+            self._prefix = ""
+
+    def to_json(self) -> dict:
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'results': self.entries,
+        }
+
+
+def _metric(entry: dict):
+    """Величина для сравнения (меньше - лучше) или None"""
+    if 'median_us' in entry:
+        return entry['median_us']
+    value = entry.get('value')
+    if value is None:
+        return None
+    return value if entry.get('lower_is_better', True) else -value
+
+
+def compare(current: dict, baseline: dict):
+    """
+    Сравнить прогон с базой
+
+    Returns:
+        list[(name, base, current, change)]: change - относительное изменение
+        (+0.25 = на 25% хуже), только для замеров, которые есть в обоих
+    """
+    rows = []
+    base_results = baseline.get('results', {})
+    for name, entry in current.get('results', {}).items():
+        if name not in base_results:
+            continue
+        base, value = _metric(base_results[name]), _metric(entry)
+        if base is None or value is None or base == 0:
+            continue
+        change = (value - base) / abs(base)
+        rows.append((name, base, value, change))
+    return rows
+
+
+def print_comparison(rows, threshold: float = DEFAULT_THRESHOLD) -> int:
+    """Таблица сравнения; возвращает число регрессий"""
+    regressions = 0
+    print()
+    print(f"{'benchmark':<52} {'base':>12} {'current':>12} {'change':>9}")
+    for name, base, value, change in rows:
+        mark = ""
+        if change > threshold:
+            mark = "  REGRESSION"
+            regressions += 1
+        elif change < -threshold:
+            mark = "  faster"
+        print(f"{name:<52} {abs(base):>12.2f} {abs(value):>12.2f} {change:>+8.0%}{mark}")
+    print(f"\n{regressions} regression(s) over {threshold:.0%}")
+    return regressions
+
+
+def run(names=None, output: Path = None, baseline: Path = None,
+        threshold: float = DEFAULT_THRESHOLD, save_baseline: Path = None) -> int:
+    """
+    Прогнать наборы, записать JSON, сравнить с базой
+
+    Returns:
+        int: код выхода (1 - есть регрессии)
+    """
+    logging.disable(logging.CRITICAL)
+
+    suites = registered()
+    unknown = [name for name in names or () if name not in suites]
+    if unknown:
+        print(f"unknown benchmarks: {', '.join(unknown)} (available: {', '.join(suites)})")
+        return 2
+
+    results = Results()
+    for name, func in suites.items():
+        if names and name not in names:
+            continue
+        results.run(name, func)
+
+    data = results.to_json()
+    for path in (output, save_baseline):
+        if path:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+            print(f"\n💾 {path}")
+
+    if baseline:
+        base = json.loads(Path(baseline).read_text(encoding='utf-8'))
+        regressions = print_comparison(compare(data, base), threshold)
+        return 1 if regressions else 0
+    return 0
@@ -11,6 +11,24 @@ if not ahk_exe_path:
 
 print(f"✅ Found AutoHotkey.exe: {ahk_exe_path}")
 
+# ========================================
+# АТЛАС ИКОНОК КЛАССОВ (assets/class_icons_atlas.png)
+# ========================================
+import importlib.util
+
+def _load_source(name, path):
+    """Загрузить модуль из файла, не импортируя пакет gui (он тянет tkinter и ядро)"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+icon_atlas = _load_source('icon_atlas', 'gui/icon_atlas.py')
+styles = _load_source('styles', 'gui/styles.py')
+icon_atlas.build_atlas(Path('assets/class_icons'), Path('assets'), size=styles.ICON_SIZE)
+
+print("✅ Class icon atlas built")
+
 # ========================================
 # АНАЛИЗ
 # ========================================
@@ -52,12 +70,21 @@ a = Analysis(
         'characters',
         'characters.character',
         'characters.behaviors',
+        'characters.teleport',
+        'characters.profiles',
+        'characters.workers',
         'characters.multibox_manager',
         'game',
         'game.memory',
+        'game.module_registry',
         'game.structs',
         'game.offsets',
+        'game.spatial',
+        'game.world_view',
+        'game.tracker',
         'game.win32_api',
+        'game.simulated',
+        'game.state_ring',
         'config',
         'config.constants',
         'config.settings',
@@ -68,9 +95,20 @@ a = Analysis(
         'core.keygen',
         'core.action_limiter',
         'core.app_hub',
+        'core.hwid',
+        'core.config_fetch',
+        'core.startup',
+        'core.point_index',
+        'core.metrics',
+        'core.log_pipeline',
+        'core.scheduler',
+        'core.debounced_writer',
+        'core.headless',
+        'core.control_api',
         'gui',
         'gui.main_window',
         'gui.character_panel',
+        'gui.icon_atlas',
         'gui.hotkey_panel',
         'gui.styles',
     ],
@@ -4,5 +4,15 @@
 from characters.character import Character
 from characters.manager import MultiboxManager
 from characters.behaviors import create_behavior
+from characters.teleport import TeleportPlan, TeleportPlanner
+from characters.profiles import ProfileStore
 
-__all__ = ['Character', 'MultiboxManager', 'create_behavior']
\ No newline at end of file
+__all__ = ['Character', 'MultiboxManager', 'create_behavior', 'TeleportPlan', 'TeleportPlanner', 'ProfileStore', 'WorkerPool']
+
+
+def __getattr__(name):
+    # WorkerPool - лениво: multiprocessing нужен только с --workers
+    if name == 'WorkerPool':
+        from characters.workers import WorkerPool
+        return WorkerPool
+    raise AttributeError(f"module 'characters' has no attribute '{name}'")
\ No newline at end of file
@@ -8,7 +8,7 @@ import logging
 class Character:
     """Представление одного игрового персонажа"""
     
-    def __init__(self, pid, memory, char_base):
+    def __init__(self, pid, memory, char_base, profiles=None):
         self.pid = pid
         self.memory = memory
         self.char_base = char_base
@@ -23,6 +23,49 @@ class Character:
         # НОВОЕ: Кеш fly trigger состояний (для управления полетом)
         # None пока не найдены, потом {'on': int, 'off': int}
         self.fly_trigger_states = None
+        
+        # Профиль с прошлых запусков (ProfileStore): fly trigger известен сразу
+        self.profiles = profiles
+        self._fly_states_from_profile = False
+        self.last_party_leader_id = None  # лидер последней известной группы (из профиля)
+        self._load_profile()
+    
+    def _load_profile(self):
+        """Взять известное из профиля и записать статические данные"""
+        if self.profiles is None:
+            return
+        
+        char_id = self.char_base.char_id
+        profile = self.profiles.get(char_id)
+        
+        # Имя/класс из профиля должны совпасть с памятью: иначе char_id
+        # достался другому персонажу (другой сервер, пересоздание) - профиль чужой
+        static = {'name': self.char_base.char_name, 'char_class': self.char_base.char_class}
+        fields = {field: value for field, value in static.items() if value is not None}
+        for field, value in list(fields.items()):
+            stored = profile.get(field)
+            if stored is not None and stored != value:
+                logging.warning(f"📇 Profile of char_id={char_id} belongs to {stored!r}, not {value!r} - reset")
+                profile = {}
+                fields.update(fly_trigger_states=None, party_leader_id=None)
+                break
+        
+        states = profile.get('fly_trigger_states')
+        if isinstance(states, dict) and 'on' in states and 'off' in states:
+            self.fly_trigger_states = {'on': states['on'], 'off': states['off']}
+            self._fly_states_from_profile = True
+            logging.info(f"📇 Profile: PID={self.pid}, fly triggers restored {self.fly_trigger_states}")
+        
+        self.last_party_leader_id = profile.get('party_leader_id')
+        
+        # Еще не прочитанные поля (None) не затирают сохраненные
+        self.profiles.update(char_id, **fields)
+    
+    def remember_party(self, party_leader_id):
+        """Запомнить лидера группы в профиле (0 - без группы)"""
+        self.last_party_leader_id = party_leader_id or 0
+        if self.profiles is not None:
+            self.profiles.update(self.char_base.char_id, party_leader_id=self.last_party_leader_id)
     
     def is_valid(self):
         """Проверка валидности персонажа"""
@@ -38,7 +81,8 @@ class Character:
         - Как только найдем оба - прекращаем мониторинг
         """
         # Если уже нашли оба состояния - не проверяем
-        if self.fly_trigger_states and len(self.fly_trigger_states) == 2:
+        # (из профиля - пока не сверили с памятью хотя бы раз)
+        if self.fly_trigger_states and len(self.fly_trigger_states) == 2 and not self._fly_states_from_profile:
             return
         
         from game.offsets import resolve_offset, OFFSETS
@@ -50,6 +94,15 @@ class Character:
         if fly_status is None or fly_trigger is None:
             return
         
+        # Сверка профиля: текущее состояние должно совпасть с сохраненным
+        if self._fly_states_from_profile:
+            self._fly_states_from_profile = False
+            expected = self.fly_trigger_states['on' if fly_status == 1 else 'off']
+            if expected == fly_trigger:
+                return
+            logging.warning(f"📇 Profile fly triggers stale for PID={self.pid}, relearning")
+            self.fly_trigger_states = None
+        
         # Инициализируем словарь если еще нет
         if self.fly_trigger_states is None:
             self.fly_trigger_states = {}
@@ -58,13 +111,15 @@ class Character:
         if fly_status == 1:  # Летит
             if 'on' not in self.fly_trigger_states:
                 self.fly_trigger_states['on'] = fly_trigger
-                import logging
                 logging.info(f"✈️ FLY ON: PID={self.pid}, trigger={fly_trigger}")
         else:  # Не летит
             if 'off' not in self.fly_trigger_states:
                 self.fly_trigger_states['off'] = fly_trigger
-                import logging
                 logging.info(f"🚶 FLY OFF: PID={self.pid}, trigger={fly_trigger}")
+        
+        # Оба найдены - в профиль (следующий запуск начнет с ними)
+        if self.can_control_flight() and self.profiles is not None:
+            self.profiles.update(self.char_base.char_id, fly_trigger_states=dict(self.fly_trigger_states))
     
     def can_control_flight(self):
         """Проверить можем ли управлять полетом (найдены оба состояния)"""
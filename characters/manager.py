@@ -1,27 +1,48 @@
 """
 Управление несколькими игровыми процессами - ПОЛНОСТЬЮ ОБНОВЛЕНО
 """
-import ctypes
 import logging
 import math
-from game.memory import Memory
-from game.structs import CharBase, WorldManager
+import threading
+import time
+from game.memory import Win32Backend
+from game.structs import CharBase
+from game.world_view import MergedWorldView
+from game.tracker import WorldTracker
 from characters.character import Character
-from config.constants import DUNGEON_POINTS, LOOT_CHECK_RADIUS
-from game.win32_api import TH32CS_SNAPPROCESS, PROCESSENTRY32
+from characters.teleport import TeleportPlanner
+from characters.profiles import ProfileStore
+from config.constants import LOOT_CHECK_RADIUS, WORLD_TICK_INTERVAL, WORLD_DEMAND_TIMEOUT
+from core.point_index import PointIndex
+from core.metrics import metrics
 from game.offsets import resolve_offset, OFFSETS
 
 class MultiboxManager:
     """Управление группой персонажей"""
     
-    def __init__(self):
+    def __init__(self, backend=None, profiles=None):
+        """
+        Args:
+            backend: источник процессов (по умолчанию Win32Backend;
+                     для симуляции - game.simulated.SimulatedBackend)
+            profiles: хранилище профилей (по умолчанию ProfileStore() в AppData)
+        """
         self.characters = {}
-        self.kernel32 = ctypes.windll.kernel32
+        self.backend = backend if backend is not None else Win32Backend()
         
-        # WorldManager для первого процесса
-        self.world_manager = None
+        # Вид мира по всем клиентам (world_manager - основной клиент из него)
+        self.world_view = MergedWorldView()
         self._main_pid = None
         
+        # Трекер сущностей мира (стабильные хендлы, события появления/исчезновения)
+        self.world_tracker = WorldTracker(self.world_view)
+        
+        # Фоновый скан мира (start_world_ticker): скан и set_clients - под _world_lock
+        self._world_lock = threading.Lock()
+        self._world_requested_at = None
+        self._world_stop = threading.Event()
+        self._world_thread = None
+        
         # Зависимости
         self.ahk_manager = None
         self.app_state = None
@@ -29,6 +50,15 @@ class MultiboxManager:
     
         # НОВОЕ: Кеш для REDO телепорта
         self.last_teleport_destination = None  # (x, y, z)
+        
+        # Планы телепорта (готовые адреса + окно, без разрешения оффсетов)
+        self.teleport_planner = TeleportPlanner()
+        
+        # Профили персонажей с прошлых запусков (fly trigger, класс, имя, группа)
+        self.profiles = profiles if profiles is not None else ProfileStore()
+        
+        # Индекс триггер-зон (DUNGEON_POINTS + наборы точек из AppData)
+        self.point_index = PointIndex.load_default()
     
         # НОВОЕ: Кеш группы (обновляется Attack каждые 500ms)
         self.party_cache = {
@@ -50,7 +80,11 @@ class MultiboxManager:
         self.freeze_thread = None
         self.freeze_stop_event = None
         self.freeze_targets = {}
+        
+        # Рабочие процессы (--workers): опрос клиентов и записи Follow / Attack - через WorkerPool
+        self.worker_pool = None
 
+    @metrics.timed('tick.needs_refresh')
     def needs_refresh(self) -> bool:
         """
         Быстрая проверка - нужен ли refresh?
@@ -195,6 +229,8 @@ class MultiboxManager:
 
     def start_follow_freeze(self):
         """Запустить единый поток заморозки для Follow"""
+        if self.worker_pool is not None:
+            return  # заморозка крутится в воркерах
         if self.freeze_thread and self.freeze_thread.is_alive():
             return
         
@@ -222,6 +258,72 @@ class MultiboxManager:
             self.freeze_stop_event.set()
         self.freeze_targets = {}
         self.freeze_thread = None
+        
+        if self.worker_pool is not None:
+            self.worker_pool.submit([(pid, 'unfreeze') for pid in self.characters])
+    
+    # ========================================
+    # РАБОЧИЕ ПРОЦЕССЫ
+    # ========================================
+    
+    def set_worker_pool(self, worker_pool):
+        """
+        Опрашивать клиентов и писать Follow / Attack через WorkerPool (None - в этом процессе)
+        
+        Подключение и смена персонажей (refresh) остаются здесь, пул получает
+        список клиентов после каждого refresh.
+        """
+        self.worker_pool = worker_pool
+        if worker_pool is not None:
+            worker_pool.rebalance(self.characters.keys())
+    
+    def apply_worker_samples(self, samples=None):
+        """
+        Перенести снимки воркеров в CharBase персонажей (вместо char_base.refresh)
+        
+        Returns:
+            dict: {pid: ClientSample}
+        """
+        if samples is None:
+            samples = self.worker_pool.snapshot()
+        
+        for pid, char in list(self.characters.items()):
+            sample = samples.get(pid)
+            cb = char.char_base
+            if sample is None or sample.char_id != cb.char_id:
+                continue  # еще не опрошен / сменился персонаж (увидит refresh)
+            
+            cb.char_hp = sample.hp
+            cb.char_max_hp = sample.max_hp
+            if math.isnan(sample.x):
+                cb.char_pos_x = cb.char_pos_y = cb.char_pos_z = None
+            else:
+                cb.char_pos_x, cb.char_pos_y, cb.char_pos_z = sample.x, sample.y, sample.z
+            cb.target_id = sample.target_id
+            cb.fly_status = sample.fly_status
+            cb.fly_speed = sample.fly_speed
+            cb.fly_speed_z = sample.fly_speed_z
+        
+        return samples
+    
+    def _leader_and_group_from_samples(self, active_char):
+        """get_leader_and_group по снимкам воркеров (party_leader_id уже в снимке)"""
+        samples = self.apply_worker_samples()
+        sample = samples.get(active_char.pid)
+        if sample is None or not sample.party_leader_id:
+            if sample is not None:
+                active_char.remember_party(0)
+            return active_char, [active_char]
+        
+        leader_id = sample.party_leader_id
+        group_members = []
+        for char in self.get_all_characters():
+            char_sample = samples.get(char.pid)
+            if char_sample is not None and char_sample.party_leader_id == leader_id:
+                group_members.append(char)
+                char.remember_party(leader_id)
+        
+        return active_char, group_members
 
     def set_ahk_manager(self, ahk_manager):
         """Установить AHK менеджер"""
@@ -237,23 +339,7 @@ class MultiboxManager:
     
     def _get_all_pids(self, process_name="ElementClient.exe"):
         """Получить список всех PID процесса"""
-        snapshot = self.kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
-        pe32 = PROCESSENTRY32()
-        pe32.dwSize = ctypes.sizeof(PROCESSENTRY32)
-        
-        pids = []
-        
-        if self.kernel32.Process32First(snapshot, ctypes.byref(pe32)):
-            while True:
-                current_name = pe32.szExeFile.decode('utf-8', errors='ignore')
-                if current_name.lower() == process_name.lower():
-                    pids.append(pe32.th32ProcessID)
-                
-                if not self.kernel32.Process32Next(snapshot, ctypes.byref(pe32)):
-                    break
-        
-        self.kernel32.CloseHandle(snapshot)
-        return pids
+        return self.backend.list_pids(process_name)
     
     def validate_all(self):
         """Быстрая проверка валидности всех персонажей"""
@@ -267,6 +353,7 @@ class MultiboxManager:
         for pid in to_remove:
             del self.characters[pid]
     
+    @metrics.timed('tick.refresh')
     def refresh(self):
         """Полное обновление списка персонажей"""
         current_pids = set(self._get_all_pids())
@@ -289,10 +376,6 @@ class MultiboxManager:
                 logging.warning(f"⚠️ Failed to close memory for PID {pid}: {e}")
             
             del self.characters[pid]
-            
-            if pid == self._main_pid:
-                self.world_manager = None
-                self._main_pid = None
         
         # НОВОЕ: Удаляем персонажей с невалидным char_id (выход на выбор персонажа)
         to_remove = []
@@ -357,7 +440,7 @@ class MultiboxManager:
                 del self.characters[pid]
                 continue
             
-            new_char = Character(pid, old_char.memory, char_base)
+            new_char = Character(pid, old_char.memory, char_base, self.profiles)
             new_char.manager = self
             self.characters[pid] = new_char
             
@@ -366,8 +449,8 @@ class MultiboxManager:
         
         # Добавляем новые процессы
         for pid in current_pids - existing_pids:
-            mem = Memory()
-            if mem.attach_by_pid(pid):
+            mem = self.backend.attach(pid)
+            if mem is not None:
                 char_base = CharBase(mem)
 
                 # ПРОВЕРКА ВАЛИДНОСТИ ДО ДОБАВЛЕНИЯ
@@ -377,17 +460,22 @@ class MultiboxManager:
                     continue
 
                 logging.info(f"DEBUG PID={pid}: char_origin={hex(char_base.cache.get('char_origin', 0))}, char_base={hex(char_base.cache.get('char_base', 0))}")
-                char = Character(pid, mem, char_base)
+                char = Character(pid, mem, char_base, self.profiles)
                 char.manager = self
                 self.characters[pid] = char
                 
-                if self._main_pid is None:
-                    self._main_pid = pid
-                    self.world_manager = WorldManager(mem)
-                
                 char_name = char_base.char_name if char_base.char_name else "???"
                 logging.info(f"✅ New character added: PID={pid}, Name={repr(char_name)}")
         
+        # Обновляем клиентов вида мира (основной клиент переключается сразу)
+        self._update_world_view()
+        
+        if self.worker_pool is not None:
+            self.worker_pool.rebalance(self.characters.keys())
+        
+        # Планы телепорта закрытых окон больше не нужны
+        self.teleport_planner.retain(self.characters)
+        
         # Обновляем мапу pid↔char_id
         if self.app_state:
             self.app_state.update_pid_char_id_map(self.get_all_characters())
@@ -403,6 +491,98 @@ class MultiboxManager:
                 logging.info(f"🚪 Last active character (PID {active_pid}) removed, clearing")
                 self.app_state.last_active_character = None
                 
+    def _update_world_view(self):
+        """Синхронизировать MergedWorldView с подключенными клиентами"""
+        with self._world_lock:
+            self.world_view.set_clients({pid: char.memory for pid, char in self.characters.items()})
+    
+    @property
+    def world_manager(self):
+        """WorldManager основного клиента (если он закрылся - сразу следующий живой)"""
+        self._main_pid, manager = self.world_view.primary()
+        return manager
+    
+    def world_tick(self):
+        """
+        Обновить объединенный вид мира (лут и игроки всех клиентов)
+        
+        Подписки на появление/исчезновение - через
+        self.world_tracker.loot.on_spawn(...) / .people.on_despawn(...)
+        
+        Returns:
+            (loot_delta, people_delta): TrackerDelta с хендлами изменений
+        """
+        with self._world_lock:
+            return self.world_tracker.tick()
+    
+    def request_world(self):
+        """Вид мира кому-то нужен (API, state ring) - тикать еще WORLD_DEMAND_TIMEOUT"""
+        self._world_requested_at = time.monotonic()
+    
+    def world_wanted(self) -> bool:
+        """Есть потребитель вида мира: подписчик трекеров или недавний запрос"""
+        if self.world_tracker.has_subscribers():
+            return True
+        requested_at = self._world_requested_at
+        return requested_at is not None and time.monotonic() - requested_at < WORLD_DEMAND_TIMEOUT / 1000.0
+    
+    def start_world_ticker(self, call_soon):
+        """
+        Сканировать мир в фоновом потоке (только пока world_wanted())
+        
+        Args:
+            call_soon: поставить fn() в очередь потока владельца
+                       (root.after(0, fn) / scheduler.after(0, fn)) - там
+                       обновляются трекеры и вызываются подписчики
+        """
+        if self._world_thread is not None:
+            return
+        self._world_stop.clear()
+        self._world_thread = threading.Thread(
+            target=self._world_loop, args=(call_soon,), name="world-tick", daemon=True
+        )
+        self._world_thread.start()
+    
+    def stop_world_ticker(self):
+        """Остановить фоновый скан мира"""
+        self._world_stop.set()
+        if self._world_thread is not None:
+            self._world_thread.join(timeout=2)
+            self._world_thread = None
+    
+    def _world_loop(self, call_soon):
+        interval = WORLD_TICK_INTERVAL / 1000.0
+        applied = threading.Event()
+        
+        def apply():
+            try:
+                self.world_tracker.update()
+            except Exception as e:
+                logging.error(f"Error in world tracker update: {e}")
+            finally:
+                applied.set()
+        
+        while not self._world_stop.wait(interval):
+            if not self.world_wanted():
+                continue
+            
+            try:
+                with self._world_lock:
+                    self.world_tracker.scan()
+            except Exception as e:
+                logging.error(f"Error in world tick: {e}")
+                continue
+            
+            applied.clear()
+            try:
+                call_soon(apply)
+            except Exception:
+                return  # поток владельца уже завершен
+            # Следующий скан - только после того, как трекеры прочитали индексы
+            while not applied.wait(interval):
+                if self._world_stop.is_set():
+                    return
+    
     def refresh_characters(self):
         """Алиас для refresh()"""
         self.refresh()
@@ -457,6 +637,9 @@ class MultiboxManager:
                 self.app_state.last_active_character = None
             return None, []
         
+        if self.worker_pool is not None:
+            return self._leader_and_group_from_samples(active_char)
+        
         active_char_id = active_char.char_base.char_id
         
         # Читаем party_ptr активного персонажа
@@ -468,6 +651,7 @@ class MultiboxManager:
         
         # Нет группы - возвращаем только активное окно
         if not party_ptr or party_ptr == 0:
+            active_char.remember_party(0)
             return active_char, [active_char]
         
         active_char.char_base.cache["party_ptr"] = party_ptr
@@ -511,10 +695,31 @@ class MultiboxManager:
             # Если лидер совпадает - добавляем в группу
             if char_party_leader_id == party_leader_id:
                 group_members.append(char)
+                char.remember_party(party_leader_id)
         
         # Возвращаем активное окно как "лидера" и всю группу
         return active_char, group_members
 
+    def _update_party_cache(self):
+        """Перечитать лидера и группу активного окна в party_cache"""
+        import time
+
+        leader, members = self.get_leader_and_group()
+        self.party_cache['timestamp'] = time.time()
+        self.party_cache['leader'] = leader
+        self.party_cache['members'] = members
+        self.party_cache['member_info'] = {}
+        return self.party_cache
+
+    def _get_party_cache(self, max_age: float = 0.5):
+        """party_cache, если не старше max_age секунд (иначе перечитать)"""
+        import time
+
+        timestamp = self.party_cache['timestamp']
+        if timestamp is None or time.time() - timestamp > max_age:
+            return self._update_party_cache()
+        return self.party_cache
+
     # ===================================================
     # ТИПОВЫЕ ФУНКЦИИ ТЕЛЕПОРТАЦИИ (С ПРОВЕРКОЙ ЛИЦЕНЗИИ)
     # ===================================================
@@ -529,23 +734,20 @@ class MultiboxManager:
             send_space: нужно ли нажать space после телепорта
         
         Returns:
-            bool: всегда True (проверок нет)
+            bool: True если координаты записаны
         """
         if not character or not character.is_valid():
             return False
         
-        # Записываем координаты (БЕЗ ПРОВЕРОК)
-        character.char_base.set_position(target_x, target_y, target_z)
-        
-        # Нажимаем space если нужно (ОДИНОЧНЫЙ)
-        if send_space and self.ahk_manager:
-            # ИСПРАВЛЕНО: Передаем PID персонажа
-            self.ahk_manager.send_key('space', target_pids=[character.pid])
+        # Быстрый путь: координаты и space по готовому плану
+        teleported = self.teleport_planner.execute(
+            [character], target_x, target_y, target_z, send_space, self.ahk_manager
+        )
         
         # НОВОЕ: Проверка лицензии в конце
         self._check_license_expiry()
         
-        return True
+        return bool(teleported)
     
     def teleport_group(self, characters, target_x, target_y, target_z, send_space=False):
         """
@@ -562,25 +764,15 @@ class MultiboxManager:
         if not characters:
             return 0
         
-        success_count = 0
-        teleported_pids = []  # НОВОЕ: Собираем PIDs успешно телепортированных
-        
-        # Записываем координаты всем (БЕЗ ПРОВЕРОК)
-        for char in characters:
-            if char.is_valid():
-                char.char_base.set_position(target_x, target_y, target_z)
-                success_count += 1
-                teleported_pids.append(char.pid)  # НОВОЕ
-        
-        # Нажимаем space ВСЕМ СРАЗУ если нужно (МАССОВЫЙ)
-        if send_space and success_count > 0 and self.ahk_manager:
-            # ИСПРАВЛЕНО: Передаем список PIDs
-            self.ahk_manager.send_key('space', target_pids=teleported_pids)
+        # Быстрый путь: координаты всем по планам, затем МАССОВЫЙ space
+        teleported_pids = self.teleport_planner.execute(
+            characters, target_x, target_y, target_z, send_space, self.ahk_manager
+        )
         
         # НОВОЕ: Проверка лицензии в конце
         self._check_license_expiry()
         
-        return success_count
+        return len(teleported_pids)
     
     def _check_license_expiry(self):
         """
@@ -655,21 +847,22 @@ class MultiboxManager:
             if member.char_base.char_id == leader.char_base.char_id:
                 continue
             
-            member.char_base.refresh()
-            member_x = member.char_base.char_pos_x
-            member_y = member.char_base.char_pos_y
-            member_z = member.char_base.char_pos_z
+            # Координаты одним чтением по плану телепорта
+            plan = self.teleport_planner.get_plan(member, self.ahk_manager)
+            member_pos = plan.read_position(member.memory) if plan else None
             
-            if member_x is None or member_y is None or member_z is None:
+            if member_pos is None:
                 continue
             
-            distance = math.sqrt(
+            member_x, member_y, member_z = member_pos
+            
+            distance_sq = (
                 (member_x - leader_x)**2 + 
                 (member_y - leader_y)**2 + 
                 (member_z - leader_z)**2
             )
             
-            if distance <= 300:
+            if distance_sq <= 300 * 300:
                 members_to_tp.append(member)
         
         # Телепортируем группу (С МАССОВЫМ SPACE)
@@ -693,11 +886,7 @@ class MultiboxManager:
             return False
         
         # Найти точку по имени
-        point = None
-        for p in DUNGEON_POINTS:
-            if p["name"] == point_name:
-                point = p
-                break
+        point = self.point_index.get_by_name(point_name)
         
         if not point:
             logging.error(f"TP to {point_name}: Point not found")
@@ -738,6 +927,7 @@ class MultiboxManager:
     # Работает только для окон в пати, с лидером
     # ===================================================
     
+    @metrics.timed('tick.follow')
     def follow_leader(self):
         """Follow с единым потоком заморозки"""
         cache = self._get_party_cache()
@@ -748,6 +938,10 @@ class MultiboxManager:
         if not leader or len(members) <= 1:
             return 0
         
+        if self.worker_pool is not None:
+            # Опрос и заморозка - в воркерах, здесь только план
+            return self.worker_pool.follow(leader.pid, [member.pid for member in members])
+        
         leader.char_base.refresh()
         
         # Проверка: fly_status == 2
@@ -769,7 +963,7 @@ class MultiboxManager:
         if leader_z is None:
             return 0
         
-        print(f"\n[FOLLOW] Лидер={leader.char_base.char_name} Z={leader_z:.1f}")
+        logging.debug("[FOLLOW] Лидер=%s Z=%.1f", leader.char_base.char_name, leader_z)
 
         for member in members:
             # Пропускаем лидера
@@ -782,7 +976,8 @@ class MultiboxManager:
             member_fly_speed = member.char_base.fly_speed
             
             if member_z is None or member_fly_speed is None:
-                print(f"  {member.char_base.char_name}: нет данных")
+                if metrics.enabled:
+                    metrics.incr('follow.no_data')
                 continue
             
             z_diff = member_z - leader_z
@@ -801,7 +996,10 @@ class MultiboxManager:
                     'value': target_speed_z
                 }
                 
-                print(f"  {member.char_base.char_name} (PID={member.pid}): diff={z_diff:+.1f}м → заморожен на {target_speed_z:+.1f} @ {hex(fly_speed_z_address)}")
+                if metrics.enabled:
+                    metrics.incr('follow.frozen')
+                logging.debug("  %s (PID=%s): diff=%+.1fм → заморожен на %+.1f",
+                              member.char_base.char_name, member.pid, z_diff, target_speed_z)
             else:
                 # Убираем из заморозки
                 if member.pid in self.freeze_targets:
@@ -809,9 +1007,8 @@ class MultiboxManager:
                 
                 # Ставим 0
                 member.char_base.set_fly_speed_z(0)
-                print(f"  {member.char_base.char_name}: OK (diff={z_diff:+.1f}м)")
-        
-        print(f"  Активных заморозок: {len(self.freeze_targets)}")
+                if metrics.enabled:
+                    metrics.incr('follow.aligned')
         
         return len(self.freeze_targets)
             
@@ -820,6 +1017,7 @@ class MultiboxManager:
     # ===================================================
     
 
+    @metrics.timed('tick.attack')
     def set_attack_target(self):
         """
         Установить таргет лидера всем окнам (ИСПОЛЬЗУЕТ КЕШ)
@@ -836,13 +1034,21 @@ class MultiboxManager:
         if not leader or len(members) <= 1:
             return 0
         
-        # Читаем target_id у лидера
-        leader.char_base.refresh()
+        # Читаем target_id у лидера (с воркерами - уже из снимка)
+        if self.worker_pool is None:
+            leader.char_base.refresh()
         leader_target_id = leader.char_base.target_id
         
         if not leader_target_id or leader_target_id == 0:
             return 0
         
+        if self.worker_pool is not None:
+            plan = [(char.pid, 'target_id', leader_target_id) for char in members if char.pid != leader.pid]
+            self.worker_pool.submit(plan)
+            if plan:
+                logging.info(f"⚔️ Attack: set target {leader_target_id} to {len(plan)} windows")
+            return len(plan)
+        
         # Устанавливаем target_id ВСЕМ окнам (кроме лидера)
         success_count = 0
         
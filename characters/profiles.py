@@ -0,0 +1,107 @@
+"""
+Профили персонажей между перезапусками
+Что уже известно о персонаже (fly trigger, класс, имя, последняя группа) - по char_id
+
+Загрузка - один раз при первом обращении, запись - в фоне
+(изменения за PROFILES_DEBOUNCE секунд сливаются, файл пишется атомарно)
+"""
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+
+from core.debounced_writer import DebouncedWriter
+
+PROFILES_FILE = Path.home() / "AppData" / "Local" / "xvocmuk" / "profiles.json"
+
+# Окно объединения записей (секунды)
+PROFILES_DEBOUNCE = 2.0
+
+
+class ProfileStore:
+    """
+    Хранилище профилей {char_id: {...}}
+
+    Поля профиля:
+        name, char_class       - статические данные (сверяются при подключении)
+        fly_trigger_states     - {'on': int, 'off': int}
+        party_leader_id        - лидер последней группы (0 - без группы)
+        updated_at             - время последнего изменения (unix)
+    """
+
+    def __init__(self, path: Path = PROFILES_FILE):
+        self.path = Path(path)
+        self.profiles = None  # {str(char_id): dict}, None - еще не загружено
+
+        self._lock = threading.Lock()
+        self._writer = DebouncedWriter(
+            self.path, self._snapshot, PROFILES_DEBOUNCE,
+            name="profiles-writer", label="character profiles"
+        )
+
+    def _ensure_loaded(self):
+        """Прочитать файл (под блокировкой, один раз)"""
+        if self.profiles is not None:
+            return
+
+        self.profiles = {}
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self.profiles = {key: value for key, value in data.items() if isinstance(value, dict)}
+            logging.info(f"📇 Loaded {len(self.profiles)} character profiles")
+        except Exception as e:
+            logging.warning(f"⚠️ Character profiles unreadable, starting empty: {e}")
+
+    def get(self, char_id) -> dict:
+        """Копия профиля (пустой dict если персонаж еще не встречался)"""
+        if not char_id:
+            return {}
+        with self._lock:
+            self._ensure_loaded()
+            return dict(self.profiles.get(str(char_id), {}))
+
+    def update(self, char_id, **fields) -> bool:
+        """
+        Обновить поля профиля (запись на диск - в фоне)
+
+        Returns:
+            bool: True если что-то изменилось
+        """
+        if not char_id:
+            return False
+
+        with self._lock:
+            self._ensure_loaded()
+            profile = self.profiles.setdefault(str(char_id), {})
+
+            changed = False
+            for name, value in fields.items():
+                if profile.get(name) != value:
+                    profile[name] = value
+                    changed = True
+
+            if not changed:
+                return False
+            profile['updated_at'] = int(time.time())
+
+        self._writer.mark_dirty()
+        return True
+
+    def _snapshot(self) -> str:
+        """Текст файла профилей (из потока записи)"""
+        with self._lock:
+            return json.dumps(self.profiles, ensure_ascii=False, indent=1, default=str)
+
+    def flush(self):
+        """Записать несохраненные изменения сейчас"""
+        self._writer.flush()
+
+    def close(self):
+        """Остановить фоновую запись и дописать изменения (при выходе)"""
+        self._writer.close()
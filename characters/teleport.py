@@ -0,0 +1,167 @@
+"""
+Планы телепорта - быстрый путь без разрешения оффсетов
+План строится один раз на персонажа и живет, пока не сменилось поколение CharBase
+"""
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+from core.metrics import metrics
+from game.structs import CHAR_POS_BLOCK, CHAR_POS_BLOCK_OFFSET
+
+# Сколько последних замеров латентности хранить
+TELEPORT_LATENCY_HISTORY = 200
+
+
+@dataclass
+class TeleportPlan:
+    """Готовый к исполнению план телепорта одного персонажа"""
+    pid: int
+    generation: int           # CharBase.generation на момент построения
+    char_base: int            # адрес char_base
+    position_address: int     # начало блока координат (y, z, x)
+    window: Optional[object]  # окно AHK для нажатия клавиш (None - окно не найдено)
+
+    def is_valid_for(self, character) -> bool:
+        """План актуален для персонажа (без чтения памяти)"""
+        char_base = character.char_base
+        return (
+            self.pid == character.pid
+            and self.generation == char_base.generation
+            and self.char_base == char_base.cache.get("char_base")
+        )
+
+    def write_position(self, memory, x, y, z) -> bool:
+        """Записать координаты одним 12-байтовым вызовом"""
+        return memory.write_block(self.position_address, CHAR_POS_BLOCK.pack(y, z, x))
+
+    def read_position(self, memory):
+        """Прочитать (x, y, z) одним 12-байтовым вызовом"""
+        data = memory.read_bytes(self.position_address, CHAR_POS_BLOCK.size)
+        if data is None:
+            return None
+        y, z, x = CHAR_POS_BLOCK.unpack(data)
+        return (x, y, z)
+
+
+class TeleportPlanner:
+    """Кеш планов по PID + замеры латентности телепорта"""
+
+    def __init__(self):
+        self.plans = {}  # {pid: TeleportPlan}
+        self.latencies_ms = deque(maxlen=TELEPORT_LATENCY_HISTORY)
+
+    def get_plan(self, character, ahk_manager=None) -> Optional[TeleportPlan]:
+        """
+        Получить план персонажа (построить, если нет или устарел)
+
+        Returns:
+            TeleportPlan или None если char_base неизвестен
+        """
+        plan = self.plans.get(character.pid)
+        if plan is not None and plan.is_valid_for(character):
+            # Окно могло появиться в кеше AHK позже построения плана
+            if plan.window is None and ahk_manager:
+                plan.window = ahk_manager.get_window(character.pid)
+            return plan
+
+        char_base = character.char_base.cache.get("char_base")
+        if not char_base:
+            character.char_base.refresh()
+            char_base = character.char_base.cache.get("char_base")
+            if not char_base:
+                self.plans.pop(character.pid, None)
+                return None
+
+        window = ahk_manager.get_window(character.pid) if ahk_manager else None
+
+        plan = TeleportPlan(
+            pid=character.pid,
+            generation=character.char_base.generation,
+            char_base=char_base,
+            position_address=char_base + CHAR_POS_BLOCK_OFFSET,
+            window=window,
+        )
+        self.plans[character.pid] = plan
+        logging.debug(f"🧭 Teleport plan built: PID={character.pid}, gen={plan.generation}")
+        return plan
+
+    def invalidate(self, pid=None):
+        """Сбросить план одного персонажа или все"""
+        if pid is None:
+            self.plans.clear()
+        else:
+            self.plans.pop(pid, None)
+
+    def retain(self, pids):
+        """Оставить планы только для указанных PID (закрытые окна удаляются)"""
+        for pid in list(self.plans):
+            if pid not in pids:
+                del self.plans[pid]
+
+    def execute(self, characters, x, y, z, send_space, ahk_manager=None):
+        """
+        Телепортировать персонажей по планам
+
+        Returns:
+            list[int]: PIDs, которым записаны координаты
+        """
+        start = time.perf_counter()
+
+        teleported = []
+        windows = {}  # {pid: окно из плана}
+        missing_window_pids = []
+
+        for character in characters:
+            if not character.is_valid():
+                continue
+
+            plan = self.get_plan(character, ahk_manager)
+            if plan is None:
+                continue
+
+            if not plan.write_position(character.memory, x, y, z):
+                # Адрес стал недоступен - план перестроится в следующий раз
+                self.invalidate(character.pid)
+                continue
+
+            teleported.append(character.pid)
+            if plan.window is not None:
+                windows[character.pid] = plan.window
+            else:
+                missing_window_pids.append(character.pid)
+
+        if send_space and teleported and ahk_manager:
+            failed = ahk_manager.send_key_to_windows('space', list(windows.values())) if windows else []
+            if failed:
+                # Устаревшие окна - сбрасываем их планы и идем медленным путем только для них
+                failed_ids = {id(window) for window in failed}
+                for pid, window in windows.items():
+                    if id(window) in failed_ids:
+                        self.invalidate(pid)
+                        missing_window_pids.append(pid)
+            if missing_window_pids:
+                ahk_manager.send_key('space', target_pids=missing_window_pids)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self.latencies_ms.append(elapsed_ms)
+        if metrics.enabled:
+            metrics.observe('teleport.execute', elapsed_ms)
+        return teleported
+
+    def get_latency_stats(self) -> dict:
+        """Статистика латентности телепорта (мс): count, last, p50, p95, max"""
+        if not self.latencies_ms:
+            return {'count': 0}
+
+        ordered = sorted(self.latencies_ms)
+        count = len(ordered)
+        return {
+            'count': count,
+            'last': self.latencies_ms[-1],
+            'p50': ordered[count // 2],
+            'p95': ordered[min(count - 1, int(count * 0.95))],
+            'max': ordered[-1],
+        }
@@ -0,0 +1,404 @@
+"""
+Режим рабочих процессов: клиент (или шард клиентов) на процесс
+Воркер сам держит Memory, опрашивает своих клиентов и публикует компактные
+снимки в multiprocessing.shared_memory; записи (телепорт, таргет, заморозка
+fly_speed_z) получает планами через очередь.
+
+Координатор (WorkerPool) не читает память сам: snapshot() - копия последних
+снимков всех шардов, submit() - план записей, follow() - Follow по снимкам
+(заморозка крутится в воркере, без потока в основном процессе).
+
+Опрос в воркерах не делит GIL с Tk, хуками и заморозкой координатора;
+замер против однопроцессного режима - python -m benchmarks workers.
+
+Headless с --workers N подключает пул к MultiboxManager (set_worker_pool):
+подключение клиентов остается в координаторе, Follow / Attack и кадры
+state ring берут данные из snapshot(), записи уходят через submit() / follow().
+"""
+import logging
+import multiprocessing
+import os
+import queue
+import struct
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+# Снимок одного клиента (фиксированный размер)
+SAMPLE_FIELDS = (
+    'pid', 'char_id', 'char_class', 'hp', 'max_hp',
+    'x', 'y', 'z', 'target_id', 'fly_status', 'fly_speed', 'fly_speed_z',
+    'party_leader_id', 'sampled_at', 'name',
+)
+SAMPLE = struct.Struct('<iiiiifffIiffid64s')
+ClientSample = namedtuple('ClientSample', SAMPLE_FIELDS)
+
+# Заголовок шарда: seq (нечетный - идет запись), count, pid воркера, тиков всего
+SHARD_HEADER = struct.Struct('<QIIQ')
+MAX_SHARD_CLIENTS = 64
+
+WORKER_INTERVAL_MS = 50
+
+# Операции плана записи: (pid, op, *args)
+PLAN_OPS = ('position', 'target_id', 'fly_speed_z', 'freeze_fly_speed_z', 'unfreeze')
+
+
+def make_backend(spec):
+    """
+    Backend по описанию (описание передается в воркер, сам backend - нет)
+
+    ('win32',) - настоящие клиенты; ('simulated', count, party_size, seed) - симуляция
+    """
+    kind = spec[0]
+    if kind == 'win32':
+        from game.memory import Win32Backend
+        return Win32Backend()
+    if kind == 'simulated':
+        from game.simulated import SimulatedBackend
+        return SimulatedBackend.fleet(*spec[1:])
+    raise ValueError(f"unknown backend: {spec}")
+
+
+def _nz(value, default=0):
+    return default if value is None else value
+
+
+class _ShardWorker:
+    """Состояние внутри процесса воркера"""
+
+    def __init__(self, shard_id, backend_spec, shm_name, commands, events, interval_ms):
+        from game.structs import CharBase
+
+        self._char_base_cls = CharBase
+        self.shard_id = shard_id
+        self.backend = make_backend(backend_spec)
+        self.simulated = backend_spec[0] == 'simulated'
+        self.shm = shared_memory.SharedMemory(name=shm_name)
+        self.commands = commands
+        self.events = events
+        self.interval = interval_ms / 1000.0
+
+        self.clients = {}   # {pid: CharBase}
+        self.freeze = {}    # {pid: fly_speed_z}
+        self.seq = 0
+        self.ticks = 0
+        self.running = True
+
+    def attach(self, pids):
+        for pid in pids:
+            if pid in self.clients or len(self.clients) >= MAX_SHARD_CLIENTS:
+                continue
+            memory = self.backend.attach(pid)
+            char_base = self._char_base_cls(memory) if memory is not None else None
+            ok = char_base is not None and char_base.is_valid()
+            if ok:
+                self.clients[pid] = char_base
+            elif memory is not None:
+                memory.close()
+            self.events.put(('attached', self.shard_id, pid, ok))
+
+    def detach(self, pids):
+        for pid in pids:
+            char_base = self.clients.pop(pid, None)
+            self.freeze.pop(pid, None)
+            if char_base is not None:
+                char_base.memory.close()
+
+    def apply(self, plan):
+        for pid, op, *args in plan:
+            char_base = self.clients.get(pid)
+            if char_base is None:
+                continue
+            if op == 'position':
+                char_base.set_position(*args)
+            elif op == 'target_id':
+                char_base.set_target_id(*args)
+            elif op == 'fly_speed_z':
+                self.freeze.pop(pid, None)
+                char_base.set_fly_speed_z(*args)
+            elif op == 'freeze_fly_speed_z':
+                self.freeze[pid] = args[0]
+            elif op == 'unfreeze':
+                self.freeze.pop(pid, None)
+
+    def handle(self, command):
+        kind = command[0]
+        if kind == 'plan':
+            self.apply(command[1])
+        elif kind == 'attach':
+            self.attach(command[1])
+        elif kind == 'detach':
+            self.detach(command[1])
+        elif kind == 'stop':
+            self.running = False
+
+    def _drain_commands(self):
+        while True:
+            try:
+                self.handle(self.commands.get_nowait())
+            except queue.Empty:
+                return
+
+    def _sample(self, char_base):
+        from game.offsets import OFFSETS, resolve_offset
+
+        char_base.refresh()
+        leader_id = 0
+        party_ptr = resolve_offset(char_base.memory, OFFSETS["party_ptr"], char_base.cache)
+        if party_ptr:
+            char_base.cache["party_ptr"] = party_ptr
+            leader_id = _nz(resolve_offset(char_base.memory, OFFSETS["party_leader_id"], char_base.cache))
+
+        name = (char_base.char_name or "").encode('utf-16-le')[:64]
+        return (
+            _nz(char_base.char_id), _nz(char_base.char_class), _nz(char_base.char_hp), _nz(char_base.char_max_hp),
+            _nz(char_base.char_pos_x, float('nan')), _nz(char_base.char_pos_y, float('nan')),
+            _nz(char_base.char_pos_z, float('nan')),
+            _nz(char_base.target_id), _nz(char_base.fly_status, -1),
+            _nz(char_base.fly_speed, 0.0), _nz(char_base.fly_speed_z, 0.0),
+            leader_id, time.time(), name,
+        )
+
+    def publish(self):
+        """Опросить клиентов и записать снимок (seqlock: нечетный seq - запись идет)"""
+        rows = []
+        for pid, char_base in list(self.clients.items()):
+            if not char_base.memory.is_valid():
+                self.detach([pid])
+                self.events.put(('lost', self.shard_id, pid, False))
+                continue
+            rows.append((pid,) + self._sample(char_base))
+
+        buf = self.shm.buf
+        self.seq += 1
+        SHARD_HEADER.pack_into(buf, 0, self.seq, len(rows), os.getpid(), self.ticks)
+        offset = SHARD_HEADER.size
+        for row in rows:
+            SAMPLE.pack_into(buf, offset, *row)
+            offset += SAMPLE.size
+        self.ticks += 1
+        self.seq += 1
+        SHARD_HEADER.pack_into(buf, 0, self.seq, len(rows), os.getpid(), self.ticks)
+
+    def run(self):
+        next_tick = time.monotonic()
+        last_freeze = 0.0
+        while self.running:
+            self._drain_commands()
+
+            now = time.monotonic()
+            # Заморозка fly_speed_z (как поток Follow, раз в 50ms)
+            if self.freeze and now - last_freeze >= 0.05:
+                for pid, value in list(self.freeze.items()):
+                    char_base = self.clients.get(pid)
+                    if char_base is not None:
+                        char_base.set_fly_speed_z(value)
+                last_freeze = now
+
+            if now >= next_tick:
+                if self.simulated:
+                    self.backend.step(max(self.interval, 0.01), pids=self.clients.keys())
+                self.publish()
+                next_tick = max(next_tick + self.interval, now) if self.interval else now
+
+            delay = next_tick - time.monotonic()
+            if self.freeze:
+                delay = min(delay, 0.05)
+            if delay > 0:
+                try:
+                    self.handle(self.commands.get(timeout=delay))
+                except queue.Empty:
+                    pass
+
+        self.detach(list(self.clients))
+        self.shm.close()
+
+
+def _worker_main(shard_id, backend_spec, base_address, shm_name, commands, events, interval_ms):
+    """Точка входа процесса воркера"""
+    # spawn: модули импортируются заново - базовый адрес из конфига нужно повторить
+    from game.offsets import set_base_address
+    set_base_address(base_address)
+
+    worker = _ShardWorker(shard_id, backend_spec, shm_name, commands, events, interval_ms)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        events.put(('stopped', shard_id, worker.ticks, True))
+
+
+class WorkerPool:
+    """
+    Координатор воркеров
+
+    - start(pids) - запустить шарды и раздать клиентов (round-robin)
+    - rebalance(pids) - подключить новые / отключить закрытые
+    - snapshot() -> {pid: ClientSample}
+    - submit(plan) - [(pid, op, *args)], op из PLAN_OPS
+    - follow(leader_pid, member_pids) - Follow по снимкам
+    - stop()
+    """
+
+    def __init__(self, backend_spec=('win32',), shards: int = None, interval_ms: int = WORKER_INTERVAL_MS,
+                 base_address: str = None):
+        """
+        Args:
+            backend_spec: описание backend (см. make_backend)
+            shards: число процессов (по умолчанию - по ядрам, минимум 1)
+            interval_ms: период опроса в воркере (0 - без паузы)
+            base_address: базовый адрес для воркеров (по умолчанию - текущий в game.offsets)
+        """
+        if base_address is None:
+            from game.offsets import get_base_address
+            base_address = get_base_address()
+
+        self.backend_spec = tuple(backend_spec)
+        self.base_address = base_address
+        self.shard_count = max(1, shards or (os.cpu_count() or 2) - 1)
+        self.interval_ms = interval_ms
+
+        self._ctx = multiprocessing.get_context('spawn')  # как на Windows
+        self.events = self._ctx.Queue()
+        self.shards = []   # [{'process', 'commands', 'shm'}]
+        self.owner = {}    # {pid: номер шарда}
+        self._next_shard = 0
+
+    def start(self, pids=()):
+        size = SHARD_HEADER.size + MAX_SHARD_CLIENTS * SAMPLE.size
+        for shard_id in range(self.shard_count):
+            shm = shared_memory.SharedMemory(create=True, size=size)
+            shm.buf[:SHARD_HEADER.size] = bytes(SHARD_HEADER.size)
+            commands = self._ctx.Queue()
+            process = self._ctx.Process(
+                target=_worker_main,
+                args=(shard_id, self.backend_spec, self.base_address, shm.name, commands, self.events,
+                      self.interval_ms),
+                name=f"client-worker-{shard_id}",
+                daemon=True,
+            )
+            process.start()
+            self.shards.append({'process': process, 'commands': commands, 'shm': shm})
+
+        logging.info(f"🧵 Worker pool: {self.shard_count} processes")
+        self.rebalance(pids)
+
+    def rebalance(self, pids):
+        """Подключить новые pid, отключить пропавшие"""
+        pids = set(pids)
+        gone = [pid for pid in self.owner if pid not in pids]
+        new = [pid for pid in pids if pid not in self.owner]
+
+        by_shard = {}
+        for pid in gone:
+            by_shard.setdefault(self.owner.pop(pid), []).append(pid)
+        for shard_id, shard_pids in by_shard.items():
+            self.shards[shard_id]['commands'].put(('detach', shard_pids))
+
+        by_shard = {}
+        for pid in sorted(new):
+            shard_id = self._next_shard % self.shard_count
+            self._next_shard += 1
+            self.owner[pid] = shard_id
+            by_shard.setdefault(shard_id, []).append(pid)
+        for shard_id, shard_pids in by_shard.items():
+            self.shards[shard_id]['commands'].put(('attach', shard_pids))
+
+    def wait_attached(self, timeout: float = 30.0) -> dict:
+        """Дождаться ответов на attach: {pid: ok}"""
+        results = {}
+        deadline = time.monotonic() + timeout
+        while len(results) < len(self.owner) and time.monotonic() < deadline:
+            try:
+                kind, _, pid, ok = self.events.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if kind == 'attached':
+                results[pid] = ok
+        return results
+
+    @staticmethod
+    def _read_shard(shm):
+        """Согласованная копия снимка шарда (повтор, если воркер писал во время чтения)"""
+        buf = shm.buf
+        for _ in range(100):
+            seq, count, _, ticks = SHARD_HEADER.unpack_from(buf, 0)
+            if seq % 2:
+                continue
+            data = bytes(buf[SHARD_HEADER.size:SHARD_HEADER.size + count * SAMPLE.size])
+            if SHARD_HEADER.unpack_from(buf, 0)[0] == seq:
+                return ticks, data, count
+        return 0, b'', 0
+
+    def snapshot(self) -> dict:
+        """{pid: ClientSample} по всем шардам"""
+        samples = {}
+        for shard in self.shards:
+            _, data, count = self._read_shard(shard['shm'])
+            for i in range(count):
+                row = SAMPLE.unpack_from(data, i * SAMPLE.size)
+                name = row[-1].decode('utf-16-le', errors='ignore').split('\x00')[0]
+                samples[row[0]] = ClientSample(*row[:-1], name)
+        return samples
+
+    def ticks(self) -> int:
+        """Сколько снимков опубликовано всеми шардами"""
+        return sum(SHARD_HEADER.unpack_from(shard['shm'].buf, 0)[3] for shard in self.shards)
+
+    def submit(self, plan):
+        """Разослать план записей владельцам клиентов"""
+        by_shard = {}
+        for step in plan:
+            shard_id = self.owner.get(step[0])
+            if shard_id is not None:
+                by_shard.setdefault(shard_id, []).append(tuple(step))
+        for shard_id, steps in by_shard.items():
+            self.shards[shard_id]['commands'].put(('plan', steps))
+
+    def follow(self, leader_pid, member_pids, samples: dict = None) -> int:
+        """
+        Follow по снимкам (логика MultiboxManager.follow_leader):
+        лидер летит (fly_status == 2) - участники с разницей высоты > 2
+        замораживаются на ±fly_speed, остальные выравниваются в 0
+
+        Returns:
+            int: сколько участников заморожено
+        """
+        samples = samples if samples is not None else self.snapshot()
+        leader = samples.get(leader_pid)
+        if leader is None:
+            return 0
+
+        plan = []
+        frozen = 0
+        for pid in member_pids:
+            member = samples.get(pid)
+            if pid == leader_pid or member is None:
+                continue
+            if leader.fly_status != 2:
+                plan.append((pid, 'fly_speed_z', 0.0))
+                continue
+
+            z_diff = member.z - leader.z
+            if abs(z_diff) > 2:
+                speed = member.fly_speed if z_diff < 0 else -member.fly_speed
+                plan.append((pid, 'freeze_fly_speed_z', speed))
+                frozen += 1
+            else:
+                plan.append((pid, 'fly_speed_z', 0.0))
+
+        self.submit(plan)
+        return frozen
+
+    def stop(self, timeout: float = 5.0):
+        for shard in self.shards:
+            shard['commands'].put(('stop',))
+        for shard in self.shards:
+            shard['process'].join(timeout)
+            if shard['process'].is_alive():
+                shard['process'].terminate()
+            shard['shm'].close()
+            shard['shm'].unlink()
+        self.shards = []
+        self.owner = {}
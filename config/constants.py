@@ -33,6 +33,18 @@ LOOT_CHECK_RADIUS = 50
 INCREASE_MIN = 0
 INCREASE_MAX = 0
 
+# Объединенный вид мира: сколько клиентов сканировать за один тик
+WORLD_VIEW_MAX_CLIENTS_PER_TICK = 3
+# Точность (метры) для дедупликации лута по позиции между клиентами
+WORLD_VIEW_LOOT_MERGE_PRECISION = 0.5
+# Период обновления объединенного вида мира (ms) - GUI и headless
+WORLD_TICK_INTERVAL = 500
+# Сколько тикать после последнего запроса вида мира (API, state ring), ms
+WORLD_DEMAND_TIMEOUT = 5000
+
+# CharBase: как часто (секунды) перечитывать медленные поля (HP, max HP, fly_speed)
+CHAR_SLOW_REFRESH_INTERVAL = 0.5
+
 # LONG/EXIT точки (локация 243)
 LONG_LEFT_POINT = (355, -66, 281+INCREASE_MAX)      # <- LONG
 LONG_RIGHT_POINT = (270, 330, 288+INCREASE_MAX)     # LONG ->
@@ -1,11 +1,21 @@
 """
 Менеджер настроек приложения
 ОБНОВЛЕНО: Все файлы (settings.json) в AppData
+
+Изменения применяются в памяти сразу, запись на диск - в фоновом потоке:
+несколько изменений за SETTINGS_DEBOUNCE секунд сливаются в одну запись,
+файл пишется атомарно (temp + rename). При выходе - close() (дописать).
 """
 import json
 import logging
 from pathlib import Path
 import sys
+import threading
+
+from core.debounced_writer import DebouncedWriter, atomic_write_text
+
+# Окно объединения записей (секунды)
+SETTINGS_DEBOUNCE = 0.5
 
 class SettingsManager:
     """Менеджер настроек приложения (UI, хоткеи, позиция окна)"""
@@ -24,6 +34,13 @@ class SettingsManager:
         
         logging.info(f"📁 Settings file: {self.settings_file}")
         
+        # Фоновая запись
+        self._lock = threading.Lock()
+        self._writer = DebouncedWriter(
+            self.settings_file, self._snapshot, SETTINGS_DEBOUNCE,
+            name="settings-writer", label="settings"
+        )
+        
         self.settings = self._load_settings()
     
     def _load_settings(self):
@@ -68,17 +85,30 @@ class SettingsManager:
         }
     
     def _save_settings(self, settings):
-        """Сохранить настройки напрямую (внутренний метод)"""
+        """Сохранить настройки атомарно (temp + rename, внутренний метод)"""
         try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, indent=2, ensure_ascii=False)
+            atomic_write_text(self.settings_file, json.dumps(settings, indent=2, ensure_ascii=False))
         except Exception as e:
             logging.error(f"❌ Failed to save settings: {e}")
     
     def save(self):
-        """Сохранить текущие настройки в файл"""
-        self._save_settings(self.settings)
-        logging.info("✅ Settings saved")
+        """Запланировать сохранение (запись в фоне после SETTINGS_DEBOUNCE)"""
+        self._writer.mark_dirty()
+    
+    def _snapshot(self) -> str:
+        """Текст файла настроек (из потока записи)"""
+        with self._lock:
+            return json.dumps(self.settings, indent=2, ensure_ascii=False)
+    
+    def flush(self):
+        """Записать несохраненные изменения сейчас (синхронно)"""
+        if self._writer.flush():
+            logging.info("✅ Settings saved")
+    
+    def close(self):
+        """Остановить фоновую запись и дописать изменения (при выходе)"""
+        if self._writer.close():
+            logging.info("✅ Settings saved")
     
     def get_hotkeys(self) -> dict:
         """Получить хоткеи"""
@@ -86,7 +116,8 @@ class SettingsManager:
     
     def set_hotkeys(self, hotkeys: dict):
         """Установить хоткеи"""
-        self.settings["hotkeys"] = hotkeys
+        with self._lock:
+            self.settings["hotkeys"] = hotkeys
         self.save()
     
     def get_window_position(self) -> dict:
@@ -95,7 +126,8 @@ class SettingsManager:
     
     def set_window_position(self, x: int, y: int):
         """Установить позицию окна"""
-        self.settings["window_position"] = {"x": x, "y": y}
+        with self._lock:
+            self.settings["window_position"] = {"x": x, "y": y}
         self.save()
     
     def is_topmost(self) -> bool:
@@ -104,5 +136,6 @@ class SettingsManager:
     
     def set_topmost(self, topmost: bool):
         """Установить режим поверх всех окон"""
-        self.settings["is_topmost"] = topmost
+        with self._lock:
+            self.settings["is_topmost"] = topmost
         self.save()
\ No newline at end of file
@@ -1,11 +1,24 @@
 """
 Ядро приложения
+
+Классы импортируются лениво (при первом обращении): импорт core.app_hub
+или core.startup на старте не тянет keyboard и остальные подсистемы.
 """
-from core.app_state import AppState
-from core.action_manager import ActionManager, Action
-from core.hotkey_manager import HotkeyManager
-from core.action_limiter import ActionLimiter
-from core.app_hub import AppHub
+import importlib
+
+_EXPORTS = {
+    'AppState': 'core.app_state',
+    'ActionManager': 'core.action_manager',
+    'Action': 'core.action_manager',
+    'HotkeyManager': 'core.hotkey_manager',
+    'ActionLimiter': 'core.action_limiter',
+    'AppHub': 'core.app_hub',
+    'PointIndex': 'core.point_index',
+    'Metrics': 'core.metrics',
+    'metrics': 'core.metrics',
+    'Scheduler': 'core.scheduler',
+    'DebouncedWriter': 'core.debounced_writer',
+}
 
 __all__ = [
     'AppState',
@@ -13,5 +26,19 @@ __all__ = [
     'Action',
     'HotkeyManager',
     'ActionLimiter',
-    'AppHub'
-]
\ No newline at end of file
+    'AppHub',
+    'PointIndex',
+    'Metrics',
+    'metrics',
+    'Scheduler',
+    'DebouncedWriter'
+]
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'core' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
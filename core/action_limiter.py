@@ -1,35 +1,540 @@
 """
 Система лимитов использования экшенов с двойными логами и защитой от читеров
+
+Логи - журнал только на дозапись: одна JSON-запись на строку,
+каждые CHECKPOINT_INTERVAL записей - контрольная точка с хешем головы
+цепочки и счетчиками дня. Запись идет в фоновом потоке.
+
+Рядом с основным логом лежит сводка (app.idx): состояние обоих журналов
+(размер, голова, счетчики) и счетчики по датам МСК. Если журнал не менялся
+с момента записи сводки, старт не читает логи вовсе; полная проверка
+цепочки - необязательная фоновая задача.
 """
 import hashlib
 import json
 import logging
+import os
+import queue
+import threading
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
 # Часовой пояс МСК (UTC+3)
 MSK = timezone(timedelta(hours=3))
 
+# Контрольная точка журнала - каждые N записей
+CHECKPOINT_INTERVAL = 100
+
+# Префикс строк блокировки в основном логе
+BLOCK_PREFIX = "### BLOCK ###"
+
+# Сколько дней хранить в сводке
+SUMMARY_DAYS = 31
+
+# Поиск последней контрольной точки с конца файла - блоками по N байт
+CHECKPOINT_SCAN_BLOCK = 64 * 1024
+_CHECKPOINT_MARKER = b'\n{"checkpoint"'
+
+
+def _read_from_checkpoint(f, size: int):
+    """
+    Хвост файла со строки последней контрольной точки (файл читается с конца блоками)
+
+    Returns:
+        bytes: от начала строки контрольной точки до size; весь файл, если точек нет
+    """
+    marker = _CHECKPOINT_MARKER
+    pos = size
+    tail = b''
+    while pos > 0:
+        step = min(CHECKPOINT_SCAN_BLOCK, pos)
+        pos -= step
+        f.seek(pos)
+        tail = f.read(step) + tail
+        # Новый блок + стык с уже просмотренным (маркер мог попасть на границу)
+        index = tail.rfind(marker, 0, step + len(marker))
+        if index != -1:
+            return tail[index + 1:]
+    return tail
+
+
+def _last_line_start(f, size: int) -> int:
+    """Смещение начала последней строки (файл читается с конца блоками)"""
+    pos = size
+    while pos > 0:
+        step = min(CHECKPOINT_SCAN_BLOCK, pos)
+        pos -= step
+        f.seek(pos)
+        index = f.read(step).rfind(b'\n')
+        if index != -1:
+            return pos + index + 1
+    return 0
+
+
+def compute_chain_hash(data: str, prev_hash: str = "") -> str:
+    """SHA256 звена цепочки: prev_hash:data"""
+    combined = f"{prev_hash}:{data}"
+    return hashlib.sha256(combined.encode()).hexdigest()
+
+
+class UsageJournal:
+    """
+    Состояние одного журнала использований (голова цепочки + счетчики дня)
+
+    Формат строк:
+        {"date": ..., "action_group": ..., "hash": ...}           - использование
+        {"checkpoint": N, "date": ..., "counters": {...},
+         "hash": ..., "check": ...}                                - контрольная точка
+        ### BLOCK ### {...}                                        - блокировка
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.head = ""           # хеш последней записи
+        self.count = 0           # всего записей использования
+        self.last_date = None    # дата последней записи
+        self.day_counters = {}   # {point_type: n} за last_date
+        self.size = 0            # байт файла, отраженных в состоянии
+        self.mtime_ns = None
+        self.tampered = False
+
+    # ========================================
+    # ЗАГРУЗКА
+    # ========================================
+
+    def load(self) -> bool:
+        """
+        Загрузить журнал, проверяя цепочку от последней контрольной точки
+        
+        Читается только хвост от последней контрольной точки
+        (поиск с конца файла), а не весь журнал.
+        
+        Returns:
+            bool: False если цепочка нарушена
+        """
+        self.__init__(self.path)
+        
+        if not self.path.exists():
+            return True
+        
+        try:
+            with open(self.path, 'rb') as f:
+                st = os.fstat(f.fileno())
+                if f.read(64).lstrip().startswith(b'['):
+                    f.seek(0)
+                    return self._migrate_legacy(f.read().decode('utf-8', errors='replace'))
+                if self._repair_tail(f, st.st_size):
+                    st = os.fstat(f.fileno())
+                tail = _read_from_checkpoint(f, st.st_size)
+        except Exception as e:
+            logging.error(f"Failed to read logs: {e}")
+            return True
+        
+        self.size = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+        lines = tail.decode('utf-8', errors='replace').splitlines()
+        
+        # Первая строка хвоста - последняя контрольная точка (если она есть)
+        start = 0
+        if lines and lines[0].startswith('{"checkpoint"'):
+            if not self._apply_checkpoint(lines[0]):
+                return self._mark_tampered()
+            start = 1
+        
+        return self._replay(lines[start:])
+    
+    def resume(self, state: dict) -> bool:
+        """
+        Восстановить состояние из сводки
+
+        Файл не читается, если размер и mtime совпадают со сводкой;
+        если файл только вырос - читается лишь дописанный хвост.
+        Иначе - обычная загрузка от контрольной точки.
+
+        Returns:
+            bool: False если цепочка нарушена
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return self.load()
+
+        try:
+            size = int(state['size'])
+            mtime_ns = state['mtime_ns']
+            restored = {
+                'head': state['head'],
+                'count': int(state['count']),
+                'last_date': state['last_date'],
+                'day_counters': {k: int(v) for k, v in state['day_counters'].items()},
+            }
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return self.load()
+
+        if st.st_size < size or (st.st_size == size and st.st_mtime_ns != mtime_ns):
+            return self.load()
+
+        self.__init__(self.path)
+        self.head = restored['head']
+        self.count = restored['count']
+        self.last_date = restored['last_date']
+        self.day_counters = restored['day_counters']
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+        if st.st_size == size:
+            return True
+
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(size)
+                tail = f.read()
+                st = os.fstat(f.fileno())
+        except Exception as e:
+            logging.error(f"Failed to read logs: {e}")
+            return self.load()
+
+        if not tail.endswith(b'\n'):
+            # Последняя строка оборвана - load() починит файл до дозаписи
+            return self.load()
+
+        self.size = size + len(tail)
+        self.mtime_ns = st.st_mtime_ns
+        return self._replay(tail.decode('utf-8', errors='replace').splitlines())
+    
+    def verify_full(self) -> bool:
+        """
+        Полная проверка: вся цепочка с начала + подписи и согласованность контрольных точек
+
+        Returns:
+            bool: False если цепочка нарушена
+        """
+        if not self.path.exists():
+            return True
+
+        try:
+            with open(self.path, 'r', encoding='utf-8', errors='replace') as f:
+                lines = f.read().splitlines()
+        except Exception as e:
+            logging.error(f"Failed to read logs: {e}")
+            return True
+
+        self.__init__(self.path)
+        return self._replay(lines, check_checkpoints=True)
+    
+    def state(self) -> dict:
+        """Состояние для сводки"""
+        return {
+            'size': self.size,
+            'mtime_ns': self.mtime_ns,
+            'head': self.head,
+            'count': self.count,
+            'last_date': self.last_date,
+            'day_counters': dict(self.day_counters),
+        }
+    
+    def _repair_tail(self, f, size: int) -> bool:
+        """
+        Файл не заканчивается переводом строки (выход посреди записи):
+        полная последняя запись - дописать '\n', оборванная - отрезать,
+        иначе следующая дозапись склеится с ней в одну строку
+
+        Returns:
+            bool: True если файл изменен
+        """
+        if size == 0:
+            return False
+        f.seek(size - 1)
+        if f.read(1) == b'\n':
+            return False
+
+        start = _last_line_start(f, size)
+        f.seek(start)
+        last = f.read(size - start)
+        try:
+            complete = isinstance(json.loads(last), dict) or last.startswith(BLOCK_PREFIX.encode())
+        except ValueError:
+            complete = last.startswith(BLOCK_PREFIX.encode())
+
+        with open(self.path, 'r+b') as out:
+            if complete:
+                out.seek(size)
+                out.write(b'\n')
+            else:
+                out.truncate(start)
+        logging.warning(f"⚠️ Torn last line in {self.path}: "
+                        f"{'newline added' if complete else f'cut {size - start} bytes'}")
+        return True
+    
+    def _apply_checkpoint(self, line: str) -> bool:
+        """Восстановить состояние из контрольной точки (с проверкой подписи)"""
+        try:
+            record = json.loads(line)
+            count = int(record['checkpoint'])
+            date = record['date']
+            counters = {k: int(v) for k, v in record['counters'].items()}
+            head = record['hash']
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return False
+        
+        if record.get('check') != self._checkpoint_check(count, date, counters, head):
+            return False
+        
+        self.count = count
+        self.last_date = date
+        self.day_counters = counters
+        self.head = head
+        return True
+    
+    def _replay(self, lines, check_checkpoints: bool = False) -> bool:
+        """
+        Проверить и применить записи использования
+
+        check_checkpoints: сверять контрольные точки с текущим состоянием (полная проверка)
+        """
+        last_index = len(lines) - 1
+        
+        for i, line in enumerate(lines):
+            if not line.strip() or line.startswith(BLOCK_PREFIX):
+                continue
+            
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if i == last_index:
+                    # Оборванная последняя строка (выход посреди записи)
+                    logging.warning(f"⚠️ Torn last line in {self.path}, ignored")
+                    continue
+                return self._mark_tampered()
+            
+            if not isinstance(record, dict):
+                continue
+            
+            if 'checkpoint' in record:
+                if check_checkpoints:
+                    expected = self.checkpoint_line()
+                    if json.loads(expected) != record:
+                        return self._mark_tampered()
+                continue
+            
+            action_group = record.get('action_group') or record.get('action')
+            if 'date' not in record or 'hash' not in record or not action_group:
+                continue
+            
+            expected_hash = compute_chain_hash(f"{record['date']}:{action_group}", self.head)
+            if record['hash'] != expected_hash:
+                return self._mark_tampered()
+            
+            self._advance(record['date'], action_group, record['hash'])
+        
+        return True
+    
+    def _migrate_legacy(self, content: str) -> bool:
+        """Старый формат (JSON-массив с indent=2) -> журнал, один раз"""
+        array_part = "\n".join(l for l in content.splitlines() if not l.startswith(BLOCK_PREFIX))
+        block_lines = [l for l in content.splitlines() if l.startswith(BLOCK_PREFIX)]
+        
+        try:
+            records = json.loads(array_part)
+        except json.JSONDecodeError:
+            logging.warning(f"⚠️ Log file {self.path} is corrupted, recreating...")
+            self.path.unlink()
+            return True
+        
+        lines = [json.dumps(r, ensure_ascii=False) for r in records if isinstance(r, dict)]
+        if not self._replay(lines):
+            return False
+        
+        out = [self._usage_line(r) for r in self._normalized(records)]
+        out.append(self.checkpoint_line())
+        out.extend(block_lines)
+        
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write("\n".join(out) + "\n")
+        os.replace(tmp, self.path)
+        
+        st = os.stat(self.path)
+        self.size = st.st_size
+        self.mtime_ns = st.st_mtime_ns
+        
+        logging.info(f"📦 Migrated {self.count} records in {self.path} to journal format")
+        return True
+    
+    @staticmethod
+    def _normalized(records):
+        """Записи старого формата -> {date, action_group, hash}"""
+        for record in records:
+            if not isinstance(record, dict):
+                continue
+            action_group = record.get('action_group') or record.get('action')
+            if 'date' in record and 'hash' in record and action_group:
+                yield {'date': record['date'], 'action_group': action_group, 'hash': record['hash']}
+    
+    def _mark_tampered(self) -> bool:
+        logging.error(f"🚨 HASH MISMATCH detected in {self.path}")
+        self.tampered = True
+        return False
+
+    # ========================================
+    # ДОЗАПИСЬ
+    # ========================================
+
+    def _advance(self, date: str, point_type: str, hash_value: str):
+        if date != self.last_date:
+            self.last_date = date
+            self.day_counters = {}
+        self.day_counters[point_type] = self.day_counters.get(point_type, 0) + 1
+        self.count += 1
+        self.head = hash_value
+    
+    def append(self, date: str, point_type: str) -> str:
+        """
+        Добавить запись в состояние
+        
+        Returns:
+            str: строки для дозаписи в файл (запись + контрольная точка при необходимости)
+        """
+        hash_value = compute_chain_hash(f"{date}:{point_type}", self.head)
+        self._advance(date, point_type, hash_value)
+        
+        text = self._usage_line({'date': date, 'action_group': point_type, 'hash': hash_value}) + "\n"
+        if self.count % CHECKPOINT_INTERVAL == 0:
+            text += self.checkpoint_line() + "\n"
+        return text
+    
+    @staticmethod
+    def _usage_line(record: dict) -> str:
+        return json.dumps(record, ensure_ascii=False)
+    
+    @staticmethod
+    def _checkpoint_check(count: int, date, counters: dict, head: str) -> str:
+        data = f"checkpoint:{count}:{date}:{json.dumps(counters, sort_keys=True)}"
+        return compute_chain_hash(data, head)
+    
+    def checkpoint_line(self) -> str:
+        """Строка контрольной точки для текущего состояния"""
+        return json.dumps({
+            'checkpoint': self.count,
+            'date': self.last_date,
+            'counters': self.day_counters,
+            'hash': self.head,
+            'check': self._checkpoint_check(self.count, self.last_date, self.day_counters, self.head),
+        }, ensure_ascii=False)
+    
+    def counters_for(self, date: str) -> dict:
+        """Счетчики за дату (только последний день журнала, иначе пусто)"""
+        return dict(self.day_counters) if date == self.last_date else {}
+
+
+class JournalWriter:
+    """
+    Фоновая дозапись строк в файлы
+
+    Запись и обновление известного состояния файлов идут под io_lock,
+    поэтому при pending == 0 файлы на диске совпадают с состоянием в памяти.
+    """
+
+    def __init__(self, on_written=None):
+        self.on_written = on_written  # callback(paths) после записи пачки, под io_lock
+        self.io_lock = threading.RLock()
+        self.pending = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="action_limiter_writer")
+        self._thread.start()
+    
+    def submit(self, path: Path, text: str):
+        """Поставить строки в очередь на дозапись"""
+        with self.io_lock:
+            self.pending += 1
+        self._queue.put((path, text))
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            
+            # Забираем все, что накопилось, и пишем пачкой по файлам
+            batch = [item]
+            while True:
+                try:
+                    extra = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if extra is None:
+                    self._queue.put(None)
+                    self._queue.task_done()
+                    break
+                batch.append(extra)
+            
+            by_path = {}
+            for path, text in batch:
+                by_path.setdefault(path, []).append(text)
+            
+            with self.io_lock:
+                for path, texts in by_path.items():
+                    try:
+                        with open(path, 'a', encoding='utf-8') as f:
+                            f.write("".join(texts))
+                    except Exception as e:
+                        logging.error(f"Failed to write log entry: {e}")
+                self.pending -= len(batch)
+                if self.on_written:
+                    try:
+                        self.on_written(list(by_path))
+                    except Exception as e:
+                        logging.error(f"Error in journal writer callback: {e}")
+            
+            for _ in batch:
+                self._queue.task_done()
+    
+    def flush(self):
+        """Дождаться записи всех строк"""
+        self._queue.join()
+    
+    def close(self):
+        """Дописать очередь и остановить поток"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+
+
 class ActionLimiter:
     """Управление лимитами использования экшенов с защитой от читеров"""
-    
+
     # Лимиты по типам точек
     LIMITS = {
         'FROST': 200,  # FROST точки (NEXT/LONG)
         'QB': 120,     # QB точки (QB SO/GO)
     }
-    
-    def __init__(self):
-        """Инициализация с двумя файлами логов"""
+
+    def __init__(self, main_log_file: Path = None, decoy_log_file: Path = None,
+                 verify_in_background: bool = True):
+        """
+        Инициализация с двумя файлами логов
+
+        Args:
+            main_log_file, decoy_log_file: пути к логам (по умолчанию - AppData)
+            verify_in_background: запустить полную проверку цепочки в фоне
+        """
         # ОСНОВНЫЕ ЛОГИ (защищенные) в Discord
-        discord_dir = Path.home() / "AppData" / "Local" / "Discord"
-        discord_dir.mkdir(parents=True, exist_ok=True)
-        self.main_log_file = discord_dir / "app.log"
+        if main_log_file is None:
+            discord_dir = Path.home() / "AppData" / "Local" / "Discord"
+            discord_dir.mkdir(parents=True, exist_ok=True)
+            main_log_file = discord_dir / "app.log"
+        self.main_log_file = Path(main_log_file)
         
         # ПРИМАНКА (для отвода глаз) в xvocmuk
-        decoy_dir = Path.home() / "AppData" / "Local" / "xvocmuk"
-        decoy_dir.mkdir(parents=True, exist_ok=True)
-        self.decoy_log_file = decoy_dir / "action_usage.log"
+        if decoy_log_file is None:
+            decoy_dir = Path.home() / "AppData" / "Local" / "xvocmuk"
+            decoy_dir.mkdir(parents=True, exist_ok=True)
+            decoy_log_file = decoy_dir / "action_usage.log"
+        self.decoy_log_file = Path(decoy_log_file)
+        
+        # Сводка по дням (состояние журналов + счетчики по датам МСК)
+        self.summary_file = self.main_log_file.with_suffix(".idx")
         
         logging.info(f"📁 Main logs: {self.main_log_file}")
         logging.info(f"📁 Decoy logs: {self.decoy_log_file}")
@@ -45,14 +550,31 @@ class ActionLimiter:
             'FROST': False,
             'QB': False,
         }
-
+        
+        # Дата МСК, к которой относятся counters
+        self.counters_date = self._get_msk_date()
+        
         # Флаг блокировки (если обнаружена попытка читерства)
         self.is_blocked = False
         self.block_reason = ""
         
+        # Журналы (состояние в памяти) и фоновая запись
+        self.main_journal = UsageJournal(self.main_log_file)
+        self.decoy_journal = UsageJournal(self.decoy_log_file)
+        self.days = {}  # {date: {'counters': {...}, 'head': hash}}
+        self.writer = JournalWriter(on_written=self._on_batch_written)
+        
         # Инициализация при старте
         self._load_counters_from_logs()
         self._check_decoy_integrity()
+        
+        # Полная проверка цепочки - в фоне, старт ее не ждет
+        self.verify_thread = None
+        if verify_in_background and not self.is_blocked:
+            self.verify_thread = threading.Thread(
+                target=self._verify_full_chain, daemon=True, name="action_limiter_verify"
+            )
+            self.verify_thread.start()
     
     def _get_msk_now(self):
         """Получить текущее время МСК"""
@@ -73,106 +595,137 @@ class ActionLimiter:
         Returns:
             SHA256 хеш
         """
-        combined = f"{prev_hash}:{data}"
-        return hashlib.sha256(combined.encode()).hexdigest()
+        return compute_chain_hash(data, prev_hash)
+    
+    def _stat_key(self, path: Path):
+        """(size, mtime_ns) файла или None"""
+        try:
+            st = os.stat(path)
+            return (st.st_size, st.st_mtime_ns)
+        except OSError:
+            return None
     
-    def _read_logs(self, log_file: Path):
+    def _on_batch_written(self, paths):
+        """
+        После собственной записи (под io_lock): запомнить размер/mtime файлов
+        и обновить сводку, если очередь пуста (файлы = состояние в памяти)
         """
-        Прочитать и валидировать логи
+        if self.writer.pending:
+            return
         
-        Args:
-            log_file: путь к файлу логов
+        for journal in (self.main_journal, self.decoy_journal):
+            stat_key = self._stat_key(journal.path)
+            if stat_key is not None:
+                journal.size, journal.mtime_ns = stat_key
         
-        Returns:
-            list: список валидных записей или []
-        """
-        if not log_file.exists():
-            return []
+        self._save_summary()
+    
+    # ========================================
+    # СВОДКА ПО ДНЯМ
+    # ========================================
+    
+    def _summary_check(self, body: dict) -> str:
+        """Подпись сводки (привязана к голове основной цепочки)"""
+        data = json.dumps(body, sort_keys=True, ensure_ascii=False)
+        return compute_chain_hash(f"summary:{data}", body['main']['head'])
+    
+    def _save_summary(self):
+        """Записать сводку атомарно (temp + rename)"""
+        # Снимок под io_lock: _remember_day меняет days из потока вызывающего
+        with self.writer.io_lock:
+            body = {
+                'main': self.main_journal.state(),
+                'decoy': self.decoy_journal.state(),
+                'days': dict(sorted(self.days.items())[-SUMMARY_DAYS:]),
+            }
+        body['check'] = self._summary_check({k: v for k, v in body.items()})
         
+        tmp = self.summary_file.with_name(self.summary_file.name + ".tmp")
         try:
-            with open(log_file, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-            
-            # Если файл пустой
-            if not content:
-                return []
-            
-            # Пытаемся распарсить как JSON массив
-            try:
-                records = json.loads(content)
-            except json.JSONDecodeError:
-                # Возможно файл поврежден - пересоздаем
-                logging.warning(f"⚠️ Log file {log_file} is corrupted, recreating...")
-                log_file.unlink()
-                return []
-            
-            # Валидация цепочки хешей
-            prev_hash = ""
-            valid_records = []
-            
-            for record in records:
-                if not isinstance(record, dict):
-                    continue
-                
-                # Проверяем необходимые ключи (поддержка старого и нового формата)
-                if 'date' not in record or 'hash' not in record:
-                    continue
-                
-                # ОБРАТНАЯ СОВМЕСТИМОСТЬ: поддержка обоих форматов
-                action_group = record.get('action_group') or record.get('action')
-                
-                if not action_group:
-                    continue
-                
-                # Проверяем хеш
-                date = record['date']
-                data = f"{date}:{action_group}"
-                expected_hash = self._compute_hash(data, prev_hash)
-                
-                if record['hash'] != expected_hash:
-                    # Цепочка нарушена - ТРЕВОГА!
-                    logging.error(f"🚨 HASH MISMATCH detected in {log_file}")
-                    self.is_blocked = True
-                    self.block_reason = "Log tampering detected"
-                    return []
-                
-                # Нормализуем запись к новому формату
-                normalized_record = {
-                    'date': date,
-                    'action_group': action_group,
-                    'hash': record['hash']
-                }
-                
-                valid_records.append(normalized_record)
-                prev_hash = record['hash']
-            
-            return valid_records
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(body, f, ensure_ascii=False)
+            os.replace(tmp, self.summary_file)
+        except Exception as e:
+            logging.error(f"Failed to write limits summary: {e}")
+    
+    def _load_summary(self):
+        """Прочитать сводку (None если нет или подпись не сходится)"""
+        if not self.summary_file.exists():
+            return None
         
+        try:
+            with open(self.summary_file, 'r', encoding='utf-8') as f:
+                body = json.load(f)
+            check = body.pop('check', None)
+            if check != self._summary_check(body):
+                logging.warning("⚠️ Limits summary signature mismatch, ignored")
+                return None
+            return body
         except Exception as e:
-            logging.error(f"Failed to read logs: {e}")
-            return []
+            logging.warning(f"⚠️ Limits summary unreadable, ignored: {e}")
+            return None
+    
+    def _remember_day(self, journal: UsageJournal):
+        """Обновить запись дня в сводке по состоянию журнала (под io_lock - см. _save_summary)"""
+        with self.writer.io_lock:
+            if journal.last_date:
+                self.days[journal.last_date] = {
+                    'counters': dict(journal.day_counters),
+                    'head': journal.head,
+                }
+    
+    def _verify_full_chain(self):
+        """Фоновая полная проверка основной цепочки"""
+        journal = UsageJournal(self.main_log_file)
+        
+        with self.writer.io_lock:
+            # Сверяем только с записанным на диск состоянием
+            expected = (self.main_journal.count, self.main_journal.head) if not self.writer.pending else None
+        
+        if not journal.verify_full():
+            self.is_blocked = True
+            self.block_reason = "Log tampering detected"
+            return
+        
+        # Файл короче состояния или с другой головой - сводку подменили
+        # (count больше - просто успели дописать новые записи)
+        if expected is not None and (
+            journal.count < expected[0]
+            or (journal.count == expected[0] and journal.head != expected[1])
+        ):
+            logging.error("🚨 Summary does not match log chain")
+            self.is_blocked = True
+            self.block_reason = "Log tampering detected"
+            return
+        
+        logging.info(f"✅ Full chain verified: {journal.count} records")
     
-    def _check_decoy_integrity(self):
+    def _check_decoy_integrity(self, force: bool = False):
         """
         Проверить целостность приманки
         Если приманка изменена - установить блокировку до конца дня
-        """
-        # Читаем основные логи
-        main_records = self._read_logs(self.main_log_file)
-        
-        # Читаем приманку
-        decoy_records = self._read_logs(self.decoy_log_file)
         
-        # Сравниваем количество записей
-        if len(main_records) != len(decoy_records):
+        Без force файл перечитывается только если он изменился
+        не нашей записью (один stat на вызов), сравнение - в памяти.
+        """
+        with self.writer.io_lock:
+            if self.writer.pending:
+                return  # Наши строки еще пишутся - сравнивать рано
+            
+            decoy = self.decoy_journal
+            if force or self._stat_key(decoy.path) != (decoy.size, decoy.mtime_ns):
+                if not decoy.load():
+                    self._trigger_soft_block("Decoy log modified")
+                    return
+        
+        # Сравниваем количество записей и голову цепочки
+        if self.main_journal.count != self.decoy_journal.count:
             self._trigger_soft_block("Decoy log count mismatch")
             return
         
-        # Сравниваем содержимое
-        for i, (main_rec, decoy_rec) in enumerate(zip(main_records, decoy_records)):
-            if main_rec != decoy_rec:
-                self._trigger_soft_block(f"Decoy log modified at line {i+1}")
-                return
+        if self.main_journal.head != self.decoy_journal.head:
+            self._trigger_soft_block("Decoy log modified")
+            return
         
         # Если всё ок - разблокируем (на случай нового дня)
         if self.is_blocked:
@@ -203,15 +756,10 @@ class ActionLimiter:
             'date': self._get_msk_date()
         }
         
-        try:
-            with open(self.main_log_file, 'a', encoding='utf-8') as f:
-                f.write(f"### BLOCK ### {json.dumps(block_record)}\n")
-            
-            logging.error(f"🚫 МЯГКАЯ БЛОКИРОВКА: {reason}")
-            logging.error(f"🚫 Функции заблокированы до конца дня МСК")
-            
-        except Exception as e:
-            logging.error(f"Ошибка записи блокировки: {e}")
+        self.writer.submit(self.main_log_file, f"{BLOCK_PREFIX} {json.dumps(block_record)}\n")
+        
+        logging.error(f"🚫 МЯГКАЯ БЛОКИРОВКА: {reason}")
+        logging.error(f"🚫 Функции заблокированы до конца дня МСК")
     
     def _is_block_expired(self) -> bool:
         """Проверить истекла ли блокировка (новый день)"""
@@ -225,8 +773,8 @@ class ActionLimiter:
             
             # Ищем последнюю блокировку
             for line in reversed(lines):
-                if '### BLOCK ###' in line:
-                    block_data = line.replace('### BLOCK ###', '').strip()
+                if BLOCK_PREFIX in line:
+                    block_data = line.replace(BLOCK_PREFIX, '').strip()
                     block_record = json.loads(block_data)
                     block_date = block_record.get('date')
                     
@@ -237,28 +785,40 @@ class ActionLimiter:
                         return True
             
             return True  # Блокировок не найдено
-            
+        
         except Exception as e:
             logging.error(f"Ошибка проверки блокировки: {e}")
             return False
     
     def _load_counters_from_logs(self):
-        """Загрузить счетчики из основных логов"""
-        records = self._read_logs(self.main_log_file)
-        
-        if not records:
+        """
+        Загрузить счетчики: из сводки (если журналы не менялись) или
+        из хвоста основного лога после последней контрольной точки
+        """
+        summary = self._load_summary()
+        
+        if summary:
+            self.days = summary.get('days') or {}
+            main_ok = self.main_journal.resume(summary['main'])
+            if main_ok and not self.decoy_journal.resume(summary['decoy']):
+                self._trigger_soft_block("Decoy log modified")
+        else:
+            main_ok = self.main_journal.load()
+        
+        if not main_ok:
+            self.is_blocked = True
+            self.block_reason = "Log tampering detected"
             return
         
+        self._remember_day(self.main_journal)
+        
         today = self._get_msk_date()
+        self.counters_date = today
         
-        # Считаем использования за сегодня
-        for record in records:
-            if record['date'] == today:
-                # ИСПРАВЛЕНИЕ: поддержка старого формата логов
-                point_type = record.get('action_group') or record.get('action')
-                
-                if point_type and point_type in self.counters:
-                    self.counters[point_type] += 1
+        # Счетчики за сегодня
+        for point_type, count in self.main_journal.counters_for(today).items():
+            if point_type in self.counters:
+                self.counters[point_type] = count
         
         # Обновляем состояние лимитов
         for point_type in self.counters:
@@ -274,51 +834,27 @@ class ActionLimiter:
         Args:
             point_type: тип точки ("FROST" или "QB")
         """
+        date = self._get_msk_date()
+        
         # Записываем в основной лог
-        self._append_to_log(self.main_log_file, point_type)
+        self._append_to_log(self.main_journal, date, point_type)
         
         # Записываем в приманку
-        self._append_to_log(self.decoy_log_file, point_type)
+        self._append_to_log(self.decoy_journal, date, point_type)
     
-    def _append_to_log(self, log_file: Path, point_type: str):
+    def _append_to_log(self, journal: UsageJournal, date: str, point_type: str):
         """
-        Добавить запись в лог-файл
+        Добавить запись в журнал (хеш считается сразу, запись - в фоне)
         
         Args:
-            log_file: путь к файлу
+            journal: журнал файла
+            date: дата МСК
             point_type: тип точки ("FROST" или "QB")
         """
-        # Читаем существующие записи для получения предыдущего хеша
-        records = self._read_logs(log_file)
-        prev_hash = records[-1]['hash'] if records else ""
-        
-        # Создаем новую запись
-        date = self._get_msk_date()
-        data = f"{date}:{point_type}"
-        hash_value = self._compute_hash(data, prev_hash)
-        
-        new_record = {
-            'date': date,
-            'action_group': point_type,  # НОВЫЙ КЛЮЧ
-            'hash': hash_value
-        }
-        
-        # Добавляем в файл
-        try:
-            if log_file.exists():
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    existing_records = json.load(f)
-            else:
-                existing_records = []
-            
-            existing_records.append(new_record)
-            
-            with open(log_file, 'w', encoding='utf-8') as f:
-                json.dump(existing_records, f, indent=2, ensure_ascii=False)
-        
-        except Exception as e:
-            logging.error(f"Failed to write log entry: {e}")
-
+        # Под io_lock: писатель не обновит сводку между append и submit
+        with self.writer.io_lock:
+            self.writer.submit(journal.path, journal.append(date, point_type))
+    
     def can_use(self, point_type: str) -> bool:
         """
         Проверить можно ли использовать точку данного типа
@@ -338,6 +874,8 @@ class ActionLimiter:
         
         # Проверяем целостность приманки
         self._check_decoy_integrity()
+        if self.is_blocked:
+            return False
         
         # Проверяем лимит для данного типа
         if point_type not in self.LIMITS:
@@ -347,7 +885,7 @@ class ActionLimiter:
     
     def record_usage(self, point_type: str):
         """
-        Записать использование точки
+        Записать использование точки (O(1), файлы пишутся в фоне)
         
         Args:
             point_type: тип точки ("FROST" или "QB")
@@ -359,11 +897,14 @@ class ActionLimiter:
         if point_type not in self.LIMITS:
             return
         
+        self._check_and_reset_if_new_day()
+        
         # Увеличиваем счетчик
         self.counters[point_type] += 1
         
         # Пишем в ОБА лога
         self._write_log_entry(point_type)
+        self._remember_day(self.main_journal)
         
         # Обновляем кеш лимита
         if self.counters[point_type] >= self.LIMITS[point_type]:
@@ -374,18 +915,18 @@ class ActionLimiter:
         """Проверить наступление нового дня МСК и сбросить счетчики"""
         today = self._get_msk_date()
         
-        # Читаем последнюю запись из ОСНОВНЫХ логов
-        records = self._read_logs(self.main_log_file)
-        if not records:
-            return
-        
-        last_date = records[-1]['date']
-        
         # Если наступил новый день - сбрасываем счетчики
-        if last_date != today:
+        if self.counters_date != today:
             logging.info(f"🔄 Наступил новый день МСК ({today}), сброс счетчиков")
-            self.counters = {'FROST': 0, 'QB': 0}
-            self.limits_reached = {'FROST': False, 'QB': False}
+            self.counters_date = today
+            
+            # O(1): счетчики дня из сводки (обычно пусто)
+            day_counters = self.days.get(today, {}).get('counters', {})
+            self.counters = {point_type: day_counters.get(point_type, 0) for point_type in self.LIMITS}
+            self.limits_reached = {
+                point_type: self.counters[point_type] >= limit
+                for point_type, limit in self.LIMITS.items()
+            }
             
             # Также снимаем блокировку
             if self.is_blocked:
@@ -412,4 +953,11 @@ class ActionLimiter:
                 'blocked': self.is_blocked
             }
         
-        return stats
\ No newline at end of file
+        return stats
+    
+    def close(self):
+        """Дописать очередь журналов и сводку (при выходе)"""
+        self.writer.close()
+        with self.writer.io_lock:
+            if not self.writer.pending and not self.is_blocked:
+                self._save_summary()
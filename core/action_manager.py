@@ -4,6 +4,7 @@
 import logging
 from dataclasses import dataclass
 from typing import Callable, Optional
+from core.metrics import metrics
 
 @dataclass
 class Action:
@@ -67,7 +68,8 @@ class ActionManager:
             return
         
         try:
-            action.callback()
+            with metrics.timer(f"action.{action_id}"):
+                action.callback()
         except Exception as e:
             logging.error(f"Error executing action {action_id}: {e}")
     
@@ -7,9 +7,11 @@ import json
 import sys
 import hashlib
 import subprocess
-import urllib.request
 from typing import Optional, Any
 
+from core.config_fetch import ConfigFetcher, HttpCache
+from core.hwid import HWID_PROBES, CommandRunner, HwidProber
+
 # Флаг для вывода компонентов HWID при инициализации
 # В режиме EXE - отключен, в режиме разработки - включен
 DEBUG = not getattr(sys, 'frozen', False)
@@ -33,12 +35,14 @@ class AppHub:
     
     BASE_URL = "https://raw.githubusercontent.com/Zabavin-Pavel/app-licenses/refs/heads/main"
     
-    def __init__(self, app_name: str, current_version: str, timeout: int = 10):
+    def __init__(self, app_name: str, current_version: str, timeout: int = 10,
+                 command_runner: CommandRunner = None):
         """
         Args:
             app_name: название приложения (например, "joystick")
             current_version: текущая версия приложения (например, "5")
             timeout: таймаут HTTP запросов
+            command_runner: запуск команд для проб HWID (по умолчанию - subprocess)
         """
         self.app_name = app_name
         self.current_version = current_version
@@ -53,12 +57,23 @@ class AppHub:
             'combined': None
         }
         
+        self._hwid_prober = HwidProber(command_runner)
         self.hwid = self._generate_hwid()
         
         # Вывод компонентов HWID если DEBUG включен
         if DEBUG:
             self._print_hwid_components()
         
+        # Загрузчик конфигов (параллельные запросы + кеш с ETag/Last-Modified)
+        self._fetcher = ConfigFetcher(
+            self.BASE_URL,
+            timeout=timeout,
+            local_first=not hasattr(sys, '_MEIPASS'),
+            cache=HttpCache(salt=self.hwid),
+            # Лицензии - только с сервера: кеш на диске можно подменить
+            always_fetch=("licenses.json",)
+        )
+        
         # Кешированные данные
         self._licenses = None
         self._global_config = None
@@ -66,68 +81,30 @@ class AppHub:
         self._user_name = None
         self._user_data = None
         self._server_name = None
+        
+        # Плоские индексы параметров {name: (value, source)} - строятся из слоев
+        # при первом get() и сбрасываются при перезагрузке слоя.
+        # Индекс с неудачно загруженным слоем не запоминается (get повторит загрузку)
+        self._param_index = None         # user + server
+        self._global_param_index = None  # global.json
     
     def _generate_hwid(self) -> str:
-        """Генерация уникального HWID на основе железа"""
+        """
+        Генерация уникального HWID на основе железа
+        
+        Пробы CPU / материнской платы / диска идут параллельно (HwidProber),
+        при неизменном отпечатке системы компоненты берутся из кеша на диске
+        (сверка кеша с пробами - verify_hwid_async после старта).
+        """
+        components = self._hwid_prober.get_components()
+        
         identifiers = []
+        for key, _ in HWID_PROBES:
+            value = components.get(key)
+            self._hwid_components[key] = value
+            if value is not None and not str(value).startswith("ERROR:"):
+                identifiers.append(value)
         
-        # CPU ID
-        try:
-            output = subprocess.check_output("wmic cpu get processorid", shell=True)
-            cpu_id = output.decode().split('\n')[1].strip()
-            identifiers.append(cpu_id)
-            self._hwid_components['cpu_id'] = cpu_id
-        except Exception:
-            # Fallback на PowerShell (для Windows 11)
-            try:
-                output = subprocess.check_output(
-                    'powershell -Command "Get-CimInstance Win32_Processor | Select-Object -ExpandProperty ProcessorId"',
-                    shell=True
-                )
-                cpu_id = output.decode().strip()
-                identifiers.append(cpu_id)
-                self._hwid_components['cpu_id'] = cpu_id
-            except Exception as e:
-                self._hwid_components['cpu_id'] = f"ERROR: {e}"
-            
-        # Motherboard serial
-        try:
-            output = subprocess.check_output("wmic baseboard get serialnumber", shell=True)
-            mb_serial = output.decode().split('\n')[1].strip()
-            identifiers.append(mb_serial)
-            self._hwid_components['mb_serial'] = mb_serial
-        except Exception:
-            # Fallback на PowerShell (для Windows 11)
-            try:
-                output = subprocess.check_output(
-                    'powershell -Command "Get-CimInstance Win32_BaseBoard | Select-Object -ExpandProperty SerialNumber"',
-                    shell=True
-                )
-                mb_serial = output.decode().strip()
-                identifiers.append(mb_serial)
-                self._hwid_components['mb_serial'] = mb_serial
-            except Exception as e:
-                self._hwid_components['mb_serial'] = f"ERROR: {e}"
-            
-        # Disk serial
-        try:
-            output = subprocess.check_output("wmic diskdrive get serialnumber", shell=True)
-            disk_serial = output.decode().split('\n')[1].strip()
-            identifiers.append(disk_serial)
-            self._hwid_components['disk_serial'] = disk_serial
-        except Exception:
-            # Fallback на PowerShell (для Windows 11)
-            try:
-                output = subprocess.check_output(
-                    'powershell -Command "Get-CimInstance Win32_DiskDrive | Select-Object -ExpandProperty SerialNumber | Select-Object -First 1"',
-                    shell=True
-                )
-                disk_serial = output.decode().strip()
-                identifiers.append(disk_serial)
-                self._hwid_components['disk_serial'] = disk_serial
-            except Exception as e:
-                self._hwid_components['disk_serial'] = f"ERROR: {e}"
-            
         # MAC address
         # try:
         #     import uuid
@@ -155,6 +132,7 @@ class AppHub:
         print(f"MAC Address: {self._hwid_components['mac']}")
         print(f"Combined: {self._hwid_components['combined']}")
         print(f"SHA256 HWID: {self.hwid}")
+        print(f"Source: {'cache' if self._hwid_prober.from_cache else 'probe'}")
         print("=" * 60)
     
     def _fetch_json(self, filename: str) -> Optional[dict]:
@@ -164,29 +142,46 @@ class AppHub:
         Режимы:
         - Разработка (не .exe) → пробуем локальный файл, затем GitHub
         - Production (.exe) → только GitHub
+        
+        Если файл уже запрошен в prefetch() - ждем тот же запрос.
+        """
+        return self._fetcher.fetch_json(filename)
+    
+    def prefetch(self):
         """
-        is_packaged = hasattr(sys, '_MEIPASS')
+        Запустить загрузку всех нужных файлов параллельно
         
-        # Режим разработки - пробуем локальный файл
-        if not is_packaged:
-            try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    return json.loads(f.read())
-            except FileNotFoundError:
-                pass  # Fallback на GitHub
-            except Exception as e:
-                print(f"❌ Ошибка чтения локального {filename}: {e}")
-        
-        # Production или fallback - загрузка с GitHub
-        try:
-            url = f"{self.BASE_URL}/{filename}"
-            req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-            with urllib.request.urlopen(req, timeout=self.timeout) as response:
-                data = json.loads(response.read().decode())
-                return data
-        except Exception as e:
-            print(f"❌ Ошибка загрузки {filename}: {e}")
+        licenses.json, global.json, конфиг сервера (имя берется из
+        кешированного licenses.json, если он есть) и гонка серверов времени.
+        """
+        self._fetcher.submit("licenses.json")
+        self._fetcher.submit("global.json")
+        
+        server = self._guess_server()
+        if server and server != "global":
+            self._fetcher.submit(f"{server}.json")
+        
+        self._fetcher.submit_date(f"{self.BASE_URL}/licenses.json")
+    
+    def _guess_server(self) -> Optional[str]:
+        """
+        Сервер пользователя по кешированному licenses.json (без сети)
+        
+        Только подсказка для prefetch: проверка лицензии использует
+        licenses.json, загруженный с сервера.
+        """
+        body, _ = self._fetcher.cache.load(f"{self.BASE_URL}/licenses.json")
+        if body is None:
             return None
+        
+        try:
+            licenses = json.loads(body.decode())
+            for user_info in licenses.get('users', {}).values():
+                if isinstance(user_info, dict) and user_info.get('hwid') == self.hwid:
+                    return user_info.get('server')
+        except Exception:
+            pass
+        return None
     
     def _load_licenses(self) -> bool:
         """Загрузка файла лицензий"""
@@ -211,6 +206,7 @@ class AppHub:
             return True
         
         self._global_config = self._fetch_json("global.json")
+        self._global_param_index = None
         return self._global_config is not None
     
     def _load_server_config(self, server_name: str) -> bool:
@@ -220,6 +216,7 @@ class AppHub:
         
         self._server_config = self._fetch_json(f"{server_name}.json")
         self._server_name = server_name
+        self._param_index = None
         return self._server_config is not None
     
     def _find_user(self) -> Optional[str]:
@@ -260,42 +257,14 @@ class AppHub:
             print(f"   {self.hwid}")
     
     def _get_current_date_online(self) -> Optional[str]:
-        """Получение текущей даты с онлайн сервера"""
+        """
+        Получение текущей даты с онлайн сервера
+        
+        Серверы времени и заголовок Date от GitHub опрашиваются
+        одновременно, берется первый валидный ответ.
+        """
         try:
-            servers = [
-                'http://worldtimeapi.org/api/timezone/Etc/UTC',
-                'http://worldclockapi.com/api/json/utc/now',
-            ]
-            
-            for server in servers:
-                try:
-                    req = urllib.request.Request(server)
-                    with urllib.request.urlopen(req, timeout=5) as response:
-                        data = json.loads(response.read().decode())
-                        
-                        if 'datetime' in data:
-                            return data['datetime'].split('T')[0]
-                        
-                        if 'currentDateTime' in data:
-                            return data['currentDateTime'].split('T')[0]
-                except:
-                    continue
-            
-            # Запасной вариант - GitHub headers
-            try:
-                req = urllib.request.Request(f"{self.BASE_URL}/licenses.json")
-                with urllib.request.urlopen(req, timeout=self.timeout) as response:
-                    date_header = response.headers.get('Date')
-                    if date_header:
-                        from email.utils import parsedate
-                        parsed = parsedate(date_header)
-                        if parsed:
-                            return f"{parsed[0]:04d}-{parsed[1]:02d}-{parsed[2]:02d}"
-            except:
-                pass
-            
-            return None
-            
+            return self._fetcher.submit_date(f"{self.BASE_URL}/licenses.json").result()
         except Exception as e:
             print(f"Ошибка получения даты с сервера: {e}")
             return None
@@ -314,6 +283,8 @@ class AppHub:
             self._copy_hwid_to_clipboard()
             return None
         
+        self.prefetch()
+        
         if not self._load_licenses():
             return deny_with_hwid("Не удалось загрузить лицензии")
         
@@ -347,6 +318,7 @@ class AppHub:
         
         user_data = app_users[user_name]
         self._user_data = user_data
+        self._param_index = None
         
         # Проверка active
         if user_data.get('active') is True:
@@ -403,6 +375,81 @@ class AppHub:
         # Если сервер не указан - используем global
         return "global"
     
+    @staticmethod
+    def _index_layer(index: dict, config: Optional[dict], source: str):
+        """Добавить слой в индекс: корень, затем подразделы (уже занятые имена не трогаем)"""
+        if not config:
+            return
+        
+        for name, value in config.items():
+            index.setdefault(name, (value, source))
+        
+        # Подразделы (offsets, patterns, delays, ...)
+        for section_name, section in config.items():
+            if isinstance(section, dict):
+                for name, value in section.items():
+                    index.setdefault(name, (value, f"{source}.{section_name}"))
+    
+    def _build_param_index(self) -> dict:
+        """
+        Слить пользовательский и серверный слои в {name: (value, source)}
+        
+        source: "user", "server", "server.<section>"
+        Если серверный конфиг не загрузился - индекс не запоминается.
+        """
+        index = {}
+        complete = True
+        
+        # 1. Пользовательский параметр
+        if self._user_data is not None:
+            for name, value in self._user_data.items():
+                index[name] = (value, "user")
+        
+        # 2. Серверный конфиг
+        server = self.get_server()
+        if server:
+            if self._load_server_config(server):
+                self._index_layer(index, self._server_config, "server")
+            else:
+                complete = False
+        
+        if complete:
+            self._param_index = index
+        return index
+    
+    def _build_global_index(self) -> dict:
+        """Глобальный слой {name: (value, "global" / "global.<section>")} (только для fallback)"""
+        index = {}
+        if self._load_global_config():
+            self._index_layer(index, self._global_config, "global")
+            self._global_param_index = index
+        return index
+    
+    def _lookup(self, param_name: str, fallback: bool):
+        """(value, source) по приоритету user -> server -> global или None"""
+        index = self._param_index
+        if index is None:
+            index = self._build_param_index()
+        
+        entry = index.get(param_name)
+        if entry is not None or not fallback:
+            return entry
+        
+        index = self._global_param_index
+        if index is None:
+            index = self._build_global_index()
+        return index.get(param_name)
+    
+    def reload(self):
+        """Перезагрузить конфиги (индекс перестроится при следующем get)"""
+        self._fetcher.forget("global.json")
+        if self._server_name:
+            self._fetcher.forget(f"{self._server_name}.json")
+        self._global_config = None
+        self._server_config = None
+        self._param_index = None
+        self._global_param_index = None
+    
     def get(self, param_name: str, fallback: bool = True) -> Any:
         """
         Получить параметр с каскадным поиском
@@ -413,6 +460,9 @@ class AppHub:
         3. Глобальный конфиг (global.json)
         4. None
         
+        Слои слиты в плоские индексы - поиск O(1). Без fallback
+        global.json не загружается.
+        
         Args:
             param_name: название параметра
             fallback: использовать fallback на global.json
@@ -420,37 +470,36 @@ class AppHub:
         Returns:
             Значение параметра или None
         """
-        # 1. Пользовательский параметр
-        if self._user_data is not None:
-            if param_name in self._user_data:
-                return self._user_data[param_name]
-        
-        # 2. Серверный конфиг
-        server = self.get_server()
-        if server:
-            if self._load_server_config(server):
-                # Ищем в корне
-                if param_name in self._server_config:
-                    return self._server_config[param_name]
-                
-                # Ищем в подразделах (offsets, patterns, delays, ...)
-                for section in self._server_config.values():
-                    if isinstance(section, dict) and param_name in section:
-                        return section[param_name]
-        
-        # 3. Глобальный конфиг
-        if fallback and self._load_global_config():
-            if param_name in self._global_config:
-                return self._global_config[param_name]
-            
-            # Ищем в подразделах
-            for section in self._global_config.values():
-                if isinstance(section, dict) and param_name in section:
-                    return section[param_name]
-        
-        # 4. Не найдено
-        return None
+        entry = self._lookup(param_name, fallback)
+        return entry[0] if entry else None
+    
+    def get_source(self, param_name: str) -> Optional[str]:
+        """Откуда взят параметр: "user", "server.<section>", "global", ... или None"""
+        entry = self._lookup(param_name, True)
+        return entry[1] if entry else None
     
     def get_hwid(self) -> str:
         """Получить текущий HWID"""
-        return self.hwid
\ No newline at end of file
+        return self.hwid
+    
+    def verify_hwid_async(self, on_revoked):
+        """
+        HWID взят из кеша: сверить кеш с пробами в фоне (после старта)
+        
+        Args:
+            on_revoked: callback(reason) из фонового потока - HWID по пробам
+                        не совпал с лицензированным (кеш подменен или железо сменилось)
+        """
+        if not self._hwid_prober.from_cache:
+            return None
+        
+        cached = {key: self._hwid_components.get(key) for key, _ in HWID_PROBES}
+        
+        def on_mismatch(fresh):
+            identifiers = [value for key, _ in HWID_PROBES
+                           if (value := fresh.get(key)) is not None and not str(value).startswith("ERROR:")]
+            hwid = hashlib.sha256('-'.join(identifiers).encode()).hexdigest()
+            if hwid != self.hwid:
+                on_revoked("HWID does not match the cached hardware components")
+        
+        return self._hwid_prober.verify_in_background(cached, on_mismatch)
\ No newline at end of file
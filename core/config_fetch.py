@@ -0,0 +1,288 @@
+"""
+Загрузка конфигов AppHub
+Параллельные запросы, кеш на диске с условной проверкой (ETag / Last-Modified),
+гонка серверов времени (первый валидный ответ)
+
+Кеш не защищает от подмены (подпись считается на клиенте), поэтому файлы,
+от которых зависит доступ (licenses.json), всегда загружаются целиком.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from email.utils import parsedate
+from pathlib import Path
+from typing import Callable, Optional
+
+# Кеш ответов (тело + ETag/Last-Modified)
+HTTP_CACHE_DIR = Path.home() / "AppData" / "Local" / "xvocmuk" / "http_cache"
+
+# Серверы времени (гонка)
+TIME_SERVERS = (
+    'http://worldtimeapi.org/api/timezone/Etc/UTC',
+    'http://worldclockapi.com/api/json/utc/now',
+)
+TIME_TIMEOUT = 5
+
+USER_AGENT = 'Mozilla/5.0'
+
+
+class HttpCache:
+    """
+    Кеш ответов на диске: {key}.body + {key}.meta
+
+    meta хранит ETag, Last-Modified и контрольную сумму тела (соль - HWID).
+    Сумма ловит битые/чужие записи, но не подмену: соль не секрет, и сумму
+    можно пересчитать. Поэтому тело из кеша - только для файлов, подмена
+    которых ничего не дает (см. ConfigFetcher.always_fetch).
+    """
+
+    def __init__(self, directory: Optional[Path] = HTTP_CACHE_DIR, salt: str = ""):
+        self.directory = Path(directory) if directory else None
+        self.salt = salt
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode()).hexdigest()[:32]
+        return self.directory / f"{key}.body", self.directory / f"{key}.meta"
+
+    def _check(self, url: str, body: bytes, meta: dict) -> str:
+        validators = f"{meta.get('etag')}|{meta.get('last_modified')}"
+        digest = hashlib.sha256(body).hexdigest()
+        return hashlib.sha256(f"{self.salt}:{url}:{validators}:{digest}".encode()).hexdigest()
+
+    def load(self, url: str):
+        """
+        Returns:
+            (body, meta) или (None, {}) если записи нет / подпись не сходится
+        """
+        if self.directory is None:
+            return None, {}
+
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None, {}
+
+        if meta.get('check') != self._check(url, body, meta):
+            logging.warning(f"⚠️ HTTP cache entry rejected: {url}")
+            return None, {}
+        return body, meta
+
+    def store(self, url: str, body: bytes, etag: Optional[str], last_modified: Optional[str]):
+        """Сохранить ответ атомарно (temp + rename)"""
+        if self.directory is None or not (etag or last_modified):
+            return
+
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified, 'stored_at': time.time()}
+        meta['check'] = self._check(url, body, meta)
+
+        body_path, meta_path = self._paths(url)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            for path, data in ((body_path, body), (meta_path, json.dumps(meta).encode())):
+                tmp = path.with_name(path.name + ".tmp")
+                with open(tmp, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, path)
+        except OSError as e:
+            logging.warning(f"⚠️ Failed to write HTTP cache: {e}")
+
+
+class ConfigFetcher:
+    """
+    Загрузчик JSON конфигов
+
+    - submit(filename) - запрос в фоне (Future), повторный вызов отдает тот же Future
+    - fetch_json(filename) - дождаться результата
+    - fetch_date() - текущая дата UTC: гонка серверов времени
+    """
+
+    def __init__(self, base_url: str, timeout: float = 10, local_first: bool = False,
+                 cache: Optional[HttpCache] = None, time_servers=TIME_SERVERS,
+                 always_fetch=()):
+        """
+        Args:
+            base_url: адрес каталога с конфигами
+            timeout: таймаут одного запроса
+            local_first: сначала пробовать локальный файл (режим разработки)
+            cache: кеш ответов (None - без кеша)
+            time_servers: серверы времени для гонки
+            always_fetch: файлы без условной проверки - тело всегда с сервера
+                          (в кеш пишутся, но из кеша не отдаются)
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+        self.local_first = local_first
+        self.cache = cache or HttpCache(None)
+        self.time_servers = tuple(time_servers)
+        self.always_fetch = frozenset(always_fetch)
+
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="config")
+        self._futures = {}  # {filename: Future}
+        self.revalidated = 0  # ответы 304 (тело из кеша)
+
+    # ========================================
+    # КОНФИГИ
+    # ========================================
+
+    def submit(self, filename: str) -> Future:
+        """Начать загрузку файла в фоне"""
+        future = self._futures.get(filename)
+        if future is None:
+            future = self._futures[filename] = self._executor.submit(self._load, filename)
+        return future
+
+    def fetch_json(self, filename: str) -> Optional[dict]:
+        """
+        Загрузить файл (дождаться фонового запроса, если он уже идет)
+
+        Неудачный результат (None) не запоминается - следующий вызов загрузит заново.
+        """
+        future = self.submit(filename)
+        result = future.result()
+        if result is None and self._futures.get(filename) is future:
+            del self._futures[filename]
+        return result
+
+    def forget(self, filename: str = None):
+        """Забыть результат (следующий fetch_json загрузит заново)"""
+        if filename is None:
+            self._futures.clear()
+        else:
+            self._futures.pop(filename, None)
+
+    def _load(self, filename: str) -> Optional[dict]:
+        if self.local_first:
+            try:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    return json.loads(f.read())
+            except FileNotFoundError:
+                pass  # Fallback на сеть
+            except Exception as e:
+                print(f"❌ Ошибка чтения локального {filename}: {e}")
+
+        try:
+            url = f"{self.base_url}/{filename}"
+            return json.loads(self._get(url, revalidate=filename not in self.always_fetch).decode())
+        except Exception as e:
+            print(f"❌ Ошибка загрузки {filename}: {e}")
+            return None
+
+    def _get(self, url: str, revalidate: bool = True) -> bytes:
+        """
+        GET с условной проверкой по кешу
+
+        revalidate=False - без If-None-Match / If-Modified-Since: 304 не придет,
+        тело всегда с сервера
+        """
+        cached_body, meta = self.cache.load(url) if revalidate else (None, {})
+
+        headers = {'User-Agent': USER_AGENT}
+        if cached_body is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        req = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                body = response.read()
+                self.cache.store(url, body, response.headers.get('ETag'),
+                                 response.headers.get('Last-Modified'))
+                return body
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached_body is not None:
+                self.revalidated += 1
+                return cached_body
+            raise
+
+    # ========================================
+    # ДАТА
+    # ========================================
+
+    def fetch_date(self, fallback_url: str = None) -> Optional[str]:
+        """
+        Текущая дата UTC (YYYY-MM-DD): первый валидный ответ из гонки
+
+        Участники: серверы времени и заголовок Date ответа fallback_url.
+        """
+        sources = [lambda url=url: self._date_from_time_server(url) for url in self.time_servers]
+        if fallback_url:
+            sources.append(lambda: self._date_from_header(fallback_url))
+        return race(sources, self._executor, timeout=max(TIME_TIMEOUT, self.timeout))
+
+    def submit_date(self, fallback_url: str = None) -> Future:
+        """Начать гонку серверов времени в фоне"""
+        future = self._futures.get('@date')
+        if future is None:
+            future = self._futures['@date'] = self._executor.submit(self.fetch_date, fallback_url)
+        return future
+
+    @staticmethod
+    def _date_from_time_server(url: str) -> Optional[str]:
+        req = urllib.request.Request(url)
+        with urllib.request.urlopen(req, timeout=TIME_TIMEOUT) as response:
+            data = json.loads(response.read().decode())
+
+        if 'datetime' in data:
+            return data['datetime'].split('T')[0]
+        if 'currentDateTime' in data:
+            return data['currentDateTime'].split('T')[0]
+        return None
+
+    def _date_from_header(self, url: str) -> Optional[str]:
+        req = urllib.request.Request(url, method='HEAD', headers={'User-Agent': USER_AGENT})
+        with urllib.request.urlopen(req, timeout=self.timeout) as response:
+            date_header = response.headers.get('Date')
+
+        parsed = parsedate(date_header) if date_header else None
+        if parsed:
+            return f"{parsed[0]:04d}-{parsed[1]:02d}-{parsed[2]:02d}"
+        return None
+
+    def close(self):
+        """Остановить пул (незавершенные запросы не ждем)"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def race(sources, executor: ThreadPoolExecutor, timeout: float) -> Optional[object]:
+    """
+    Запустить источники параллельно и вернуть первый не-None результат
+
+    Args:
+        sources: список функций без аргументов (исключение = невалидный ответ)
+        executor: пул для запуска
+        timeout: общий таймаут гонки
+    """
+    deadline = time.monotonic() + timeout
+    pending = {executor.submit(_quiet, source) for source in sources}
+
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            result = future.result()
+            if result is not None:
+                for other in pending:
+                    other.cancel()
+                return result
+
+    return None
+
+
+def _quiet(source: Callable):
+    try:
+        return source()
+    except Exception:
+        return None
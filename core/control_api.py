@@ -0,0 +1,434 @@
+"""
+Локальный API управления (127.0.0.1:47200)
+Постоянное соединение, сообщения с префиксом длины, asyncio в отдельном потоке
+
+Кадр: 4 байта длины (big-endian) + JSON (UTF-8)
+    запрос:  {"id": 1, "method": "actions.execute", "params": {"action_id": "follow"}}
+    ответ:   {"id": 1, "ok": true, "result": ...} / {"id": 1, "ok": false, "error": "..."}
+    событие: {"id": 7, "event": "metrics", "data": {...}} (подписка с id=7)
+
+Старые клиенты (сырые b'SHOW_WINDOW' / b'METRICS' без префикса) поддерживаются:
+по первым байтам соединение распознается как старое, обслуживается и закрывается.
+
+Методы приложения (actions.*, world.snapshot, metrics.*, window.show) -
+install_app_methods(); клиент для внешних скриптов - ControlClient.
+"""
+import asyncio
+import json
+import logging
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Optional
+
+from core.metrics import metrics
+
+CONTROL_HOST = '127.0.0.1'
+CONTROL_PORT = 47200
+
+FRAME_HEADER = struct.Struct('>I')
+MAX_MESSAGE = 16 * 1024 * 1024
+
+# Команды старого протокола (одна команда на соединение)
+LEGACY_COMMANDS = (b'SHOW_WINDOW', b'METRICS')
+
+# Минимальный интервал потока метрик (ms)
+MIN_STREAM_INTERVAL = 50
+
+# Сколько ждать выполнения в потоке владельца (GUI / планировщик), секунды
+OWNER_CALL_TIMEOUT = 5.0
+
+
+class ControlError(Exception):
+    """Ошибка запроса (уходит клиенту в поле error)"""
+
+
+def encode_frame(message: dict) -> bytes:
+    body = json.dumps(message, ensure_ascii=False, default=str).encode('utf-8')
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+class ControlServer:
+    """
+    Сервер API управления
+
+    - register(method, handler, blocking=True) - handler(**params) -> результат (JSON)
+      blocking=True: выполняется в рабочем потоке (чтение памяти, экшены),
+      по одному за раз - как экшены от хоткеев
+    - register_stream(method, producer) - подписка: producer() -> данные события
+    - start() / stop()
+    """
+
+    def __init__(self, host: str = CONTROL_HOST, port: int = CONTROL_PORT):
+        self.host = host
+        self.port = port
+        self.handlers = {}   # {method: (handler, blocking)}
+        self.streams = {}    # {method: producer}
+        self.legacy = {}     # {b'COMMAND': handler() -> bytes или None}
+
+        self.loop = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.error = None
+        self._server = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="control")
+
+        self.register('ping', lambda: {'time': time.time()}, blocking=False)
+        self.register('methods', lambda: sorted(list(self.handlers) + list(self.streams)), blocking=False)
+
+    def register(self, method: str, handler: Callable, blocking: bool = True):
+        self.handlers[method] = (handler, blocking)
+
+    def register_stream(self, method: str, producer: Callable):
+        """Подписка: {"method": method, "params": {"interval_ms": 1000}}, отписка - "unsubscribe" с тем же id"""
+        self.streams[method] = producer
+
+    def register_legacy(self, command: bytes, handler: Callable):
+        self.legacy[command] = handler
+
+    # ========================================
+    # ЖИЗНЕННЫЙ ЦИКЛ
+    # ========================================
+
+    def start(self, timeout: float = 2.0) -> bool:
+        """Запустить в фоновом потоке (False - порт занят / ошибка)"""
+        self.thread = threading.Thread(target=self._run, name="control-api", daemon=True)
+        self.thread.start()
+        self.ready.wait(timeout)
+        return self._server is not None
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self._server = self.loop.run_until_complete(
+                asyncio.start_server(self._serve, self.host, self.port)
+            )
+            logging.info(f"🛰️ Control API listening on {self.host}:{self.port}")
+        except OSError as e:
+            self.error = e
+            logging.warning(f"⚠️ Control API not started: {e}")
+            self.ready.set()
+            self.loop.close()
+            return
+
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self._server.close()
+            self.loop.run_until_complete(self._server.wait_closed())
+            self.loop.close()
+
+    def stop(self):
+        """Остановить сервер (из любого потока)"""
+        if self.loop is not None and self._server is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ========================================
+    # СОЕДИНЕНИЕ
+    # ========================================
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscriptions = {}  # {id: Task}
+        try:
+            header = await reader.readexactly(FRAME_HEADER.size)
+
+            if any(command.startswith(header) for command in self.legacy):
+                await self._serve_legacy(header, reader, writer)
+                return
+
+            while True:
+                (size,) = FRAME_HEADER.unpack(header)
+                if size > MAX_MESSAGE:
+                    logging.warning(f"⚠️ Control API: frame too large ({size}), closing")
+                    return
+
+                body = await reader.readexactly(size)
+                await self._dispatch(body, writer, subscriptions)
+                header = await reader.readexactly(FRAME_HEADER.size)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for task in subscriptions.values():
+                task.cancel()
+            writer.close()
+
+    async def _serve_legacy(self, header: bytes, reader, writer):
+        """Старый протокол: одна сырая команда, ответ без префикса, закрытие"""
+        try:
+            rest = await asyncio.wait_for(reader.read(1024), timeout=0.2)
+        except asyncio.TimeoutError:
+            rest = b''
+        command = header + rest
+
+        handler = self.legacy.get(command)
+        if handler is None:
+            return
+
+        reply = await self.loop.run_in_executor(self._executor, handler)
+        if reply:
+            writer.write(reply)
+            await writer.drain()
+
+    async def _dispatch(self, body: bytes, writer, subscriptions: dict):
+        request_id = None
+        try:
+            request = json.loads(body.decode('utf-8'))
+            request_id = request.get('id')
+            method = request.get('method')
+            params = request.get('params') or {}
+
+            if method == 'unsubscribe':
+                task = subscriptions.pop(params.get('id'), None)
+                if task:
+                    task.cancel()
+                result = task is not None
+            elif method in self.streams:
+                interval = max(MIN_STREAM_INTERVAL, int(params.get('interval_ms', 1000)))
+                subscriptions[request_id] = self.loop.create_task(
+                    self._stream(request_id, method, interval / 1000.0, writer)
+                )
+                result = {'subscribed': request_id, 'interval_ms': interval}
+            elif method in self.handlers:
+                handler, blocking = self.handlers[method]
+                if blocking:
+                    result = await self.loop.run_in_executor(self._executor, lambda: handler(**params))
+                else:
+                    result = handler(**params)
+            else:
+                raise ControlError(f"unknown method: {method}")
+
+            reply = {'id': request_id, 'ok': True, 'result': result}
+        except Exception as e:
+            reply = {'id': request_id, 'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+        if metrics.enabled:
+            metrics.incr('control.requests')
+        writer.write(encode_frame(reply))
+        await writer.drain()
+
+    async def _stream(self, subscription_id, method: str, interval: float, writer):
+        producer = self.streams[method]
+        event = method.split('.')[0]
+        try:
+            while True:
+                data = await self.loop.run_in_executor(self._executor, producer)
+                writer.write(encode_frame({'id': subscription_id, 'event': event, 'data': data}))
+                await writer.drain()
+                await asyncio.sleep(interval)
+        except (asyncio.CancelledError, ConnectionError):
+            pass
+
+
+def install_app_methods(server: ControlServer, action_manager, app_state, multibox_manager,
+                        show_window: Optional[Callable] = None,
+                        on_action_executed: Optional[Callable] = None,
+                        call_soon: Optional[Callable] = None):
+    """
+    Методы приложения (общие для окна и headless)
+
+    Args:
+        show_window: показать окно (SHOW_WINDOW / window.show), None - нет окна
+        on_action_executed: callback(action_id) после actions.execute (мигание в UI)
+        call_soon: поставить fn() в очередь потока владельца состояния
+            (root.after(0, fn) / scheduler.after(0, fn)); None - выполнять на месте
+    """
+
+    def on_owner(fn):
+        """Выполнить fn в потоке владельца (там же, где хоткеи и тики) и дождаться результата"""
+        if call_soon is None:
+            return fn()
+
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+
+        call_soon(run)
+        try:
+            return future.result(timeout=OWNER_CALL_TIMEOUT)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ControlError("application is busy, try again")
+
+    def list_actions():
+        return [
+            {
+                'id': a.id,
+                'label': a.label.strip(),
+                'type': a.type,
+                'permission': a.required_permission,
+                'accessible': app_state.has_permission(a.required_permission),
+                'active': app_state.is_action_active(a.id) if a.type == 'toggle' else None,
+            }
+            for a in action_manager.actions.values()
+            if not a.is_separator
+        ]
+
+    def execute_action(action_id: str, active: bool = None):
+        """
+        Выполнить экшен. Для toggle - переключить (как клик по иконке);
+        active=True/False - включить/выключить явно (без изменения - ничего не делаем)
+        """
+        return on_owner(lambda: _execute_action(action_id, active))
+
+    def _execute_action(action_id: str, active: bool = None):
+        action = action_manager.get_action(action_id)
+        if action is None or action.is_separator:
+            raise ControlError(f"unknown action: {action_id}")
+        if not action_manager.is_action_accessible(action_id):
+            raise ControlError(f"access denied: {action_id} requires {action.required_permission}")
+
+        if action.type == 'toggle':
+            if active is not None and app_state.is_action_active(action_id) == bool(active):
+                return {'action_id': action_id, 'active': bool(active), 'changed': False}
+            app_state.toggle_action(action_id)
+
+        action_manager.execute(action_id)
+        if on_action_executed:
+            on_action_executed(action_id)
+
+        result = {'action_id': action_id, 'changed': True}
+        if action.type == 'toggle':
+            result['active'] = app_state.is_action_active(action_id)
+        return result
+
+    def refresh_characters():
+        """Перечитать CharBase всех персонажей (в потоке владельца, как тики)"""
+        for char in list(multibox_manager.characters.values()):
+            char.char_base.refresh()
+
+    def world_snapshot(refresh: bool = False, rescan: bool = False):
+        """
+        Персонажи (кеш CharBase, refresh=True - перечитать) и объединенный вид мира
+        (rescan=True - один тик сканирования перед ответом)
+        """
+        multibox_manager.request_world()
+        if refresh:
+            on_owner(refresh_characters)
+        if rescan:
+            on_owner(multibox_manager.world_tick)
+
+        active = app_state.last_active_character
+        characters = []
+        for char in list(multibox_manager.characters.values()):
+            cb = char.char_base
+            if not cb.is_valid():
+                continue
+            characters.append({
+                'pid': char.pid,
+                'char_id': cb.char_id,
+                'name': cb.char_name,
+                'class': cb.char_class,
+                'hp': cb.char_hp,
+                'max_hp': cb.char_max_hp,
+                'position': [cb.char_pos_x, cb.char_pos_y, cb.char_pos_z],
+                'target_id': cb.target_id,
+                'fly_status': cb.fly_status,
+                'party_leader_id': char.last_party_leader_id,
+                'active': char is active,
+            })
+
+        view = multibox_manager.world_view
+        return {
+            'time': time.time(),
+            'characters': characters,
+            'people': [[r.id, r.x, r.y, r.z] for r in list(view.people_index.records.values())],
+            'loot': [[r.x, r.y] for r in list(view.loot_index.records.values())],
+        }
+
+    server.register('actions.list', list_actions)
+    server.register('actions.execute', execute_action)
+    server.register('world.snapshot', world_snapshot)
+    server.register('metrics.snapshot', metrics.snapshot, blocking=False)
+    server.register('metrics.enable', lambda enabled=True: metrics.enable() if enabled else metrics.disable(), blocking=False)
+    server.register_stream('metrics.subscribe', metrics.snapshot)
+    server.register_stream('world.subscribe', world_snapshot)
+    server.register_legacy(b'METRICS', lambda: json.dumps(metrics.snapshot()).encode('utf-8'))
+
+    if show_window:
+        server.register('window.show', lambda: show_window() or True, blocking=False)
+        server.register_legacy(b'SHOW_WINDOW', lambda: show_window() and None)
+
+
+class ControlClient:
+    """
+    Клиент API (синхронный, для скриптов и бенчмарков)
+
+    Пример:
+        with ControlClient() as api:
+            api.call('actions.execute', action_id='follow')
+            snapshot = api.call('world.snapshot', refresh=True)
+    """
+
+    def __init__(self, host: str = CONTROL_HOST, port: int = CONTROL_PORT, timeout: float = 5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._next_id = 0
+        self._buffer = b''
+        self.events = []  # события, пришедшие между ответами
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _recv_exact(self, size: int) -> bytes:
+        while len(self._buffer) < size:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("control API closed the connection")
+            self._buffer += chunk
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+    def receive(self) -> dict:
+        """Следующее сообщение (ответ или событие)"""
+        (size,) = FRAME_HEADER.unpack(self._recv_exact(FRAME_HEADER.size))
+        return json.loads(self._recv_exact(size).decode('utf-8'))
+
+    def send(self, method: str, **params) -> int:
+        self._next_id += 1
+        self.sock.sendall(encode_frame({'id': self._next_id, 'method': method, 'params': params}))
+        return self._next_id
+
+    def call(self, method: str, **params):
+        """Запрос -> результат (ControlError если ok=false)"""
+        request_id = self.send(method, **params)
+        while True:
+            message = self.receive()
+            if 'event' in message:
+                self.events.append(message)
+                continue
+            if message.get('id') != request_id:
+                continue
+            if not message.get('ok'):
+                raise ControlError(message.get('error'))
+            return message.get('result')
+
+    def subscribe(self, method: str = 'metrics.subscribe', interval_ms: int = 1000) -> int:
+        """Подписаться; события - через receive() / events"""
+        request_id = self.send(method, interval_ms=interval_ms)
+        while True:
+            message = self.receive()
+            if message.get('id') == request_id and 'event' not in message:
+                if not message.get('ok'):
+                    raise ControlError(message.get('error'))
+                return request_id
+            self.events.append(message)
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
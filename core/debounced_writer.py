@@ -0,0 +1,126 @@
+"""
+Фоновая атомарная запись файла с объединением изменений
+
+Владелец меняет состояние в памяти и вызывает mark_dirty(); поток записи
+выдерживает окно debounce от первого изменения, снимает снимок (snapshot)
+и пишет файл атомарно (temp + rename). Используется настройками, профилями
+персонажей и реестром сборок клиента.
+"""
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+
+def atomic_write_text(path: Path, data: str):
+    """
+    Записать текст атомарно (temp + rename)
+
+    Raises:
+        OSError: файл не записан (старое содержимое не тронуто)
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class DebouncedWriter:
+    """
+    Отложенная запись снимка состояния в файл
+
+    snapshot() вызывается из потока записи (или из flush) и сам берет
+    блокировку владельца; возвращает текст файла или None (нечего писать).
+    Флаг изменений сбрасывается до снятия снимка, поэтому изменение,
+    сделанное во время записи, попадет в следующую.
+    """
+
+    def __init__(self, path: Path, snapshot: Callable[[], Optional[str]], debounce: float,
+                 name: str = "writer", label: str = "file"):
+        """
+        Args:
+            path: файл
+            snapshot: текст для записи (под блокировкой владельца)
+            debounce: окно объединения изменений (секунды)
+            name: имя потока записи
+            label: что пишем (для сообщений об ошибках)
+        """
+        self.path = Path(path)
+        self.snapshot = snapshot
+        self.debounce = debounce
+        self.name = name
+        self.label = label
+
+        self._cond = threading.Condition(threading.Lock())
+        self._io_lock = threading.Lock()  # снимок + запись - одной операцией (порядок записей)
+        self._dirty_since = None  # monotonic момент первого несохраненного изменения
+        self._closed = False
+        self._thread = None
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def mark_dirty(self):
+        """Запланировать запись (в фоне, после окна debounce)"""
+        with self._cond:
+            if self._closed:
+                return
+            if self._dirty_since is None:
+                self._dirty_since = time.monotonic()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        """Фоновый поток: ждет изменений, выдерживает окно, пишет"""
+        while True:
+            with self._cond:
+                while self._dirty_since is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+
+                # Окно объединения считается от первого изменения
+                remaining = self._dirty_since + self.debounce - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+
+            self.write_pending()
+
+    def write_pending(self) -> bool:
+        """Снять снимок и записать (True если файл записан)"""
+        with self._io_lock:
+            with self._cond:
+                if self._dirty_since is None:
+                    return False
+                self._dirty_since = None
+
+            data = self.snapshot()
+            if data is None:
+                return False
+
+            try:
+                atomic_write_text(self.path, data)
+            except OSError as e:
+                logging.error(f"❌ Failed to write {self.label}: {e}")
+                return False
+        return True
+
+    def flush(self) -> bool:
+        """Записать несохраненные изменения сейчас (синхронно)"""
+        return self.write_pending()
+
+    def close(self) -> bool:
+        """Остановить фоновую запись и дописать изменения (при выходе)"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        return self.flush()
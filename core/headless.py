@@ -0,0 +1,298 @@
+"""
+Режим без окна (python xvocmuk.py --headless)
+MultiboxManager, ActionManager, HotkeyManager и циклы toggle экшенов
+на одном планировщике, без tkinter / PIL / иконок
+
+С симулированными клиентами (--simulate N) работает на любой ОС -
+для soak-тестов и замеров производительности.
+"""
+import logging
+import threading
+
+from core.app_state import AppState
+from core.action_manager import ActionManager
+from core.hotkey_manager import HotkeyManager
+from core.keygen import PERMISSION_NONE
+from core.action_limiter import ActionLimiter
+from core.metrics import metrics
+from core.scheduler import Scheduler
+from core.startup import startup
+from game.module_registry import module_registry
+
+# Интервалы (ms) - как у MainWindow
+TOGGLE_ACTION_INTERVALS = {
+    'follow': 500,
+    'attack': 2000,
+    'headhunter': 200,
+}
+ACTIVE_WINDOW_INTERVAL = 500
+REFRESH_CHECK_INTERVAL = 1000
+SIMULATION_STEP_INTERVAL = 100
+STATE_RING_INTERVAL = 100
+
+
+class HeadlessApp:
+    """
+    Координатор без GUI (аналог MainWindow)
+
+    Для register_toggle_actions играет роль main_window:
+    _start_action_loop / _stop_action_loop на планировщике вместо root.after.
+    """
+
+    def __init__(self, multibox_manager, settings_manager, license_level: str,
+                 simulation=None, action_limiter=None, scheduler=None, control_port: int = None,
+                 state_ring: str = None, workers: int = 0, worker_backend=('win32',)):
+        """
+        Args:
+            multibox_manager: MultiboxManager
+            settings_manager: SettingsManager (хоткеи)
+            license_level: уровень доступа
+            simulation: SimulatedBackend (двигается по таймеру) или None
+            action_limiter: ActionLimiter (по умолчанию - журналы в AppData)
+            scheduler: Scheduler (по умолчанию новый)
+            control_port: порт API управления (None - без API)
+            state_ring: имя shared memory для кадров состояния (None - не публиковать)
+            workers: число рабочих процессов опроса клиентов (0 - опрос в этом процессе)
+            worker_backend: описание backend для воркеров (см. characters.workers.make_backend)
+        """
+        from ahk_local.manager import AHKManager
+
+        self.manager = multibox_manager
+        self.settings_manager = settings_manager
+        self.simulation = simulation
+        self.scheduler = scheduler or Scheduler("headless")
+
+        self.app_state = AppState()
+        self.app_state.verified = True
+        self.app_state.permission_level = license_level.lower()
+        logging.info(f"🔑 Permission level set: {self.app_state.permission_level}")
+
+        self.action_limiter = action_limiter or ActionLimiter()
+        self.action_manager = ActionManager(self.app_state)
+        self.hotkey_manager = HotkeyManager(self.action_manager, start_hook=False)
+
+        # Движок AHK и хук клавиатуры - только для настоящих клиентов (в фоне)
+        self.ahk_manager = AHKManager(start_engine=False)
+
+        self.action_timers = {}
+        self._closed = False
+
+        self.control_port = control_port
+        self.control_server = None
+
+        self.state_ring_name = state_ring
+        self.state_ring = None
+
+        self.workers = workers
+        self.worker_backend = worker_backend
+        self.worker_pool = None
+
+        self._register_actions()
+        self._load_hotkeys()
+
+        self.manager.set_ahk_manager(self.ahk_manager)
+        self.manager.set_app_state(self.app_state)
+        self.manager.set_action_limiter(self.action_limiter)
+
+    def _register_actions(self):
+        """Те же действия, что и в окне"""
+        from actions import (
+            register_toggle_actions,
+            register_try_actions,
+            register_pro_actions,
+            register_dev_actions,
+        )
+
+        register_toggle_actions(self.action_manager, self.manager, self.ahk_manager, self.app_state, self)
+        register_try_actions(self.action_manager, self.ahk_manager, self.app_state, self.manager)
+        register_pro_actions(self.action_manager, self.manager, self.app_state, self.action_limiter)
+        register_dev_actions(self.action_manager, self.manager, self.app_state, self.action_limiter)
+
+    def _load_hotkeys(self):
+        """Загрузить хоткеи из настроек"""
+        for action_id, hotkey in self.settings_manager.get_hotkeys().items():
+            if hotkey and hotkey != "-":
+                try:
+                    self.hotkey_manager.bind(hotkey, action_id)
+                except Exception as e:
+                    logging.warning(f"Не удалось загрузить хоткей {hotkey}: {e}")
+
+    # ========================================
+    # ЗАПУСК
+    # ========================================
+
+    def start(self):
+        """Подключиться к клиентам и поставить периодические задачи"""
+        with startup.phase('headless.attach'):
+            self.manager.refresh()
+        logging.info(f"✅ Headless: {len(self.manager.get_all_characters())} characters")
+
+        if self.workers:
+            from characters.workers import WorkerPool
+
+            with startup.phase('headless.workers'):
+                self.worker_pool = WorkerPool(self.worker_backend, shards=self.workers)
+                self.worker_pool.start()
+                self.manager.set_worker_pool(self.worker_pool)
+
+        if self.simulation is None:
+            threading.Thread(target=self._start_input, name="headless-input", daemon=True).start()
+        else:
+            self.scheduler.every(SIMULATION_STEP_INTERVAL, self._simulation_step)
+
+        self.scheduler.every(ACTIVE_WINDOW_INTERVAL, self._poll_active_window, first_delay_ms=0)
+        self.scheduler.every(REFRESH_CHECK_INTERVAL, self._check_refresh)
+        self.manager.start_world_ticker(lambda fn: self.scheduler.after(0, fn))
+
+        if self.control_port:
+            from core.control_api import ControlServer, install_app_methods
+
+            self.control_server = ControlServer(port=self.control_port)
+            install_app_methods(
+                self.control_server, self.action_manager, self.app_state, self.manager,
+                call_soon=lambda fn: self.scheduler.after(0, fn)
+            )
+            self.control_server.start()
+
+        if self.state_ring_name:
+            from game.state_ring import StateRingWriter
+
+            self.state_ring = StateRingWriter(self.state_ring_name)
+            self.scheduler.every(STATE_RING_INTERVAL, self._publish_state, first_delay_ms=0)
+            logging.info(f"📡 State ring: {self.state_ring.name}")
+
+        startup.mark('headless.ready')
+
+    def _start_input(self):
+        """Движок AHK и хук клавиатуры (настоящие клиенты)"""
+        for name, step in (('ahk_engine', self.ahk_manager.start), ('keyboard_hook', self.hotkey_manager.start)):
+            try:
+                with startup.phase(f"bg.{name}"):
+                    step()
+            except Exception as e:
+                logging.error(f"❌ Headless {name} failed: {e}")
+
+    def _simulation_step(self):
+        self.simulation.step(SIMULATION_STEP_INTERVAL / 1000.0)
+
+    def _poll_active_window(self):
+        """Последнее активное окно (фокус по backend менеджера)"""
+        active = self.app_state.last_active_character
+        if active and not active.is_valid():
+            self.app_state.last_active_character = None
+
+        pid = self.manager.backend.foreground_pid()
+        character = self.manager.characters.get(pid)
+        if character and character.is_valid():
+            self.app_state.set_last_active_character(character)
+
+    def _publish_state(self):
+        """Обновить клиентов, опубликовать кадр в state ring (мир - свой тик)"""
+        if self.worker_pool is not None:
+            self.manager.apply_worker_samples()
+        else:
+            for char in list(self.manager.characters.values()):
+                char.char_base.refresh()
+        self.manager.request_world()  # кадр включает лут и игроков
+        self.state_ring.publish_manager(self.manager, self.app_state)
+
+    def _check_refresh(self):
+        """Смена клиентов / персонажей / групп -> refresh"""
+        if self.manager.needs_refresh():
+            logging.info("🔄 Auto-refresh triggered by changes")
+            self.ahk_manager.refresh_windows()
+            self.manager.refresh()
+
+    # ========================================
+    # ДЕЙСТВИЯ
+    # ========================================
+
+    def toggle(self, action_id: str):
+        """Переключить toggle экшен (как клик по иконке)"""
+        self.app_state.toggle_action(action_id)
+        self.action_manager.execute(action_id)
+
+    def revoke_license(self, reason: str):
+        """Лицензия отозвана (вызывать в потоке планировщика): выключить toggle экшены и закрыть доступ"""
+        logging.error(f"🚫 License revoked: {reason}")
+
+        # Сначала выключить (экшены проверяют уровень доступа), потом закрыть доступ
+        for action_id in list(self.app_state.active_toggle_actions):
+            self.toggle(action_id)
+
+        self.app_state.verified = False
+        self.app_state.permission_level = PERMISSION_NONE
+
+    def _start_action_loop(self, action_id: str, callback):
+        """Запустить циклический вызов callback для toggle экшена"""
+        interval = TOGGLE_ACTION_INTERVALS.get(action_id, 500)
+
+        def loop():
+            if self.app_state.is_action_active(action_id):
+                try:
+                    with metrics.timer(f"loop.{action_id}"):
+                        callback()
+                except Exception as e:
+                    logging.error(f"Error in {action_id} loop: {e}")
+
+                self.action_timers[action_id] = self.scheduler.after(interval, loop)
+
+        # Первый вызов - в потоке планировщика
+        self.action_timers[action_id] = self.scheduler.after(0, loop)
+
+    def _stop_action_loop(self, action_id: str):
+        """Остановить циклический вызов"""
+        timer_id = self.action_timers.get(action_id)
+        if timer_id:
+            self.scheduler.after_cancel(timer_id)
+        self.action_timers[action_id] = None
+
+    # ========================================
+    # ЦИКЛ
+    # ========================================
+
+    def run(self, duration: float = None):
+        """Крутить планировщик до Ctrl+C / stop() / duration секунд"""
+        try:
+            executed = self.scheduler.run(duration)
+            logging.info(f"⏹️ Headless stopped ({executed} callbacks)")
+        except KeyboardInterrupt:
+            logging.info("⏹️ Headless interrupted")
+        finally:
+            self.close()
+
+    def stop(self):
+        """Остановить из другого потока"""
+        self.scheduler.stop()
+
+    def close(self):
+        """Остановить подсистемы и дописать файлы (как MainWindow.on_close)"""
+        if self._closed:
+            return
+        self._closed = True
+
+        for action_id in list(self.action_timers):
+            self._stop_action_loop(action_id)
+        self.manager.stop_follow_freeze()
+        if self.worker_pool is not None:
+            self.manager.set_worker_pool(None)
+            self.worker_pool.stop()
+
+        if self.control_server:
+            self.control_server.stop()
+        if self.state_ring:
+            self.state_ring.close()
+        self.ahk_manager.stop()
+        self.hotkey_manager.stop()
+        self.settings_manager.close()
+        self.manager.stop_world_ticker()
+        self.manager.world_view.close()
+        self.action_limiter.close()
+        self.manager.profiles.close()
+        module_registry.close()
+
+        for char in self.manager.characters.values():
+            char.memory.close()
+
+        if metrics.enabled:
+            logging.info(metrics.format_report())
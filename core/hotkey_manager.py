@@ -2,14 +2,20 @@
 Менеджер хоткеев с централизованным listener'ом
 """
 import logging
-import keyboard
 import threading
 import time
+from core.metrics import metrics
 
 class HotkeyManager:
     """Менеджер глобальных хоткеев"""
     
-    def __init__(self, action_manager, on_hotkey_executed=None):
+    def __init__(self, action_manager, on_hotkey_executed=None, start_hook: bool = True):
+        """
+        Args:
+            action_manager: менеджер действий
+            on_hotkey_executed: callback(action_id) после срабатывания
+            start_hook: сразу поставить глобальный хук (False - позже через start())
+        """
         self.action_manager = action_manager
         self.on_hotkey_executed = on_hotkey_executed
         self.bindings = {}  # {hotkey: action_id}
@@ -29,13 +35,27 @@ class HotkeyManager:
         self.current_hotkey = None
         self.last_trigger_time = 0
         
+        # Момент нажатия хоткея (perf_counter) для замера латентности до экшена
+        self.pending_trigger_perf = None
+        
         # НОВОЕ: Параметры как в Windows
         self.initial_delay = 0.5        # 500ms - задержка после первого нажатия
         self.repeat_throttle = 0.1      # 100ms - быстрые повторения
         self.listener_timeout = 1.0     # 1 секунда ожидания перед закрытием
         
         # Хук для отслеживания клавиш
+        self.hooked = False
+        if start_hook:
+            self.start()
+    
+    def start(self):
+        """Поставить глобальный хук клавиатуры (импорт keyboard - здесь, не при загрузке модуля)"""
+        if self.hooked:
+            return
+        
+        import keyboard
         keyboard.hook(self._on_key_event, suppress=False)
+        self.hooked = True
     
     def _on_key_event(self, event):
         """Обработка всех событий клавиш"""
@@ -156,6 +176,9 @@ class HotkeyManager:
             self.current_hotkey = hotkey
             self.last_trigger_time = time.time()
             
+            if metrics.enabled:
+                self.pending_trigger_perf = time.perf_counter()
+            
             if not self.listener_active:
                 self.listener_active = True
                 self.listener_thread = threading.Thread(
@@ -216,8 +239,18 @@ class HotkeyManager:
                     continue
                 
                 try:
+                    with self.listener_lock:
+                        trigger_perf = self.pending_trigger_perf
+                        self.pending_trigger_perf = None
+                    
+                    if trigger_perf is not None:
+                        metrics.observe('hotkey.dispatch', (time.perf_counter() - trigger_perf) * 1000.0)
+                    
                     self.action_manager.execute(action_id)
                     
+                    if trigger_perf is not None:
+                        metrics.observe('hotkey.to_action_done', (time.perf_counter() - trigger_perf) * 1000.0)
+                    
                     if self.on_hotkey_executed:
                         self.on_hotkey_executed(action_id)
                     
@@ -342,10 +375,13 @@ class HotkeyManager:
             self.listener_thread.join(timeout=2)
         
         self.unbind_all()
-        try:
-            keyboard.unhook_all()
-        except:
-            pass
+        if self.hooked:
+            try:
+                import keyboard
+                keyboard.unhook_all()
+            except:
+                pass
+            self.hooked = False
         logging.info("Hotkey manager stopped")
 
     def _is_elementclient_active(self) -> bool:
@@ -0,0 +1,264 @@
+"""
+Сбор компонентов HWID
+Пробы (CPU, материнская плата, диск) идут параллельно с общим таймаутом,
+результат кешируется на диске по дешевому отпечатку системы.
+Теплый старт берет компоненты из кеша без подпроцессов; кеш не подписан,
+поэтому после старта все компоненты пробуются заново в фоне
+(verify_in_background) - не совпали, и вызывающий отзывает лицензию.
+"""
+import hashlib
+import json
+import logging
+import os
+import platform
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+# Общий таймаут всех проб (секунды)
+HWID_PROBE_TIMEOUT = 8.0
+
+# Через сколько секунд после старта сверять кеш с пробами (старт их не ждет)
+HWID_VERIFY_DELAY = 5.0
+
+# Кеш компонентов
+HWID_CACHE_FILE = Path.home() / "AppData" / "Local" / "xvocmuk" / "hwid.json"
+
+
+def _second_line(output: str) -> str:
+    """Вывод wmic: заголовок + значение во второй строке"""
+    return output.split('\n')[1].strip()
+
+
+def _stripped(output: str) -> str:
+    """Вывод PowerShell: значение целиком"""
+    return output.strip()
+
+
+# (ключ компонента, [(команда, разбор вывода), ...]) - команды пробуются по порядку
+HWID_PROBES = (
+    ('cpu_id', (
+        ("wmic cpu get processorid", _second_line),
+        ('powershell -Command "Get-CimInstance Win32_Processor | Select-Object -ExpandProperty ProcessorId"',
+         _stripped),
+    )),
+    ('mb_serial', (
+        ("wmic baseboard get serialnumber", _second_line),
+        ('powershell -Command "Get-CimInstance Win32_BaseBoard | Select-Object -ExpandProperty SerialNumber"',
+         _stripped),
+    )),
+    ('disk_serial', (
+        ("wmic diskdrive get serialnumber", _second_line),
+        ('powershell -Command "Get-CimInstance Win32_DiskDrive | Select-Object -ExpandProperty SerialNumber | Select-Object -First 1"',
+         _stripped),
+    )),
+)
+
+
+class CommandRunner:
+    """Интерфейс запуска команд для проб HWID"""
+
+    def run(self, command: str, timeout: float) -> str:
+        """
+        Выполнить команду и вернуть stdout
+
+        Raises:
+            Exception: команда не выполнилась или превысила таймаут
+        """
+        raise NotImplementedError
+
+
+class SubprocessRunner(CommandRunner):
+    """Запуск через shell (wmic / PowerShell)"""
+
+    def run(self, command: str, timeout: float) -> str:
+        creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        result = subprocess.run(
+            command, shell=True, capture_output=True,
+            timeout=timeout, creationflags=creationflags
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"exit code {result.returncode}")
+        return result.stdout.decode(errors='ignore')
+
+
+def system_fingerprint() -> str:
+    """
+    Дешевый отпечаток системы (без подпроцессов)
+
+    Имя компьютера, архитектура, процессор из окружения, число ядер
+    и серийный номер тома системного диска (Windows).
+    """
+    parts = [
+        platform.node(),
+        platform.machine(),
+        os.environ.get('PROCESSOR_IDENTIFIER', ''),
+        str(os.cpu_count()),
+    ]
+
+    if os.name == 'nt':
+        try:
+            import ctypes
+            serial = ctypes.c_uint32()
+            root = os.environ.get('SystemDrive', 'C:') + '\\'
+            if ctypes.windll.kernel32.GetVolumeInformationW(
+                root, None, 0, ctypes.byref(serial), None, None, None, 0
+            ):
+                parts.append(f"{serial.value:08X}")
+        except Exception:
+            pass
+
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+
+class HwidProber:
+    """
+    Пробы компонентов HWID
+
+    probe() возвращает словарь компонентов. Значение "ERROR: ..." -
+    компонент не получен (в combined не входит, как и раньше).
+    """
+
+    def __init__(self, runner: CommandRunner = None, timeout: float = HWID_PROBE_TIMEOUT,
+                 cache_file: Optional[Path] = HWID_CACHE_FILE):
+        """
+        Args:
+            runner: запуск команд (по умолчанию - subprocess)
+            timeout: общий таймаут всех проб
+            cache_file: файл кеша (None - без кеша)
+        """
+        self.runner = runner or SubprocessRunner()
+        self.timeout = timeout
+        self.cache_file = cache_file
+        self.from_cache = False
+
+    def _run_probe(self, commands, deadline: float) -> str:
+        """Одна проба: команды по порядку, пока не получится"""
+        last_error = None
+        for command, parse in commands:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("HWID probe timeout")
+            try:
+                return parse(self.runner.run(command, remaining))
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    def probe(self) -> dict:
+        """Запустить все пробы параллельно (общий дедлайн)"""
+        deadline = time.monotonic() + self.timeout
+        components = {}
+
+        with ThreadPoolExecutor(max_workers=len(HWID_PROBES), thread_name_prefix="hwid") as executor:
+            futures = {
+                key: executor.submit(self._run_probe, commands, deadline)
+                for key, commands in HWID_PROBES
+            }
+            for key, future in futures.items():
+                try:
+                    components[key] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except Exception as e:
+                    components[key] = f"ERROR: {e}"
+
+        return components
+
+    def _load_cache(self, fingerprint: str) -> Optional[dict]:
+        if self.cache_file is None or not self.cache_file.exists():
+            return None
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('fingerprint') != fingerprint:
+                return None
+            components = data.get('components')
+            if not isinstance(components, dict) or any(key not in components for key, _ in HWID_PROBES):
+                return None
+            return components
+        except Exception:
+            return None
+
+    def _save_cache(self, fingerprint: str, components: dict):
+        if self.cache_file is None:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_file.with_name(self.cache_file.name + ".tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'fingerprint': fingerprint, 'components': components}, f)
+            os.replace(tmp, self.cache_file)
+        except Exception as e:
+            logging.warning(f"⚠️ Failed to cache HWID components: {e}")
+
+    def get_components(self) -> dict:
+        """
+        Компоненты HWID: из кеша, если отпечаток системы не изменился
+        (без подпроцессов; сверка - verify / verify_in_background), иначе - пробы
+        (успешный полный результат кешируется)
+        """
+        fingerprint = system_fingerprint()
+
+        cached = self._load_cache(fingerprint)
+        if cached is not None:
+            self.from_cache = True
+            return cached
+
+        self.from_cache = False
+        components = self.probe()
+
+        if not any(str(value).startswith("ERROR:") for value in components.values()):
+            self._save_cache(fingerprint, components)
+
+        return components
+
+    def verify(self, cached: dict) -> Optional[dict]:
+        """
+        Пробовать все компоненты заново и сверить с кешем
+
+        Returns:
+            None - кеш подтвержден; dict - свежие компоненты (кеш не совпал,
+            перезаписан или удален, если часть проб не удалась)
+        """
+        fresh = self.probe()
+        failed = [key for key, value in fresh.items() if str(value).startswith("ERROR:")]
+        mismatched = [key for key, value in fresh.items() if key not in failed and value != cached.get(key)]
+
+        if failed and self.cache_file is not None:
+            # Подтвердить нечем - следующий старт пробует заново
+            logging.warning(f"⚠️ HWID verification: probes failed for {failed}, cache dropped")
+            try:
+                self.cache_file.unlink()
+            except OSError:
+                pass
+
+        if not mismatched:
+            return None
+
+        logging.error(f"🚨 HWID cache mismatch on {mismatched}")
+        if not failed:
+            self._save_cache(system_fingerprint(), fresh)
+        return fresh
+
+    def verify_in_background(self, cached: dict, on_mismatch, delay: float = HWID_VERIFY_DELAY):
+        """
+        verify() в фоновом потоке через delay секунд (после старта)
+
+        Args:
+            on_mismatch: callback(fresh_components) - кеш не совпал с пробами
+        """
+        def run():
+            time.sleep(delay)
+            try:
+                fresh = self.verify(cached)
+            except Exception as e:
+                logging.error(f"HWID verification failed: {e}")
+                return
+            if fresh is not None:
+                on_mismatch(fresh)
+
+        thread = threading.Thread(target=run, name="hwid-verify", daemon=True)
+        thread.start()
+        return thread
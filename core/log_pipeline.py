@@ -0,0 +1,162 @@
+"""
+Асинхронный конвейер логирования
+QueueHandler в вызывающем потоке, запись в консоль/файл - в фоновом QueueListener
+
+- Форматирование %-аргументов откладывается до фонового потока
+- Ограничение частоты на каждое место вызова (файл:строка)
+- Выборка: extra={'sample': N} пропускает каждую N-ю запись места вызова
+"""
+import logging
+import logging.handlers
+import queue
+import threading
+
+# Ограничение частоты: не больше LOG_RATE_LIMIT записей за LOG_RATE_WINDOW секунд с одного места
+LOG_RATE_LIMIT = 20
+LOG_RATE_WINDOW = 1.0
+
+# Записи этого уровня и выше не ограничиваются
+LOG_RATE_EXEMPT_LEVEL = logging.ERROR
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Типы аргументов, которые безопасно передать в другой поток без форматирования
+_IMMUTABLE_ARG_TYPES = (str, int, float, bool, type(None), bytes)
+
+_listener = None
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Ограничение частоты и выборка по месту вызова
+
+    Подавленные записи считаются, количество дописывается к следующей
+    пропущенной записи того же места: "... (+N suppressed)".
+    """
+
+    def __init__(self, limit: int = LOG_RATE_LIMIT, window: float = LOG_RATE_WINDOW):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._sites = {}  # {(pathname, lineno): [window_start, count, suppressed, seen]}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= LOG_RATE_EXEMPT_LEVEL:
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = record.created
+        sample = getattr(record, 'sample', 0)
+
+        with self._lock:
+            state = self._sites.get(key)
+            if state is None:
+                state = self._sites[key] = [now, 0, 0, 0]
+
+            state[3] += 1
+            if sample and sample > 1 and (state[3] - 1) % sample:
+                state[2] += 1
+                return False
+
+            if now - state[0] >= self.window:
+                state[0] = now
+                state[1] = 0
+
+            if state[1] >= self.limit:
+                state[2] += 1
+                return False
+
+            state[1] += 1
+            suppressed = state[2]
+            state[2] = 0
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class SuppressedCountFormatter(logging.Formatter):
+    """Форматтер, дописывающий количество подавленных записей"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            text += f" (+{suppressed} suppressed)"
+        return text
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler без форматирования в вызывающем потоке
+
+    Стандартный prepare() форматирует сообщение сразу. Здесь запись
+    уходит в очередь как есть, если аргументы неизменяемые; иначе
+    сообщение собирается сразу (объект может измениться до записи).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            # Трейсбек нужно отрендерить, пока фрейм жив
+            return super().prepare(record)
+
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(isinstance(a, _IMMUTABLE_ARG_TYPES) for a in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def setup_logging(handlers, level: int = logging.INFO,
+                  limit: int = LOG_RATE_LIMIT, window: float = LOG_RATE_WINDOW):
+    """
+    Подключить очередь логирования к root logger
+
+    Args:
+        handlers: конечные обработчики (StreamHandler, FileHandler, ...)
+        level: уровень root logger
+        limit, window: ограничение частоты на место вызова
+
+    Returns:
+        QueueListener: запущенный слушатель (остановить через stop_logging)
+    """
+    global _listener
+
+    stop_logging()
+
+    formatter = SuppressedCountFormatter(LOG_FORMAT)
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(limit, window))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging():
+    """Дописать очередь и остановить фоновый поток (при выходе)"""
+    global _listener
+
+    if _listener is not None:
+        listener = _listener
+        _listener = None
+        try:
+            listener.stop()
+        except Exception:
+            pass
+        for handler in listener.handlers:
+            try:
+                handler.flush()
+            except Exception:
+                pass
@@ -0,0 +1,260 @@
+"""
+Встроенные метрики производительности
+Счетчики и скользящие окна длительностей по подсистемам
+
+Горячие пути проверяют metrics.enabled перед записью, поэтому
+в выключенном состоянии цена - одна проверка атрибута.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+# Размер скользящего окна длительностей (последние N замеров)
+METRICS_WINDOW = 1024
+
+# Куда пишется дамп метрик
+METRICS_DIR = Path.home() / "AppData" / "Local" / "xvocmuk" / "metrics"
+
+# Переменная окружения для включения при старте
+METRICS_ENV = "XVOCMUK_METRICS"
+
+
+def percentile(ordered, q: float):
+    """Перцентиль по отсортированному списку (q от 0 до 1)"""
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, int(len(ordered) * q))
+    return ordered[index]
+
+
+class _NullTimer:
+    """Пустой контекстный менеджер (метрики выключены)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    """Замер длительности блока в миллисекундах"""
+
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.name, (time.perf_counter() - self.start) * 1000.0)
+        return False
+
+
+class Metrics:
+    """
+    Реестр метрик
+
+    - incr(name, value) - счетчик (вызовы, байты, события)
+    - observe(name, ms) - замер длительности в скользящее окно
+    - timer(name) / timed(name) - замер блока / функции
+    - snapshot() - словарь со счетчиками и перцентилями p50/p95/p99
+    """
+
+    def __init__(self, enabled: bool = False, window: int = METRICS_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self.started_at = time.time()
+
+        self._counters = {}  # {name: int}
+        self._timings = {}   # {name: deque[ms]}
+        self._totals = {}    # {name: (count, sum_ms)} за все время
+        self._lock = threading.Lock()
+
+    # ========================================
+    # ВКЛЮЧЕНИЕ
+    # ========================================
+
+    def enable(self):
+        """Включить сбор метрик"""
+        self.enabled = True
+        logging.info("📈 Metrics enabled")
+
+    def disable(self):
+        """Выключить сбор метрик (накопленное сохраняется)"""
+        self.enabled = False
+        logging.info("📈 Metrics disabled")
+
+    def toggle(self) -> bool:
+        """Переключить сбор, вернуть новое состояние"""
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+        return self.enabled
+
+    def reset(self):
+        """Очистить все накопленные значения"""
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+            self._totals.clear()
+            self.started_at = time.time()
+
+    # ========================================
+    # ЗАПИСЬ
+    # ========================================
+
+    def incr(self, name: str, value: int = 1):
+        """Увеличить счетчик"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def record_io(self, kind: str, nbytes: int):
+        """Системный вызов чтения/записи памяти: счетчик вызовов и байтов"""
+        with self._lock:
+            counters = self._counters
+            calls_key = kind + ".calls"
+            bytes_key = kind + ".bytes"
+            counters[calls_key] = counters.get(calls_key, 0) + 1
+            counters[bytes_key] = counters.get(bytes_key, 0) + nbytes
+
+    def observe(self, name: str, value_ms: float):
+        """Записать длительность (мс)"""
+        with self._lock:
+            samples = self._timings.get(name)
+            if samples is None:
+                samples = self._timings[name] = deque(maxlen=self.window)
+            samples.append(value_ms)
+
+            count, total = self._totals.get(name, (0, 0.0))
+            self._totals[name] = (count + 1, total + value_ms)
+
+    def timer(self, name: str):
+        """
+        Контекстный менеджер замера блока
+
+        Пример:
+            with metrics.timer('tick.refresh'):
+                ...
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name: str):
+        """Декоратор замера функции (проверка enabled - в момент вызова)"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, (time.perf_counter() - start) * 1000.0)
+            return wrapper
+        return decorator
+
+    # ========================================
+    # ЧТЕНИЕ
+    # ========================================
+
+    def snapshot(self) -> dict:
+        """
+        Текущее состояние метрик
+
+        Returns:
+            dict: {'enabled', 'uptime_s', 'counters': {...},
+                   'timings': {name: {count, total, mean, last, p50, p95, p99, max}}}
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            windows = {name: list(samples) for name, samples in self._timings.items()}
+            totals = dict(self._totals)
+
+        timings = {}
+        for name, samples in windows.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            count, total = totals.get(name, (len(samples), sum(samples)))
+            timings[name] = {
+                'count': count,
+                'total': round(total, 3),
+                'mean': round(total / count, 3) if count else None,
+                'last': round(samples[-1], 3),
+                'p50': round(percentile(ordered, 0.50), 3),
+                'p95': round(percentile(ordered, 0.95), 3),
+                'p99': round(percentile(ordered, 0.99), 3),
+                'max': round(ordered[-1], 3),
+            }
+
+        return {
+            'enabled': self.enabled,
+            'uptime_s': round(time.time() - self.started_at, 1),
+            'counters': dict(sorted(counters.items())),
+            'timings': dict(sorted(timings.items())),
+        }
+
+    def format_report(self) -> str:
+        """Текстовый отчет (для лога)"""
+        snap = self.snapshot()
+        lines = [
+            "=" * 70,
+            f"METRICS (enabled={snap['enabled']}, uptime={snap['uptime_s']}s)",
+            "=" * 70,
+        ]
+
+        if snap['counters']:
+            lines.append("Counters:")
+            for name, value in snap['counters'].items():
+                lines.append(f"  {name:<40} {value:>12}")
+
+        if snap['timings']:
+            lines.append("Timings, ms:")
+            lines.append(f"  {'name':<32} {'count':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+            for name, t in snap['timings'].items():
+                lines.append(
+                    f"  {name:<32} {t['count']:>8} {t['p50']:>9.3f} {t['p95']:>9.3f} "
+                    f"{t['p99']:>9.3f} {t['max']:>9.3f}"
+                )
+
+        return "\n".join(lines)
+
+    def dump(self, directory: Path = None) -> Path:
+        """
+        Записать снимок в JSON и отчет в лог
+
+        Returns:
+            Path: путь к файлу дампа
+        """
+        directory = Path(directory) if directory else METRICS_DIR
+        directory.mkdir(parents=True, exist_ok=True)
+
+        path = directory / f"metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+
+        logging.info(self.format_report())
+        logging.info(f"📈 Metrics dumped to {path}")
+        return path
+
+
+# Глобальный реестр (включается переменной окружения XVOCMUK_METRICS=1 или из трея)
+metrics = Metrics(enabled=os.environ.get(METRICS_ENV, "") not in ("", "0"))
@@ -0,0 +1,195 @@
+"""
+Пространственный индекс триггер-зон (DUNGEON_POINTS)
+Равномерная сетка, точки заранее разбиты по уровню доступа и типу
+"""
+import json
+import logging
+import math
+from pathlib import Path
+from typing import Optional
+
+from config.constants import DUNGEON_POINTS
+
+# Размер ячейки сетки (метры). Большинство зон имеют радиус 15-60,
+# поэтому зона попадает максимум в несколько ячеек
+GRID_CELL_SIZE = 64.0
+
+# Уровни доступа, для которых строится отдельная сетка
+INDEX_PERMISSIONS = ("try", "pro", "dev")
+
+# Папка с дополнительными наборами точек (*.json)
+POINTS_DIR = Path.home() / "AppData" / "Local" / "xvocmuk" / "points"
+
+
+def get_point_type(point_name: str) -> Optional[str]:
+    """
+    Определить тип точки по имени
+
+    Args:
+        point_name: название точки
+
+    Returns:
+        "FROST", "QB" или None
+    """
+    if "FROST" in point_name:
+        return "FROST"
+    elif "QB" in point_name:
+        return "QB"
+    return None
+
+
+def can_use_point(point_name: str, permission_level: str) -> bool:
+    """
+    Проверить доступность точки для уровня доступа
+
+    Args:
+        point_name: название точки
+        permission_level: "try", "pro", "dev"
+
+    Returns:
+        bool: True если точка доступна
+    """
+    point_type = get_point_type(point_name)
+
+    if permission_level == "dev":
+        return True  # DEV видит ВСЕ точки
+    elif permission_level == "pro":
+        return point_type == "FROST"  # PRO только FROST
+    elif permission_level == "try":
+        return False  # TRY не видит точки
+
+    return False
+
+
+class PointIndex:
+    """
+    Индекс триггер-зон по координатам персонажа
+
+    Каждая зона - квадрат trigger ± radius (как в старой проверке через abs()).
+    Зона регистрируется во всех ячейках сетки, которые она покрывает,
+    поэтому поиск по позиции - одна ячейка и несколько кандидатов (O(1)).
+    При пересечении зон возвращается та, что раньше в списке (как при линейном проходе).
+    """
+
+    def __init__(self, points, cell_size: float = GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self.points = []
+        self._by_name = {}
+
+        # {permission: {(cx, cy): [order, ...]}}
+        self._grids = {permission: {} for permission in INDEX_PERMISSIONS}
+
+        for point in points:
+            self._add(point)
+
+    def _add(self, point: dict):
+        """Добавить точку в индекс"""
+        trigger_x, trigger_y = point['trigger']
+        radius = point.get('radius', 15.0)
+
+        order = len(self.points)
+        entry = {
+            'name': point['name'],
+            'trigger': (trigger_x, trigger_y),
+            'target': tuple(point['target']),
+            'radius': radius,
+            'count_in_limits': point.get('count_in_limits', True),
+            'type': get_point_type(point['name']),
+        }
+        self.points.append(entry)
+        self._by_name.setdefault(entry['name'], entry)
+
+        # Диапазон ячеек, которые покрывает зона
+        cx_min = self._cell(trigger_x - radius)
+        cx_max = self._cell(trigger_x + radius)
+        cy_min = self._cell(trigger_y - radius)
+        cy_max = self._cell(trigger_y + radius)
+
+        for permission, grid in self._grids.items():
+            if not can_use_point(entry['name'], permission):
+                continue
+
+            for cx in range(cx_min, cx_max + 1):
+                for cy in range(cy_min, cy_max + 1):
+                    grid.setdefault((cx, cy), []).append(order)
+
+    def _cell(self, value: float) -> int:
+        """Номер ячейки по координате"""
+        return math.floor(value / self.cell_size)
+
+    def find(self, x: float, y: float, permission_level: str) -> Optional[dict]:
+        """
+        Найти триггер-зону, в которой стоит персонаж
+
+        Args:
+            x, y: координаты персонажа
+            permission_level: "try", "pro", "dev"
+
+        Returns:
+            dict точки (name, trigger, target, radius, count_in_limits, type) или None
+        """
+        grid = self._grids.get(permission_level)
+        if not grid:
+            return None
+
+        candidates = grid.get((self._cell(x), self._cell(y)))
+        if not candidates:
+            return None
+
+        # Кандидаты в ячейке уже отсортированы по порядку добавления
+        for order in candidates:
+            point = self.points[order]
+            trigger_x, trigger_y = point['trigger']
+            radius = point['radius']
+
+            if abs(x - trigger_x) <= radius and abs(y - trigger_y) <= radius:
+                return point
+
+        return None
+
+    def get_by_name(self, point_name: str) -> Optional[dict]:
+        """Найти точку по имени (первая с таким именем)"""
+        return self._by_name.get(point_name)
+
+    def __len__(self):
+        return len(self.points)
+
+    @classmethod
+    def from_files(cls, paths, include_builtin: bool = True, cell_size: float = GRID_CELL_SIZE):
+        """
+        Собрать индекс из встроенных точек и JSON-файлов
+
+        Формат файла - список точек как в DUNGEON_POINTS:
+        [{"name": ..., "trigger": [x, y], "target": [x, y, z], "radius": 15, "count_in_limits": true}, ...]
+
+        Args:
+            paths: пути к JSON-файлам
+            include_builtin: добавить DUNGEON_POINTS первыми (приоритет при пересечении)
+            cell_size: размер ячейки сетки
+        """
+        points = list(DUNGEON_POINTS) if include_builtin else []
+
+        for path in paths:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+                if not isinstance(data, list):
+                    logging.warning(f"⚠️ Points file {path}: expected list, skipped")
+                    continue
+
+                loaded = [p for p in data if isinstance(p, dict) and 'name' in p and 'trigger' in p and 'target' in p]
+                points.extend(loaded)
+                logging.info(f"📍 Loaded {len(loaded)} points from {path}")
+            except Exception as e:
+                logging.error(f"❌ Failed to load points from {path}: {e}")
+
+        return cls(points, cell_size=cell_size)
+
+    @classmethod
+    def load_default(cls):
+        """Встроенные точки + все *.json из AppData/xvocmuk/points"""
+        paths = sorted(POINTS_DIR.glob("*.json")) if POINTS_DIR.exists() else []
+        index = cls.from_files(paths)
+        logging.info(f"📍 Point index built: {len(index)} points")
+        return index
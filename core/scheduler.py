@@ -0,0 +1,120 @@
+"""
+Планировщик для работы без GUI
+Один поток, таймеры как у tkinter (after / after_cancel) - циклы экшенов
+и периодические проверки пишутся так же, как в MainWindow
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from core.metrics import metrics
+
+
+class Scheduler:
+    """
+    Однопоточный планировщик
+
+    - after(ms, callback) - вызвать один раз через ms (из любого потока)
+    - after_cancel(timer_id) - отменить
+    - every(ms, callback) - вызывать периодически (отмена - тем же after_cancel)
+    - run(duration=None) - крутить цикл в текущем потоке до stop() / duration секунд
+
+    Колбэки выполняются в потоке run(); исключение колбэка пишется в лог
+    и не останавливает цикл.
+    """
+
+    def __init__(self, name: str = "scheduler"):
+        self.name = name
+        self._queue = []           # [(due, timer_id, callback)]
+        self._cancelled = set()    # timer_id отмененных, еще лежащих в очереди
+        self._periodic = {}        # {timer_id: interval_s}
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._stopped = False
+        self.thread = None         # поток, в котором идет run()
+
+    def after(self, delay_ms: float, callback) -> int:
+        """Вызвать callback один раз через delay_ms"""
+        timer_id = next(self._ids)
+        self._push(time.monotonic() + delay_ms / 1000.0, timer_id, callback)
+        return timer_id
+
+    def every(self, interval_ms: float, callback, first_delay_ms: float = None) -> int:
+        """Вызывать callback каждые interval_ms (первый раз - через first_delay_ms)"""
+        timer_id = next(self._ids)
+        self._periodic[timer_id] = interval_ms / 1000.0
+        delay = interval_ms if first_delay_ms is None else first_delay_ms
+        self._push(time.monotonic() + delay / 1000.0, timer_id, callback)
+        return timer_id
+
+    def after_cancel(self, timer_id: int):
+        """Отменить таймер (повторная отмена - без ошибки)"""
+        with self._cond:
+            self._periodic.pop(timer_id, None)
+            self._cancelled.add(timer_id)
+
+    def _push(self, due: float, timer_id: int, callback):
+        with self._cond:
+            heapq.heappush(self._queue, (due, timer_id, callback))
+            self._cond.notify()
+
+    def stop(self):
+        """Остановить run() (из любого потока)"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+
+    def run(self, duration: float = None):
+        """
+        Выполнять таймеры до stop() или duration секунд
+
+        Returns:
+            int: сколько колбэков выполнено
+        """
+        self.thread = threading.current_thread()
+        deadline = None if duration is None else time.monotonic() + duration
+        executed = 0
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return executed
+                    now = time.monotonic()
+                    if deadline is not None and now >= deadline:
+                        return executed
+
+                    if self._queue and self._queue[0][0] <= now:
+                        due, timer_id, callback = heapq.heappop(self._queue)
+                        if timer_id in self._cancelled:
+                            self._cancelled.discard(timer_id)
+                            continue
+                        break
+
+                    wait = None
+                    if self._queue:
+                        wait = self._queue[0][0] - now
+                    if deadline is not None:
+                        wait = deadline - now if wait is None else min(wait, deadline - now)
+                    self._cond.wait(wait)
+
+            if metrics.enabled:
+                metrics.observe('scheduler.lag', (now - due) * 1000.0)
+
+            try:
+                callback()
+            except Exception as e:
+                logging.error(f"Error in scheduled callback: {e}", exc_info=True)
+            executed += 1
+
+            with self._cond:
+                interval = self._periodic.get(timer_id)
+                if interval is None:
+                    self._cancelled.discard(timer_id)
+                else:
+                    # Следующий запуск от плановой точки (без накопления дрейфа),
+                    # но не в прошлом, если колбэк затянулся
+                    next_due = max(due + interval, time.monotonic())
+                    heapq.heappush(self._queue, (next_due, timer_id, callback))
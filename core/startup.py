@@ -0,0 +1,137 @@
+"""
+Профиль запуска приложения
+Время импортов и фаз старта (до окна и фоновых), отчет пишется на каждом запуске
+"""
+import json
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# Куда пишется отчет
+STARTUP_DIR = Path.home() / "AppData" / "Local" / "xvocmuk"
+STARTUP_REPORT_FILE = "startup.json"           # последний запуск
+STARTUP_HISTORY_FILE = "startup_history.jsonl"  # по строке на запуск
+
+
+class StartupProfile:
+    """
+    Замеры фаз запуска
+
+    - phase(name) - замер блока (время от старта, длительность, новые модули)
+    - mark(name) - отметка момента (например, первый кадр окна)
+    - write() - отчет в JSON + строка в историю + сводка в лог
+    """
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.started_at = datetime.now()
+        self.phases = []  # [{'name', 'start_ms', 'duration_ms', 'modules', 'thread'}]
+        self.marks = {}   # {name: ms от старта}
+        self.written = False
+        self._lock = threading.Lock()
+
+    def _now_ms(self) -> float:
+        return (time.perf_counter() - self.t0) * 1000.0
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Замер фазы
+
+        Пример:
+            with startup.phase('import.gui'):
+                from gui import MainWindow
+        """
+        modules_before = len(sys.modules)
+        start = self._now_ms()
+        try:
+            yield
+        finally:
+            entry = {
+                'name': name,
+                'start_ms': round(start, 1),
+                'duration_ms': round(self._now_ms() - start, 1),
+                'modules': len(sys.modules) - modules_before,
+                'thread': threading.current_thread().name,
+            }
+            with self._lock:
+                self.phases.append(entry)
+
+    def mark(self, name: str) -> float:
+        """Отметить момент (мс от старта)"""
+        value = round(self._now_ms(), 1)
+        with self._lock:
+            self.marks[name] = value
+        return value
+
+    def report(self) -> dict:
+        """Отчет: фазы, отметки, итог"""
+        with self._lock:
+            phases = list(self.phases)
+            marks = dict(self.marks)
+
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'total_ms': round(self._now_ms(), 1),
+            'marks': marks,
+            'phases': phases,
+        }
+
+    def format_report(self) -> str:
+        """Текстовая сводка (для лога)"""
+        report = self.report()
+        lines = ["=" * 70, "STARTUP", "=" * 70]
+
+        for name, value in report['marks'].items():
+            lines.append(f"  {name:<32} at {value:>9.1f} ms")
+
+        lines.append(f"  {'phase':<32} {'start':>9} {'took':>9} {'mods':>6}  thread")
+        for p in report['phases']:
+            lines.append(
+                f"  {p['name']:<32} {p['start_ms']:>9.1f} {p['duration_ms']:>9.1f} "
+                f"{p['modules']:>6}  {p['thread']}"
+            )
+        return "\n".join(lines)
+
+    def write(self, directory: Path = None) -> Path:
+        """
+        Записать отчет (один раз за запуск)
+
+        Returns:
+            Path: путь к startup.json (None если уже записан или ошибка)
+        """
+        if self.written:
+            return None
+        self.written = True
+
+        directory = Path(directory) if directory else STARTUP_DIR
+        report = self.report()
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / STARTUP_REPORT_FILE
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+            # История: только итоги, чтобы регрессии было видно по строкам
+            summary = {
+                'started_at': report['started_at'],
+                'total_ms': report['total_ms'],
+                'marks': report['marks'],
+                'phases': {p['name']: p['duration_ms'] for p in report['phases']},
+            }
+            with open(directory / STARTUP_HISTORY_FILE, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logging.warning(f"⚠️ Failed to write startup report: {e}")
+            return None
+
+        logging.info(self.format_report())
+        return path
+
+
+# Глобальный профиль (t0 - момент первого импорта модуля)
+startup = StartupProfile()
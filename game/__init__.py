@@ -1,8 +1,37 @@
 """
 Игровая механика - память, структуры, оффсеты
 """
-from game.memory import Memory
+from game.memory import Memory, Win32Backend
 from game.structs import CharBase, WorldManager
 from game.offsets import OFFSETS, resolve_offset
+from game.spatial import EntityRecord, SpatialGrid
+from game.tracker import EntityTracker, WorldTracker
+from game.simulated import SimulatedBackend, SimulatedMemory
+from game.module_registry import ModuleRegistry, module_registry
 
-__all__ = ['Memory', 'CharBase', 'WorldManager', 'OFFSETS', 'resolve_offset']
\ No newline at end of file
+__all__ = [
+    'Memory',
+    'Win32Backend',
+    'CharBase',
+    'WorldManager',
+    'OFFSETS',
+    'resolve_offset',
+    'EntityRecord',
+    'SpatialGrid',
+    'EntityTracker',
+    'WorldTracker',
+    'SimulatedBackend',
+    'SimulatedMemory',
+    'StateRingWriter',
+    'StateRingReader',
+    'ModuleRegistry',
+    'module_registry',
+]
+
+
+def __getattr__(name):
+    # state_ring - лениво: shared memory нужна только с --state-ring
+    if name in ('StateRingWriter', 'StateRingReader'):
+        from game import state_ring
+        return getattr(state_ring, name)
+    raise AttributeError(f"module 'game' has no attribute '{name}'")
@@ -4,19 +4,165 @@
 """
 import ctypes
 from ctypes import wintypes
+import functools
 import logging
+import struct
+from collections import namedtuple
 from game.win32_api import *
 import threading  # ДОБАВИТЬ!
 import time        # ДОБАВИТЬ!
+from core.metrics import metrics
+from game.module_registry import module_registry
+
+# Декодеры скаляров (буфер потока -> значение)
+_INT8 = struct.Struct('<b')
+_INT32 = struct.Struct('<i')
+_UINT32 = struct.Struct('<I')
+_UINT64 = struct.Struct('<Q')
+_FLOAT = struct.Struct('<f')
+
+SCALAR_CODECS = {
+    'byte': _INT8,
+    'int': _INT32,
+    'uint': _UINT32,
+    'uint64': _UINT64,
+    'float': _FLOAT,
+}
+
+# Причины неудачного чтения/записи
+READ_CLOSED = 'closed'             # хендл процесса закрыт
+READ_BAD_ADDRESS = 'bad_address'   # адрес не приводится к указателю
+READ_FAILED = 'failed'             # ReadProcessMemory вернул FALSE (см. winerror)
+READ_PARTIAL = 'partial'           # прочитано меньше, чем запрошено
+
+# Явный результат чтения (Memory.read_result)
+ReadResult = namedtuple('ReadResult', ['ok', 'value', 'error', 'winerror'])
+
+c_void_p = ctypes.c_void_p
+
+# Начальный размер буфера блоков (строки, read_bytes), растет по запросу
+BLOCK_BUFFER_SIZE = 1024
+
+
+class _ThreadBuffers(threading.local):
+    """Буферы вызовов WinAPI потока (переиспользуются, без аллокаций на вызов)"""
+
+    def __init__(self):
+        self.scalar = ctypes.create_string_buffer(8)
+        self.write_scalar = ctypes.create_string_buffer(8)
+        self.block = ctypes.create_string_buffer(BLOCK_BUFFER_SIZE)
+        self.block_view = memoryview(self.block).cast('B')
+        self.count = ctypes.c_size_t()
+        self.count_ref = ctypes.byref(self.count)
+        self.exit_code = wintypes.DWORD()
+        self.exit_code_ref = ctypes.byref(self.exit_code)
+        self.error = None
+        self.winerror = 0
+
+    def block_for(self, size):
+        if size > len(self.block):
+            self.block = ctypes.create_string_buffer(size)
+            self.block_view = memoryview(self.block).cast('B')
+        return self.block
+
+
+_buffers = _ThreadBuffers()
+
+
+def _fail(error, winerror=0):
+    """Запомнить причину неудачи (в буферах потока); -1 для _read_raw"""
+    _buffers.error = error
+    _buffers.winerror = winerror
+    return -1
+
+
+@functools.lru_cache(maxsize=None)
+def _fast_kernel32():
+    """
+    Отдельный экземпляр kernel32 для горячих вызовов (общий windll.kernel32 не трогаем)
+    
+    Задан только restype: argtypes заставляют ctypes звать from_param на каждый
+    аргумент, и вызов выходит дороже, чем с готовыми ctypes-объектами
+    (буфер потока, byref счетчика, c_void_p адреса) - см. benchmarks.bench_memory.
+    """
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.ReadProcessMemory.restype = wintypes.BOOL
+    kernel32.WriteProcessMemory.restype = wintypes.BOOL
+    kernel32.GetExitCodeProcess.restype = wintypes.BOOL
+    return kernel32
+
+
+class Win32Backend:
+    """
+    Процессы клиентов Windows (Toolhelp + OpenProcess)
+
+    Интерфейс backend для MultiboxManager и headless режима
+    (симуляция без Windows - game.simulated.SimulatedBackend):
+        list_pids(process_name) -> [pid]
+        attach(pid) -> Memory или None
+        foreground_pid() -> pid активного окна или None
+    """
+    
+    def __init__(self):
+        self.kernel32 = ctypes.windll.kernel32
+        self.user32 = ctypes.windll.user32
+    
+    def list_pids(self, process_name="ElementClient.exe"):
+        """Получить список всех PID процесса"""
+        snapshot = self.kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPPROCESS, 0)
+        pe32 = PROCESSENTRY32()
+        pe32.dwSize = ctypes.sizeof(PROCESSENTRY32)
+        
+        pids = []
+        
+        if self.kernel32.Process32First(snapshot, ctypes.byref(pe32)):
+            while True:
+                current_name = pe32.szExeFile.decode('utf-8', errors='ignore')
+                if current_name.lower() == process_name.lower():
+                    pids.append(pe32.th32ProcessID)
+                
+                if not self.kernel32.Process32Next(snapshot, ctypes.byref(pe32)):
+                    break
+        
+        self.kernel32.CloseHandle(snapshot)
+        return pids
+    
+    def attach(self, pid):
+        """Подключиться к процессу (None если не удалось)"""
+        mem = Memory()
+        if mem.attach_by_pid(pid):
+            return mem
+        mem.close()
+        return None
+    
+    def foreground_pid(self):
+        """PID процесса активного окна"""
+        hwnd = self.user32.GetForegroundWindow()
+        if not hwnd:
+            return None
+        
+        process_id = wintypes.DWORD()
+        self.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(process_id))
+        return process_id.value
+
 
 class Memory:
     """Управление памятью процесса"""
     
     def __init__(self):
         self.kernel32 = ctypes.windll.kernel32
+        
+        # Горячие вызовы - свой экземпляр kernel32 (restype + готовые аргументы)
+        fast = _fast_kernel32()
+        self._rpm = fast.ReadProcessMemory
+        self._wpm = fast.WriteProcessMemory
+        self._exit_code = fast.GetExitCodeProcess
+        
         self.process_handle = None
         self.pid = None
         self.module_base = None
+        self.module_build = None  # отпечаток сборки модуля (game.module_registry)
+        self.module_registry = None
         self.logger = logging.getLogger(self.__class__.__name__)
     
     def attach_by_pid(self, pid, module_name="ElementClient.exe"):
@@ -38,8 +184,8 @@ class Memory:
             self.logger.error(f"Failed to open process {pid}")
             return False
         
-        # Получаем базовый адрес модуля
-        self.module_base = self._get_module_base(module_name)
+        # Получаем базовый адрес модуля (известная сборка - без обхода Toolhelp)
+        self.module_base = module_registry.locate(self, module_name)
         if self.module_base == 0:
             self.logger.error(f"Failed to get module base for {module_name}")
             return False
@@ -49,6 +195,15 @@ class Memory:
     
     def _get_module_base(self, module_name):
         """Получить базовый адрес модуля"""
+        return self._find_module(module_name)[0]
+    
+    def _find_module(self, module_name):
+        """
+        Найти модуль обходом Toolhelp
+        
+        Returns:
+            (base, size): (0, 0) если модуль не найден
+        """
         snapshot = self.kernel32.CreateToolhelp32Snapshot(TH32CS_SNAPMODULE, self.pid)
         me32 = MODULEENTRY32()
         me32.dwSize = ctypes.sizeof(MODULEENTRY32)
@@ -58,218 +213,187 @@ class Memory:
                 current_module = me32.szModule.decode('utf-8', errors='ignore')
                 if current_module.lower() == module_name.lower():
                     base = ctypes.cast(me32.modBaseAddr, ctypes.c_void_p).value
+                    size = me32.modBaseSize
                     self.kernel32.CloseHandle(snapshot)
-                    return base
+                    return base, size
                 
                 if not self.kernel32.Module32Next(snapshot, ctypes.byref(me32)):
                     break
         
         self.kernel32.CloseHandle(snapshot)
-        return 0
+        return 0, 0
     
-    def read_int(self, address):
-        """Прочитать 4-байтовое целое число с проверкой"""
+    # ========================================
+    # ЧТЕНИЕ (быстрый путь)
+    # ========================================
+    
+    def _read_raw(self, address, buffer, size) -> int:
+        """
+        ReadProcessMemory в готовый буфер
+        
+        Returns:
+            int: прочитано байт или -1 (причина - в last_read_error())
+        """
+        handle = self.process_handle
+        if not handle:
+            return _fail(READ_CLOSED)
+        
+        buffers = _buffers
         try:
-            buffer = ctypes.c_int()
-            bytes_read = ctypes.c_size_t()
-            
-            result = self.kernel32.ReadProcessMemory(
-                self.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(buffer),
-                4,
-                ctypes.byref(bytes_read)
-            )
-            
-            if not result or bytes_read.value != 4:
-                return None
-            
-            return buffer.value
-        except:
+            ok = self._rpm(handle, c_void_p(address), buffer, size, buffers.count_ref)
+        except (ctypes.ArgumentError, TypeError, OverflowError):
+            return _fail(READ_BAD_ADDRESS)
+        
+        count = buffers.count.value
+        if metrics.enabled:
+            metrics.record_io('memory.rpm', count)
+        
+        if not ok:
+            return _fail(READ_FAILED, ctypes.get_last_error())
+        return count
+    
+    def _read_scalar(self, address, codec):
+        """Скаляр через буфер потока (None при ошибке)"""
+        buffer = _buffers.scalar
+        count = self._read_raw(address, buffer, codec.size)
+        if count != codec.size:
+            if count >= 0:
+                _fail(READ_PARTIAL)
             return None
+        return codec.unpack_from(buffer)[0]
+    
+    def read_result(self, address, kind: str) -> ReadResult:
+        """
+        Прочитать скаляр с явным результатом
+        
+        Args:
+            kind: 'int', 'uint', 'uint64', 'float', 'byte'
+        
+        Returns:
+            ReadResult(ok, value, error, winerror)
+        """
+        buffers = _buffers
+        buffers.error = None
+        buffers.winerror = 0
+        value = self._read_scalar(address, SCALAR_CODECS[kind])
+        return ReadResult(buffers.error is None, value, buffers.error, buffers.winerror)
+    
+    def last_read_error(self):
+        """Причина последней неудачи в этом потоке: (READ_*, код Windows)"""
+        return _buffers.error, _buffers.winerror
+    
+    def read_int(self, address):
+        """Прочитать 4-байтовое целое число с проверкой"""
+        return self._read_scalar(address, _INT32)
 
     def read_uint(self, address):
         """Прочитать 4-байтовое беззнаковое целое число с проверкой"""
-        try:
-            buffer = ctypes.c_uint32()
-            bytes_read = ctypes.c_size_t()
-            
-            result = self.kernel32.ReadProcessMemory(
-                self.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(buffer),
-                4,
-                ctypes.byref(bytes_read)
-            )
-            
-            if not result or bytes_read.value != 4:
-                return None
-            
-            return buffer.value
-        except:
-            return None
+        return self._read_scalar(address, _UINT32)
 
     def read_uint64(self, address):
         """Прочитать 8-байтовое целое число с проверкой"""
-        try:
-            buffer = ctypes.c_uint64()
-            bytes_read = ctypes.c_size_t()
-            
-            result = self.kernel32.ReadProcessMemory(
-                self.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(buffer),
-                8,
-                ctypes.byref(bytes_read)
-            )
-            
-            if not result or bytes_read.value != 8:
-                return None
-            
-            return buffer.value
-        except:
-            return None
+        return self._read_scalar(address, _UINT64)
     
     def read_float(self, address):
         """Прочитать float с проверкой"""
-        try:
-            buffer = ctypes.c_float()
-            bytes_read = ctypes.c_size_t()
-            
-            result = self.kernel32.ReadProcessMemory(
-                self.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(buffer),
-                4,
-                ctypes.byref(bytes_read)
-            )
-            
-            if not result or bytes_read.value != 4:
-                return None
-            
-            return buffer.value
-        except:
-            return None
+        return self._read_scalar(address, _FLOAT)
     
     def read_byte(self, address):
         """Прочитать 1 байт"""
-        try:
-            buffer = ctypes.c_byte()
-            bytes_read = ctypes.c_size_t()
-            
-            result = self.kernel32.ReadProcessMemory(
-                self.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(buffer),
-                1,
-                ctypes.byref(bytes_read)
-            )
-            
-            if not result or bytes_read.value != 1:
-                return None
-            
-            return buffer.value
-        except:
+        return self._read_scalar(address, _INT8)
+    
+    def read_into(self, address, out) -> int:
+        """
+        Прочитать len(out) байт прямо в out (bytearray / ctypes буфер / memoryview)
+        
+        Returns:
+            int: прочитано байт (0 - ошибка)
+        """
+        if not isinstance(out, ctypes.Array):
+            out = (ctypes.c_char * len(memoryview(out).cast('B'))).from_buffer(out)
+        return max(0, self._read_raw(address, out, ctypes.sizeof(out)))
+  
+    def read_bytes(self, address, size):
+        """Прочитать блок байтов одним вызовом (None если прочитано не всё)"""
+        buffer = _buffers.block_for(size)
+        count = self._read_raw(address, buffer, size)
+        if count != size:
+            if count >= 0:
+                _fail(READ_PARTIAL)
             return None
+        return _buffers.block_view[:size].tobytes()
   
     def read_string(self, address, max_length=256, encoding='utf-16-le'):
         """Прочитать строку"""
-        try:
-            if encoding == 'utf-16-le':
-                buffer = (ctypes.c_wchar * max_length)()
-                bytes_to_read = max_length * 2
-            else:
-                buffer = (ctypes.c_char * max_length)()
-                bytes_to_read = max_length
-            
-            bytes_read = ctypes.c_size_t()
-            
-            result = self.kernel32.ReadProcessMemory(
-                self.process_handle,
-                ctypes.c_void_p(address),
-                buffer,
-                bytes_to_read,
-                ctypes.byref(bytes_read)
-            )
-            
-            if not result:
-                return None
-            
-            if encoding == 'utf-16-le':
-                # Для Unicode строк
-                text = ''.join(buffer).split('\x00')[0]
-            else:
-                # Для ASCII строк
-                text = buffer.value.decode(encoding, errors='ignore')
-            
-            return text
-        except Exception as e:
-            self.logger.error(f"Failed to read string at {hex(address)}: {e}")
+        size = max_length * 2 if encoding == 'utf-16-le' else max_length
+        buffer = _buffers.block_for(size)
+        count = self._read_raw(address, buffer, size)
+        if count <= 0:
             return None
+        
+        data = _buffers.block_view[:count]
+        if encoding == 'utf-16-le':
+            # Для Unicode строк (декодирование прямо из буфера потока)
+            return str(data, 'utf-16-le', 'ignore').partition('\x00')[0]
+        # Для ASCII строк
+        return data.tobytes().partition(b'\x00')[0].decode(encoding, errors='ignore')
     
-    def write_int(self, address, value):
-        """Записать 4-байтовое целое число"""
+    # ========================================
+    # ЗАПИСЬ
+    # ========================================
+    
+    def _write_raw(self, address, buffer, size) -> bool:
+        """WriteProcessMemory из готового буфера (bytes или ctypes)"""
+        handle = self.process_handle
+        if not handle:
+            _fail(READ_CLOSED)
+            return False
+        
+        buffers = _buffers
         try:
-            buffer = ctypes.c_int(value)
-            bytes_written = ctypes.c_size_t()
-            
-            result = self.kernel32.WriteProcessMemory(
-                self.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(buffer),
-                4,
-                ctypes.byref(bytes_written)
-            )
-            
-            return result and bytes_written.value == 4
-        except:
+            ok = self._wpm(handle, c_void_p(address), buffer, size, buffers.count_ref)
+        except (ctypes.ArgumentError, TypeError, OverflowError):
+            _fail(READ_BAD_ADDRESS)
+            return False
+        
+        count = buffers.count.value
+        if metrics.enabled:
+            metrics.record_io('memory.wpm', count)
+        
+        if not ok:
+            _fail(READ_FAILED, ctypes.get_last_error())
             return False
+        return count == size
     
-    def write_float(self, address, value):
-        """Записать float"""
+    def _write_scalar(self, address, codec, value) -> bool:
+        buffer = _buffers.write_scalar
         try:
-            buffer = ctypes.c_float(value)
-            bytes_written = ctypes.c_size_t()
-            
-            result = self.kernel32.WriteProcessMemory(
-                self.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(buffer),
-                4,
-                ctypes.byref(bytes_written)
-            )
-            
-            return result and bytes_written.value == 4
-        except:
+            codec.pack_into(buffer, 0, value)
+        except struct.error:
             return False
+        return self._write_raw(address, buffer, codec.size)
+    
+    def write_int(self, address, value):
+        """Записать 4-байтовое целое число"""
+        return self._write_scalar(address, _INT32, value)
+    
+    def write_float(self, address, value):
+        """Записать float"""
+        return self._write_scalar(address, _FLOAT, value)
     
     def write_byte(self, address, value):
         """Записать 1 байт"""
-        try:
-            buffer = ctypes.c_byte(value)
-            bytes_written = ctypes.c_size_t()
-            
-            result = self.kernel32.WriteProcessMemory(
-                self.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(buffer),
-                1,
-                ctypes.byref(bytes_written)
-            )
-            
-            return result and bytes_written.value == 1
-        except:
-            return False
+        return self._write_scalar(address, _INT8, value)
     
     def is_valid(self):
         """Проверка что процесс еще жив"""
         if not self.process_handle:
             return False
         
-        exit_code = wintypes.DWORD()
-        if self.kernel32.GetExitCodeProcess(self.process_handle, ctypes.byref(exit_code)):
+        buffers = _buffers
+        if self._exit_code(self.process_handle, buffers.exit_code_ref):
             # STILL_ACTIVE = 259
-            return exit_code.value == 259
+            return buffers.exit_code.value == 259
         
         return False
     
@@ -280,6 +404,7 @@ class Memory:
             self.process_handle = None
             self.pid = None
             self.module_base = None
+            self.module_build = None
 
     def freeze_address(self, address, value):
         """
@@ -297,39 +422,11 @@ class Memory:
 
     def write_uint(self, address, value):
         """Записать 4-байтовое беззнаковое целое число"""
-        try:
-            buffer = ctypes.c_uint32(value)
-            bytes_written = ctypes.c_size_t()
-            
-            result = self.kernel32.WriteProcessMemory(
-                self.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(buffer),
-                4,
-                ctypes.byref(bytes_written)
-            )
-            
-            return result and bytes_written.value == 4
-        except:
-            return False
+        return self._write_scalar(address, _UINT32, value)
 
     def write_uint64(self, address, value):
         """Записать 8-байтовое целое число"""
-        try:
-            buffer = ctypes.c_uint64(value)
-            bytes_written = ctypes.c_size_t()
-            
-            result = self.kernel32.WriteProcessMemory(
-                self.process_handle,
-                ctypes.c_void_p(address),
-                ctypes.byref(buffer),
-                8,
-                ctypes.byref(bytes_written)
-            )
-            
-            return result and bytes_written.value == 8
-        except:
-            return False
+        return self._write_scalar(address, _UINT64, value)
 
     def allocate_memory(self, size):
         """Выделить память в процессе"""
@@ -375,26 +472,18 @@ class Memory:
 
     def write_bytes(self, address, data):
         """Записать массив байтов"""
-        try:
-            buffer = (ctypes.c_byte * len(data))(*data)
-            bytes_written = ctypes.c_size_t()
-            
-            result = self.kernel32.WriteProcessMemory(
-                self.process_handle,
-                ctypes.c_void_p(address),
-                buffer,
-                len(data),
-                ctypes.byref(bytes_written)
-            )
-            
-            if result and bytes_written.value == len(data):
-                return True
-            else:
-                self.logger.error(f"Failed to write bytes at {hex(address)}")
-                return False
-        except Exception as e:
-            self.logger.error(f"Exception in write_bytes: {e}")
-            return False
+        if not isinstance(data, bytes):
+            data = bytes(b & 0xFF for b in data)
+        if self._write_raw(address, data, len(data)):
+            return True
+        self.logger.error(f"Failed to write bytes at {hex(address)}: {self.last_read_error()}")
+        return False
+
+    def write_block(self, address, data: bytes):
+        """Записать готовый блок байтов одним вызовом (без логирования - для горячих путей)"""
+        if not isinstance(data, bytes):
+            data = bytes(data)
+        return self._write_raw(address, data, len(data))
 
     def create_remote_thread(self, start_address, parameter=0):
         """Создать поток в удалённом процессе"""
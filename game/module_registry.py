@@ -0,0 +1,234 @@
+"""
+Реестр сборок модуля ElementClient.exe между клиентами и перезапусками
+
+Все клиенты запущены из одной сборки, поэтому:
+- сборка узнается по отпечатку: имя модуля + SizeOfImage + хэш PE-заголовка
+  (ImageBase обнулен - загрузчик переписывает его при ASLR)
+- для сборки запоминаются базы, по которым она уже встречалась: подключение
+  следующего клиента - одно чтение заголовка по известной базе вместо обхода
+  Toolhelp (обход - только если заголовок не совпал)
+
+Загрузка - один раз при первом подключении, запись - в фоне
+(изменения за MODULES_DEBOUNCE секунд сливаются, файл пишется атомарно)
+"""
+import hashlib
+import json
+import logging
+import struct
+import threading
+import time
+from pathlib import Path
+
+from core.debounced_writer import DebouncedWriter
+from core.metrics import metrics
+
+MODULES_FILE = Path.home() / "AppData" / "Local" / "xvocmuk" / "modules.json"
+
+# Окно объединения записей (секунды)
+MODULES_DEBOUNCE = 2.0
+
+# Сколько читать от базы модуля для отпечатка (страница PE-заголовков)
+HEADER_SIZE = 0x1000
+
+# Сколько последних баз помнить на сборку и сколько сборок хранить
+MAX_BASE_HINTS = 4
+MAX_BUILDS = 16
+
+_FILE_VERSION = 1
+
+_UINT16 = struct.Struct('<H')
+_UINT32 = struct.Struct('<I')
+
+# Optional header: Magic, ImageBase (PE32 / PE32+), SizeOfImage, SizeOfHeaders
+_PE32_MAGIC = 0x10B
+_PE32_PLUS_MAGIC = 0x20B
+_IMAGE_BASE_FIELD = {_PE32_MAGIC: (28, 4), _PE32_PLUS_MAGIC: (24, 8)}
+_SIZE_OF_IMAGE_OFFSET = 56
+_SIZE_OF_HEADERS_OFFSET = 60
+
+
+def fingerprint(module_name: str, header) -> str:
+    """
+    Отпечаток сборки по заголовку модуля
+
+    Returns:
+        str: "имя:SizeOfImage:хэш" или None (не PE-образ)
+    """
+    if not header or len(header) < 0x40 or header[:2] != b'MZ':
+        return None
+
+    pe = _UINT32.unpack_from(header, 0x3C)[0]
+    optional = pe + 24
+    if optional + _SIZE_OF_HEADERS_OFFSET + 4 > len(header) or header[pe:pe + 4] != b'PE\0\0':
+        return None
+
+    magic = _UINT16.unpack_from(header, optional)[0]
+    if magic not in _IMAGE_BASE_FIELD:
+        return None
+
+    size = _UINT32.unpack_from(header, optional + _SIZE_OF_IMAGE_OFFSET)[0]
+    headers_size = _UINT32.unpack_from(header, optional + _SIZE_OF_HEADERS_OFFSET)[0]
+
+    # Хэшируются только заголовки (остаток страницы - нули)
+    data = bytearray(header[:max(optional + _SIZE_OF_HEADERS_OFFSET + 4, min(headers_size, len(header)))])
+    field, width = _IMAGE_BASE_FIELD[magic]
+    data[optional + field:optional + field + width] = bytes(width)
+    digest = hashlib.blake2b(data, digest_size=12).hexdigest()
+
+    return f"{module_name.lower()}:{size:x}:{digest}"
+
+
+class ModuleRegistry:
+    """
+    Известные сборки модуля {fingerprint: {...}}
+
+    Поля сборки:
+        module      - имя модуля
+        bases       - последние базы, где сборка встречалась (новые первыми)
+        seen_at     - время последнего подключения (unix)
+
+    Memory после locate() хранит module_build - отпечаток своей сборки
+    и module_registry - реестр, в котором она записана.
+    """
+
+    def __init__(self, path: Path = MODULES_FILE):
+        self.path = Path(path)
+        self.builds = None  # {fingerprint: dict}, None - еще не загружено
+
+        # Заголовки, уже сверенные в этом запуске: {(fingerprint, base): bytes}
+        # (следующий клиент той же сборки - сравнение байт вместо хэша)
+        self._verified = {}
+
+        self._lock = threading.Lock()
+        self._writer = DebouncedWriter(
+            self.path, self._snapshot, MODULES_DEBOUNCE,
+            name="modules-writer", label="module registry"
+        )
+
+    def _ensure_loaded(self):
+        """Прочитать файл (под блокировкой, один раз)"""
+        if self.builds is not None:
+            return
+
+        self.builds = {}
+        if not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict) and data.get('version') == _FILE_VERSION:
+                builds = data.get('builds', {})
+                self.builds = {key: value for key, value in builds.items() if isinstance(value, dict)}
+                for build in self.builds.values():
+                    build.pop('statics', None)  # кэш static-путей прежних версий
+            logging.info(f"🧩 Loaded {len(self.builds)} known client builds")
+        except Exception as e:
+            logging.warning(f"⚠️ Module registry unreadable, starting empty: {e}")
+
+    # ========================================
+    # ПОДКЛЮЧЕНИЕ
+    # ========================================
+
+    def locate(self, memory, module_name: str = "ElementClient.exe") -> int:
+        """
+        База модуля в процессе memory (0 если не найден)
+
+        Сначала - известные базы сборок этого модуля (чтение заголовка),
+        затем - memory._find_module (обход Toolhelp) с регистрацией сборки.
+        Записывает memory.module_build и memory.module_registry.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            candidates = [
+                (key, base)
+                for key, build in sorted(self.builds.items(), key=lambda item: -item[1].get('seen_at', 0))
+                if build.get('module') == module_name.lower()
+                for base in build.get('bases', ())
+            ]
+
+        for key, base in candidates:
+            header = memory.read_bytes(base, HEADER_SIZE)
+            if not header:
+                continue
+            if header != self._verified.get((key, base)):
+                if fingerprint(module_name, header) != key:
+                    continue
+                self._verified[(key, base)] = header
+            if metrics.enabled:
+                metrics.incr('modules.warm')
+            self._seen(key, base)
+            memory.module_build, memory.module_registry = key, self
+            return base
+
+        if metrics.enabled:
+            metrics.incr('modules.enumerate')
+
+        base, _ = memory._find_module(module_name)
+        if not base:
+            return 0
+
+        memory.module_build, memory.module_registry = self.register(memory, module_name, base), self
+        return base
+
+    def register(self, memory, module_name: str, base: int) -> str:
+        """
+        Запомнить сборку модуля по базе (после обхода Toolhelp)
+
+        Returns:
+            str: отпечаток или None (заголовок не прочитан)
+        """
+        header = memory.read_bytes(base, HEADER_SIZE)
+        key = fingerprint(module_name, header)
+        if key is None:
+            logging.warning(f"⚠️ No PE header at {hex(base)} ({module_name}), build not cached")
+            return None
+
+        with self._lock:
+            self._ensure_loaded()
+            if key not in self.builds:
+                self.builds[key] = {'module': module_name.lower(), 'bases': []}
+                logging.info(f"🧩 New client build {key}")
+        self._verified[(key, base)] = header
+        self._seen(key, base)
+        return key
+
+    def _seen(self, key: str, base: int):
+        """Поднять базу в начало списка сборки (запись - только если список изменился)"""
+        with self._lock:
+            build = self.builds.get(key)
+            if build is None:
+                return
+            bases = build.setdefault('bases', [])
+            if bases[:1] == [base]:
+                return
+            if base in bases:
+                bases.remove(base)
+            bases.insert(0, base)
+            del bases[MAX_BASE_HINTS:]
+            build['seen_at'] = int(time.time())
+        self._writer.mark_dirty()
+
+    # ========================================
+    # ЗАПИСЬ
+    # ========================================
+
+    def _snapshot(self) -> str:
+        """Текст файла реестра (из потока записи)"""
+        with self._lock:
+            # Старые сборки (обновления клиента) - не больше MAX_BUILDS
+            recent = sorted(self.builds.items(), key=lambda item: -item[1].get('seen_at', 0))
+            self.builds = dict(recent[:MAX_BUILDS])
+            return json.dumps({'version': _FILE_VERSION, 'builds': self.builds}, indent=1)
+
+    def flush(self):
+        """Записать несохраненные изменения сейчас"""
+        self._writer.flush()
+
+    def close(self):
+        """Остановить фоновую запись и дописать изменения (при выходе)"""
+        self._writer.close()
+
+
+# Глобальный реестр (Memory.attach_by_pid, resolve_offset)
+module_registry = ModuleRegistry()
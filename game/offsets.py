@@ -28,6 +28,10 @@ def set_base_address(address: str):
     import logging
     logging.info(f"✅ Base address set: {_BASE_ADDRESS}")
 
+def get_base_address() -> str:
+    """Текущий базовый адрес (hex строка) - для передачи в процессы воркеров"""
+    return _BASE_ADDRESS
+
 OFFSETS = {
     # ========================================
     # CHAR BASE
@@ -98,6 +102,74 @@ OFFSETS = {
     "target_pos_z": "float:target_ptr +0xF8",
 }
 
+# ========================================
+# ЧАСТОТА ПЕРЕЧИТЫВАНИЯ
+# ========================================
+# static_module - адрес от базы модуля, одинаков для сборки клиента
+# static_char   - меняется только со сменой персонажа (поколение CharBase)
+# slow          - меняется редко, читается не чаще CHAR_SLOW_REFRESH_INTERVAL
+# hot           - читается на каждом refresh
+TIER_STATIC_MODULE = "static_module"
+TIER_STATIC_CHAR = "static_char"
+TIER_SLOW = "slow"
+TIER_HOT = "hot"
+
+OFFSET_TIERS = {
+    # Char base (char_origin / char_base / char_id - ключ поколения, читаются всегда)
+    "char_origin": TIER_STATIC_MODULE,
+    "char_base": TIER_STATIC_CHAR,
+    "char_move_struct": TIER_STATIC_CHAR,
+    "char_id": TIER_STATIC_CHAR,
+    "char_class": TIER_STATIC_CHAR,
+    "char_name": TIER_STATIC_CHAR,
+    "char_hp": TIER_SLOW,
+    "char_max_hp": TIER_SLOW,
+    "char_pos_x": TIER_HOT,
+    "char_pos_y": TIER_HOT,
+    "char_pos_z": TIER_HOT,
+    "fly_speed": TIER_SLOW,
+    "fly_speed_z": TIER_HOT,
+    "fly_status": TIER_HOT,
+    "fly_trigger": TIER_HOT,  # меняется при взлете/посадке
+
+    # Группа
+    "party_ptr": TIER_SLOW,
+    "party_count": TIER_SLOW,
+    "party_leader_id": TIER_SLOW,
+    "party_members_array": TIER_SLOW,
+    "party_members": TIER_SLOW,
+
+    # Мир
+    "world_origin": TIER_STATIC_MODULE,
+    "world_base": TIER_SLOW,
+    "loot_count": TIER_HOT,
+    "loot_container": TIER_SLOW,
+    "loot_items": TIER_HOT,
+    "people_count": TIER_HOT,
+    "people_container": TIER_SLOW,
+    "people_items": TIER_HOT,
+
+    # Selection / target
+    "selection_origin": TIER_STATIC_MODULE,
+    "selection_ptr": TIER_HOT,
+    "target_id": TIER_HOT,
+    "target_ptr": TIER_HOT,
+    "target_pos_x": TIER_HOT,
+    "target_pos_y": TIER_HOT,
+    "target_pos_z": TIER_HOT,
+}
+
+
+def offset_tier(name: str) -> str:
+    """Частота перечитывания поля OFFSETS (неизвестное поле - hot)"""
+    return OFFSET_TIERS.get(name, TIER_HOT)
+
+
+def field_offset(name: str) -> int:
+    """Последний оффсет пути OFFSETS[name] - поле внутри структуры ("float:char_base +0x9F8" -> 0x9F8)"""
+    parts = [p for p in OFFSETS[name].split() if p.startswith("+0x")]
+    return int(parts[-1][1:], 16)
+
 
 
 import ctypes
@@ -106,6 +178,31 @@ from collections import Counter
 from game.memory import Memory
 from game.win32_api import TH32CS_SNAPPROCESS, PROCESSENTRY32
 from config.constants import CLASS_NAMES_DEBUG
+from core.metrics import metrics
+
+# static-пути без разыменований: {путь: оффсет от базы модуля или None}
+# (зависит только от строки пути - один разбор на процесс)
+_STATIC_OFFSETS = {}
+
+
+def parse_static(path_str: str):
+    """
+    Оффсет static-пути от базы модуля
+
+    "static:ElementClient.exe +0x148C338 +0x1000" -> 0x148D338
+    None - путь не static или с разыменованием (->)
+    """
+    if not path_str.startswith("static:") or "->" in path_str:
+        return None
+
+    total = 0
+    for part in path_str.split()[1:]:
+        if part.startswith("+0x"):
+            total += int(part[1:], 16)
+        elif part != "ElementClient.exe":
+            return None
+    return total
+
 
 def get_first_pid(process_name="ElementClient.exe"):
     """Получить PID первого найденного процесса"""
@@ -165,18 +262,27 @@ def parse_array_fields(fields_str):
     
     return fields
 
-def resolve_offset(memory, path_str, cached_values=None):
+def resolve_offset(memory, path_str, cached_values=None, with_ptr=False):
     """
     Парсит path-based оффсет и возвращает финальное значение
     
     Формат массива: array:base_ref:max_count:step:{field1:type1:offset1,...}
     Пример: "array:party_members_array:10:8:{id:int32:0x18}"
+    
+    Тип addr - адрес последнего поля без чтения значения
+    ("addr:selection_ptr +0x0 -> +0x10" - где лежит target_ptr)
+    
+    with_ptr: для массивов добавить в каждый элемент 'ptr' (указатель на объект)
     """
     if cached_values is None:
         cached_values = {}
     
+    is_array = path_str.startswith("array:")
+    if metrics.enabled:
+        metrics.incr('resolve.array' if is_array else 'resolve.scalar')
+    
     # Проверка на массив
-    if path_str.startswith("array:"):
+    if is_array:
         # Парсим формат array:base_ref:max_count:step:{fields}
         brace_pos = path_str.find("{")
         if brace_pos == -1:
@@ -265,10 +371,23 @@ def resolve_offset(memory, path_str, cached_values=None):
             # Фильтрация для координат (только если есть поля x/y)
             # Для других массивов (party) - добавляем если есть ненулевые значения
             if any(v is not None and v != 0 for v in item.values()):
+                if with_ptr:
+                    item['ptr'] = ptr
                 results.append(item)
 
         return results
     
+    # static без разыменований: оффсет от базы модуля (разобран один раз)
+    if path_str.startswith("static:"):
+        try:
+            offset = _STATIC_OFFSETS[path_str]
+        except KeyError:
+            offset = _STATIC_OFFSETS[path_str] = parse_static(path_str)
+        if offset is not None:
+            if not memory.module_base:
+                return None
+            return memory.read_uint64(memory.module_base + offset)
+    
     # Обычная обработка
     parts = path_str.split()
     data_type = None
@@ -289,7 +408,7 @@ def resolve_offset(memory, path_str, cached_values=None):
                 i += 1
                 continue
                 
-            elif data_type in ["ptr", "int32", "uint32", "float", "str"]:
+            elif data_type in ["ptr", "int32", "uint32", "float", "str", "addr"]:
                 if ref and ref in cached_values:
                     current_addr = cached_values[ref]
                 elif ref and ref in OFFSETS:
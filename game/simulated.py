@@ -0,0 +1,569 @@
+"""
+Симуляция клиентов ElementClient.exe без Windows
+Память клиента - разреженные страницы, структуры разложены по OFFSETS
+(те же цепочки указателей, что в игре), поэтому CharBase, WorldManager,
+MultiboxManager и экшены работают без изменений.
+
+- SimulatedMemory - замена Memory (read_* / write_* / is_valid / close)
+- SimulatedClient - один "процесс": персонаж, группа, таргет, мир
+- SimulatedBackend - список процессов для MultiboxManager (как Win32Backend)
+
+Для headless режима (python xvocmuk.py --headless --simulate N),
+soak-тестов и замеров производительности.
+"""
+import logging
+import math
+import random
+import struct
+import threading
+
+from core.metrics import metrics
+from game.memory import READ_CLOSED, READ_FAILED, SCALAR_CODECS, ReadResult
+from game.offsets import OFFSETS
+
+PAGE_SIZE = 0x1000
+
+# Адреса как у 64-битного клиента
+SIM_MODULE_BASE = 0x140000000
+SIM_MODULE_SIZE = 0x1A00000
+SIM_HEAP_BASE = 0x200000000
+SIM_PID_BASE = 10000
+
+# Размеры структур
+CHAR_BASE_SIZE = 0x1300
+ENTITY_CONTAINER_SLOTS = 4096
+
+# Остальные модули процесса (список Toolhelp): системные DLL за модулем клиента
+SIM_SYSTEM_MODULES = 120
+SIM_SYSTEM_MODULE_BASE = 0x7FF800000000
+
+_INT32 = struct.Struct('<i')
+_UINT32 = struct.Struct('<I')
+_UINT64 = struct.Struct('<Q')
+_FLOAT = struct.Struct('<f')
+_BYTE = struct.Struct('<b')
+
+
+def _last_offset(name: str) -> int:
+    """Последний оффсет пути OFFSETS[name] (поле внутри структуры)"""
+    parts = [p for p in OFFSETS[name].split() if p.startswith("+0x")]
+    return int(parts[-1][1:], 16)
+
+
+def _static_offset(name: str) -> int:
+    """Сумма оффсетов static-пути от базы модуля (адрес ячейки с указателем)"""
+    return sum(int(p[1:], 16) for p in OFFSETS[name].split() if p.startswith("+0x"))
+
+
+class SimulatedMemory:
+    """
+    Память симулированного клиента (интерфейс Memory)
+
+    Чтение/запись только по выделенным страницам; обращение к невыделенной
+    странице - как неудачный ReadProcessMemory (None / False).
+    """
+
+    def __init__(self, client: "SimulatedClient"):
+        self.client = client
+        self.pid = client.pid
+        self.module_base = client.module_base
+        self.module_build = None  # отпечаток сборки (если backend с module_registry)
+        self.module_registry = None
+        self.process_handle = client.pid  # не None пока не закрыт
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _read(self, address, size):
+        data = self.client.read(address, size) if self.process_handle else None
+        if metrics.enabled:
+            metrics.record_io('memory.rpm', len(data) if data else 0)
+        return data
+
+    def _write(self, address, data) -> bool:
+        ok = self.client.write(address, data) if self.process_handle else False
+        if metrics.enabled:
+            metrics.record_io('memory.wpm', len(data) if ok else 0)
+        return ok
+
+    def _unpack(self, fmt: struct.Struct, address):
+        if not address:
+            return None
+        data = self._read(address, fmt.size)
+        return fmt.unpack(data)[0] if data else None
+
+    def read_int(self, address):
+        return self._unpack(_INT32, address)
+
+    def read_uint(self, address):
+        return self._unpack(_UINT32, address)
+
+    def read_uint64(self, address):
+        return self._unpack(_UINT64, address)
+
+    def read_float(self, address):
+        return self._unpack(_FLOAT, address)
+
+    def read_byte(self, address):
+        return self._unpack(_BYTE, address)
+
+    def read_result(self, address, kind: str) -> ReadResult:
+        if not self.process_handle:
+            return ReadResult(False, None, READ_CLOSED, 0)
+        value = self._unpack(SCALAR_CODECS[kind], address)
+        if value is None:
+            return ReadResult(False, None, READ_FAILED, 0)
+        return ReadResult(True, value, None, 0)
+
+    def read_into(self, address, out) -> int:
+        view = memoryview(out).cast('B')
+        data = self.read_bytes(address, len(view))
+        if data is None:
+            return 0
+        view[:] = data
+        return len(data)
+
+    def read_bytes(self, address, size):
+        return self._read(address, size) if address else None
+
+    def read_string(self, address, max_length=256, encoding='utf-16-le'):
+        size = max_length * 2 if encoding == 'utf-16-le' else max_length
+        data = self._read(address, size) if address else None
+        if data is None:
+            return None
+        if encoding == 'utf-16-le':
+            return data.decode('utf-16-le', errors='ignore').split('\x00')[0]
+        return data.split(b'\x00')[0].decode(encoding, errors='ignore')
+
+    def write_int(self, address, value):
+        return self._write(address, _INT32.pack(value))
+
+    def write_uint(self, address, value):
+        return self._write(address, _UINT32.pack(value))
+
+    def write_uint64(self, address, value):
+        return self._write(address, _UINT64.pack(value))
+
+    def write_float(self, address, value):
+        return self._write(address, _FLOAT.pack(value))
+
+    def write_byte(self, address, value):
+        return self._write(address, _BYTE.pack(value))
+
+    def write_bytes(self, address, data):
+        return self._write(address, bytes(b & 0xFF for b in data))
+
+    def write_block(self, address, data: bytes):
+        return self._write(address, bytes(data))
+
+    def _find_module(self, module_name):
+        """(base, size) из снимка списка модулей - как обход Toolhelp"""
+        if not self.process_handle:
+            return 0, 0
+        for name, base, size in self.client.module_snapshot():
+            if name.lower() == module_name.lower():
+                return base, size
+        return 0, 0
+
+    def is_valid(self):
+        return bool(self.process_handle) and self.client.alive
+
+    def close(self):
+        self.process_handle = None
+        self.pid = None
+        self.module_base = None
+        self.module_build = None
+
+
+class SimulatedClient:
+    """
+    Один симулированный клиент
+
+    Раскладка памяти повторяет цепочки OFFSETS:
+        [module + char_origin] -> origin, [origin + 0x68] -> char_base
+        [char_base + 0xAA0] -> party, [party + 0x20] -> members[10]
+        [module + selection_origin] -> ... -> target
+        [module + world_origin] -> world_origin, [+0x10] -> world_base, [+0x28] -> container
+    """
+
+    def __init__(self, pid: int, char_id: int, name: str, char_class: int = 0,
+                 position=(0.0, 0.0, 0.0), module_base: int = SIM_MODULE_BASE):
+        self.pid = pid
+        self.module_base = module_base
+        self.alive = True
+
+        self._pages = {}  # {номер страницы: bytearray}
+        self._heap = SIM_HEAP_BASE
+        self._lock = threading.Lock()
+
+        self.fly_triggers = {'off': 0x10, 'on': 0x11}
+        self.members = []  # char_id участников группы (сначала лидер)
+
+        # Список модулей процесса (первый - клиент), счетчик снимков Toolhelp
+        self.modules = [("ElementClient.exe", module_base, SIM_MODULE_SIZE)]
+        self.modules += [
+            (f"sys{i:03d}.dll", SIM_SYSTEM_MODULE_BASE + i * 0x100000, 0x80000)
+            for i in range(SIM_SYSTEM_MODULES)
+        ]
+        self.module_snapshots = 0
+
+        self._layout_header()
+        self._layout_statics()
+        self.login(char_id, name, char_class, position)
+
+    # ========================================
+    # ПАМЯТЬ
+    # ========================================
+
+    def _map(self, address, size):
+        first = address // PAGE_SIZE
+        last = (address + size - 1) // PAGE_SIZE
+        for page in range(first, last + 1):
+            if page not in self._pages:
+                self._pages[page] = bytearray(PAGE_SIZE)
+
+    def alloc(self, size: int) -> int:
+        """Выделить обнуленный блок (выравнивание 16)"""
+        with self._lock:
+            address = self._heap
+            self._heap += (size + 15) & ~15
+            self._map(address, size)
+        return address
+
+    def read(self, address, size):
+        """Байты или None (есть невыделенная страница)"""
+        if not self.alive or address <= 0:
+            return None
+        out = bytearray()
+        while size > 0:
+            page, offset = divmod(address, PAGE_SIZE)
+            data = self._pages.get(page)
+            if data is None:
+                return None
+            chunk = min(size, PAGE_SIZE - offset)
+            out += data[offset:offset + chunk]
+            address += chunk
+            size -= chunk
+        return bytes(out)
+
+    def write(self, address, data) -> bool:
+        if not self.alive or address <= 0:
+            return False
+        size = len(data)
+        pos = 0
+        while pos < size:
+            page, offset = divmod(address + pos, PAGE_SIZE)
+            buffer = self._pages.get(page)
+            if buffer is None:
+                return False
+            chunk = min(size - pos, PAGE_SIZE - offset)
+            buffer[offset:offset + chunk] = data[pos:pos + chunk]
+            pos += chunk
+        return True
+
+    def _put(self, fmt: struct.Struct, address, value):
+        self.write(address, fmt.pack(value))
+
+    def _get(self, fmt: struct.Struct, address):
+        data = self.read(address, fmt.size)
+        return fmt.unpack(data)[0] if data else None
+
+    def _put_ptr(self, address, value):
+        self._put(_UINT64, address, value)
+
+    # ========================================
+    # РАСКЛАДКА
+    # ========================================
+
+    def _layout_header(self):
+        """PE-заголовок модуля (отпечаток сборки для module_registry)"""
+        base = self.module_base
+        self._map(base, PAGE_SIZE)
+        header = bytearray(PAGE_SIZE)
+        header[0:2] = b'MZ'
+        struct.pack_into('<I', header, 0x3C, 0x100)
+        header[0x100:0x104] = b'PE\0\0'
+        struct.pack_into('<HH', header, 0x104, 0x8664, 8)  # Machine, NumberOfSections
+        optional = 0x118
+        struct.pack_into('<H', header, optional, 0x20B)  # PE32+
+        struct.pack_into('<Q', header, optional + 24, base)  # ImageBase (переписан загрузчиком)
+        struct.pack_into('<I', header, optional + 56, SIM_MODULE_SIZE)  # SizeOfImage
+        struct.pack_into('<I', header, optional + 60, 0x400)  # SizeOfHeaders
+        self.write(base, bytes(header))
+
+    def module_snapshot(self):
+        """Копия списка модулей (CreateToolhelp32Snapshot)"""
+        self.module_snapshots += 1
+        return list(self.modules)
+
+    def _layout_statics(self):
+        """Статические ячейки модуля и объекты, которые не меняются при смене персонажа"""
+        base = self.module_base
+        for name in ("char_origin", "selection_origin", "world_origin"):
+            self._map(base + _static_offset(name), 8)
+
+        self.origin = self.alloc(0x100)
+        self._put_ptr(base + _static_offset("char_origin"), self.origin)
+
+        # selection_origin +0x58 -> holder, [holder] = selection, [selection] -> inner, [inner + 0x10] = target
+        selection_origin = self.alloc(0x100)
+        holder = self.alloc(0x10)
+        self.selection = self.alloc(0x10)
+        self.selection_inner = self.alloc(0x20)
+        self._put_ptr(base + _static_offset("selection_origin"), selection_origin)
+        self._put_ptr(selection_origin + 0x58, holder)
+        self._put_ptr(holder, self.selection)
+        self._put_ptr(self.selection, self.selection_inner)
+        self.target_object = self.alloc(0x200)
+
+        # Мир: world_origin -> world_base -> container (лут и люди)
+        self.world_origin = self.alloc(0x100)
+        self.world_base = self.alloc(0x100)
+        self.people_holder = self.alloc(0x100)
+        self.container = self.alloc(ENTITY_CONTAINER_SLOTS * 4 + 8)
+        self._put_ptr(base + _static_offset("world_origin"), self.world_origin)
+        self._put_ptr(self.world_origin, self.people_holder)
+        self._put_ptr(self.world_origin + 0x10, self.world_base)
+        self._put_ptr(self.world_base + 0x28, self.container)
+        self.entities = []  # [(id, x, y, z)]
+
+    def login(self, char_id: int, name: str, char_class: int = 0, position=(0.0, 0.0, 0.0)):
+        """Войти персонажем (новый char_base - как после смены персонажа в игре)"""
+        self.char_id = char_id
+        self.name = name
+        self.char_class = char_class
+        self.char_base = self.alloc(CHAR_BASE_SIZE)
+        self._put_ptr(self.origin + _last_offset("char_base"), self.char_base)
+
+        name_ptr = self.alloc(64 * 2)
+        self.write(name_ptr, name.encode('utf-16-le')[:62])
+        self._put_ptr(self.char_base + _last_offset("char_name"), name_ptr)
+
+        self._put(_INT32, self.char_base + _last_offset("char_id"), char_id)
+        self._put(_INT32, self.char_base + _last_offset("char_class"), char_class)
+        self._put(_INT32, self.char_base + _last_offset("char_hp"), 1000)
+        self._put(_INT32, self.char_base + _last_offset("char_max_hp"), 1000)
+        self._put(_FLOAT, self.char_base + _last_offset("fly_speed"), 10.0)
+        self.set_position(*position)
+        self.set_flying(0)
+        self.members = []
+
+    def enter_character_select(self):
+        """Выйти на выбор персонажа (char_id = 0)"""
+        self._put(_INT32, self.char_base + _last_offset("char_id"), 0)
+        self.char_id = 0
+
+    def kill(self):
+        """Закрыть процесс"""
+        self.alive = False
+
+    # ========================================
+    # СОСТОЯНИЕ ПЕРСОНАЖА
+    # ========================================
+
+    def get_position(self):
+        return (
+            self._get(_FLOAT, self.char_base + _last_offset("char_pos_x")),
+            self._get(_FLOAT, self.char_base + _last_offset("char_pos_y")),
+            self._get(_FLOAT, self.char_base + _last_offset("char_pos_z")),
+        )
+
+    def set_position(self, x, y, z):
+        self._put(_FLOAT, self.char_base + _last_offset("char_pos_x"), x)
+        self._put(_FLOAT, self.char_base + _last_offset("char_pos_y"), y)
+        self._put(_FLOAT, self.char_base + _last_offset("char_pos_z"), z)
+
+    def set_flying(self, status: int):
+        """fly_status (0 - на земле, 1/2 - в полете) и соответствующий fly_trigger"""
+        self._put(_INT32, self.char_base + _last_offset("fly_status"), status)
+        trigger = self.fly_triggers['on' if status else 'off']
+        self._put(_INT32, self.char_base + _last_offset("fly_trigger"), trigger)
+
+    def get_fly_speed_z(self):
+        return self._get(_FLOAT, self.char_base + _last_offset("fly_speed_z"))
+
+    def get_target_id(self):
+        return self._get(_UINT32, self.char_base + _last_offset("target_id"))
+
+    def set_target(self, target_id: int, position=None):
+        """Выбрать цель (0 - снять); position - координаты цели (x, y, z)"""
+        self._put(_UINT32, self.char_base + _last_offset("target_id"), target_id)
+        if target_id and position:
+            x, y, z = position
+            self._put(_FLOAT, self.target_object + _last_offset("target_pos_x"), x)
+            self._put(_FLOAT, self.target_object + _last_offset("target_pos_y"), y)
+            self._put(_FLOAT, self.target_object + _last_offset("target_pos_z"), z)
+            self._put_ptr(self.selection_inner + _last_offset("target_ptr"), self.target_object)
+        else:
+            self._put_ptr(self.selection_inner + _last_offset("target_ptr"), 0)
+
+    def set_party(self, leader_id: int, member_ids):
+        """Вступить в группу (leader_id=0 - выйти)"""
+        party_ptr_address = self.char_base + _last_offset("party_ptr")
+        if not leader_id:
+            self._put_ptr(party_ptr_address, 0)
+            self.members = []
+            return
+
+        self.members = list(member_ids)[:10]
+        party = self.alloc(0x40)
+        members_array = self.alloc(10 * 8)
+        self._put(_INT32, party + _last_offset("party_leader_id"), leader_id)
+        self._put(_INT32, party + _last_offset("party_count"), len(self.members))
+        self._put_ptr(party + _last_offset("party_members_array"), members_array)
+
+        for i, member_id in enumerate(self.members):
+            member = self.alloc(0x20)
+            self._put(_INT32, member + 0x18, member_id)
+            self._put_ptr(members_array + i * 8, member)
+
+        self._put_ptr(party_ptr_address, party)
+
+    def set_entities(self, entities):
+        """
+        Заполнить контейнер мира
+
+        Args:
+            entities: [(id, x, y, z)] - id <= 1 читается как лут, > 1 как игрок
+        """
+        self.entities = list(entities)[:ENTITY_CONTAINER_SLOTS // 2]
+        self.write(self.container, bytes(ENTITY_CONTAINER_SLOTS * 4 + 8))
+
+        # Указатели через слот (массив читается по 8 байт с шагом 4)
+        for i, (entity_id, x, y, z) in enumerate(self.entities):
+            inner = self.alloc(0x6B0)
+            self._put(_INT32, inner + 0x6A8, entity_id)
+            self._put(_FLOAT, inner + 0x50, x)
+            self._put(_FLOAT, inner + 0x48, y)
+            self._put(_FLOAT, inner + 0x4C, z)
+            entity = self.alloc(0x20)
+            self._put_ptr(entity + 0x10, inner)
+            self._put_ptr(self.container + i * 8, entity)
+
+        loot = sum(1 for e in self.entities if e[0] <= 1)
+        self._put(_INT32, self.world_base + _last_offset("loot_count"), loot)
+        self._put(_INT32, self.people_holder + 0x48, len(self.entities) - loot)
+
+
+class SimulatedBackend:
+    """
+    Набор симулированных клиентов (интерфейс Win32Backend)
+
+    - list_pids() / attach(pid) / foreground_pid() - для MultiboxManager и headless режима
+    - step(dt) - сдвинуть симуляцию: лидеры летают по кругу, меняют цели
+
+    module_registry - если задан, attach ищет модуль через него (как Memory.attach_by_pid);
+    module_base - база модуля новых клиентов (другая - как после перезагрузки с ASLR)
+    """
+
+    def __init__(self, seed: int = 0, module_registry=None):
+        self.clients = {}  # {pid: SimulatedClient}
+        self.module_registry = module_registry
+        self.module_base = SIM_MODULE_BASE
+        self.focused_pid = None
+        self.time = 0.0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def fleet(cls, count: int, party_size: int = 5, seed: int = 0) -> "SimulatedBackend":
+        """
+        Создать count клиентов, разбитых на группы по party_size (первый в группе - лидер)
+
+        Фокус - на лидере первой группы.
+        """
+        backend = cls(seed)
+        for i in range(count):
+            backend.add_client(
+                char_id=100000 + i,
+                name=f"Sim{i:02d}",
+                char_class=i % 10,
+                position=(100.0 + i, 200.0 + i, 50.0),
+            )
+
+        pids = sorted(backend.clients)
+        party_size = max(1, min(party_size, 10))
+        for start in range(0, len(pids), party_size):
+            group = [backend.clients[pid] for pid in pids[start:start + party_size]]
+            if len(group) > 1:
+                backend.form_party(group)
+
+        if pids:
+            backend.focused_pid = pids[0]
+        return backend
+
+    def add_client(self, char_id: int, name: str, char_class: int = 0, position=(0.0, 0.0, 0.0)) -> SimulatedClient:
+        with self._lock:
+            pid = SIM_PID_BASE + len(self.clients) * 4
+            client = SimulatedClient(pid, char_id, name, char_class, position, self.module_base)
+            self.clients[pid] = client
+        return client
+
+    def form_party(self, clients):
+        """Собрать группу (первый клиент - лидер)"""
+        member_ids = [c.char_id for c in clients]
+        for client in clients:
+            client.set_party(member_ids[0], member_ids)
+
+    # ========================================
+    # ИНТЕРФЕЙС BACKEND
+    # ========================================
+
+    def list_pids(self, process_name="ElementClient.exe"):
+        return [pid for pid, client in self.clients.items() if client.alive]
+
+    def attach(self, pid):
+        client = self.clients.get(pid)
+        if client is None or not client.alive:
+            return None
+        memory = SimulatedMemory(client)
+        if self.module_registry is not None:
+            memory.module_base = self.module_registry.locate(memory) or None
+            if memory.module_base is None:
+                return None
+        return memory
+
+    def foreground_pid(self):
+        return self.focused_pid
+
+    # ========================================
+    # ДИНАМИКА
+    # ========================================
+
+    def step(self, dt: float = 0.1, pids=None):
+        """
+        Сдвинуть симуляцию на dt секунд (pids - только эти клиенты)
+
+        Лидеры летят по кругу и раз в несколько секунд меняют цель / высоту,
+        участники без Follow дрейфуют случайно; fly_speed_z участников
+        (пишет Follow) меняет их высоту.
+        """
+        self.time += dt
+        rnd = self._random
+
+        for client in list(self.clients.values()):
+            if not client.alive or not client.char_id:
+                continue
+            if pids is not None and client.pid not in pids:
+                continue
+
+            x, y, z = client.get_position()
+            if x is None:
+                continue
+
+            is_leader = not client.members or client.members[0] == client.char_id
+            if is_leader:
+                angle = self.time * 0.2 + client.pid
+                x += math.cos(angle) * 5.0 * dt
+                y += math.sin(angle) * 5.0 * dt
+                z = 50.0 + 10.0 * math.sin(self.time * 0.05 + client.pid)
+                client.set_flying(2 if int(self.time / 20) % 2 == 0 else 0)
+
+                if rnd.random() < dt / 3.0:
+                    target_id = rnd.randint(2, 500)
+                    client.set_target(target_id, (x + rnd.uniform(-20, 20), y + rnd.uniform(-20, 20), z))
+            else:
+                speed_z = client.get_fly_speed_z() or 0.0
+                x += rnd.uniform(-1.0, 1.0) * dt
+                y += rnd.uniform(-1.0, 1.0) * dt
+                z += speed_z * dt
+
+            client.set_position(x, y, z)
@@ -0,0 +1,268 @@
+"""
+Пространственный индекс сущностей мира (лут, игроки)
+Равномерная сетка по X/Y, все расстояния - в квадрате (без sqrt)
+"""
+import heapq
+import math
+from collections import namedtuple
+
+# Компактная запись сущности (вместо dict)
+# ptr - указатель на объект в памяти клиента (идентичность между сканами)
+EntityRecord = namedtuple('EntityRecord', ['ptr', 'id', 'x', 'y', 'z'])
+
+# Размер ячейки сетки (метры)
+ENTITY_CELL_SIZE = 32.0
+
+
+class SpatialGrid:
+    """
+    Сетка сущностей с инкрементальным обновлением
+
+    sync() принимает результат очередного скана массива и переносит
+    между ячейками только те записи, которые появились, пропали или сместились.
+    """
+
+    def __init__(self, cell_size: float = ENTITY_CELL_SIZE):
+        self.cell_size = cell_size
+        self.records = {}   # {ptr: EntityRecord}
+        self._cells = {}    # {(cx, cy): {ptr, ...}}
+        self._cell_of = {}  # {ptr: (cx, cy)}
+
+        # Занятые ячейки по столбцам/строкам и их границы (для query_nearest)
+        self._col_cells = {}  # {cx: количество непустых ячеек}
+        self._row_cells = {}  # {cy: количество непустых ячеек}
+        self._bounds = None   # (cx_min, cx_max, cy_min, cy_max) или None
+
+    def _cell(self, x: float, y: float):
+        """Ячейка по координатам"""
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def _add_cell(self, key):
+        """Ячейка стала непустой - расширить границы"""
+        cx, cy = key
+        self._col_cells[cx] = self._col_cells.get(cx, 0) + 1
+        self._row_cells[cy] = self._row_cells.get(cy, 0) + 1
+        if self._bounds is None:
+            self._bounds = (cx, cx, cy, cy)
+        else:
+            cx_min, cx_max, cy_min, cy_max = self._bounds
+            self._bounds = (min(cx_min, cx), max(cx_max, cx), min(cy_min, cy), max(cy_max, cy))
+
+    def _drop_cell(self, key):
+        """Ячейка опустела - сузить границы, если ушел крайний столбец/строка"""
+        cx, cy = key
+        cols, rows = self._col_cells, self._row_cells
+        cols[cx] -= 1
+        rows[cy] -= 1
+        col_empty = not cols[cx]
+        row_empty = not rows[cy]
+        if col_empty:
+            del cols[cx]
+        if row_empty:
+            del rows[cy]
+
+        if not cols:
+            self._bounds = None
+            return
+
+        # Пересчет - только по занятым столбцам/строкам и только если ушел крайний
+        cx_min, cx_max, cy_min, cy_max = self._bounds
+        if col_empty and cx in (cx_min, cx_max):
+            cx_min, cx_max = min(cols), max(cols)
+        if row_empty and cy in (cy_min, cy_max):
+            cy_min, cy_max = min(rows), max(rows)
+        self._bounds = (cx_min, cx_max, cy_min, cy_max)
+
+    def _insert(self, record: EntityRecord):
+        key = self._cell(record.x, record.y)
+        bucket = self._cells.get(key)
+        if bucket is None:
+            bucket = self._cells[key] = set()
+            self._add_cell(key)
+        bucket.add(record.ptr)
+        self._cell_of[record.ptr] = key
+        self.records[record.ptr] = record
+
+    def _remove(self, ptr: int):
+        key = self._cell_of.pop(ptr, None)
+        if key is not None:
+            bucket = self._cells.get(key)
+            if bucket is not None:
+                bucket.discard(ptr)
+                if not bucket:
+                    del self._cells[key]
+                    self._drop_cell(key)
+        self.records.pop(ptr, None)
+
+    def sync(self, records):
+        """
+        Синхронизировать индекс с новым сканом
+
+        Args:
+            records: итерируемое EntityRecord (записи без координат игнорируются)
+
+        Returns:
+            (added, removed, moved): количество изменений
+        """
+        seen = set()
+        added = moved = 0
+
+        for record in records:
+            if record.x is None or record.y is None:
+                continue
+
+            ptr = record.ptr
+            seen.add(ptr)
+            old = self.records.get(ptr)
+
+            if old is None:
+                self._insert(record)
+                added += 1
+            elif old != record:
+                # Ячейку меняем только если реально перешли в другую
+                if self._cell(record.x, record.y) != self._cell_of.get(ptr):
+                    self._remove(ptr)
+                    self._insert(record)
+                else:
+                    self.records[ptr] = record
+                moved += 1
+
+        stale = [ptr for ptr in self.records if ptr not in seen]
+        for ptr in stale:
+            self._remove(ptr)
+
+        return added, len(stale), moved
+
+    def clear(self):
+        """Очистить индекс"""
+        self.records.clear()
+        self._cells.clear()
+        self._cell_of.clear()
+        self._col_cells.clear()
+        self._row_cells.clear()
+        self._bounds = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def _iter_cells(self, cx_min, cx_max, cy_min, cy_max):
+        """Перебрать записи в прямоугольнике ячеек"""
+        cells = self._cells
+        records = self.records
+        for cx in range(cx_min, cx_max + 1):
+            for cy in range(cy_min, cy_max + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    for ptr in bucket:
+                        yield records[ptr]
+
+    def query_box(self, x_min: float, y_min: float, x_max: float, y_max: float):
+        """
+        Сущности внутри прямоугольника (границы включительно)
+
+        Returns:
+            list[EntityRecord]
+        """
+        cx_min, cy_min = self._cell(x_min, y_min)
+        cx_max, cy_max = self._cell(x_max, y_max)
+
+        return [
+            r for r in self._iter_cells(cx_min, cx_max, cy_min, cy_max)
+            if x_min <= r.x <= x_max and y_min <= r.y <= y_max
+        ]
+
+    def query_radius(self, x: float, y: float, radius: float):
+        """
+        Сущности в радиусе (2D, сравнение квадратов расстояний)
+
+        Returns:
+            list[(dist_sq, EntityRecord)], отсортировано по расстоянию
+        """
+        radius_sq = radius * radius
+        cx_min, cy_min = self._cell(x - radius, y - radius)
+        cx_max, cy_max = self._cell(x + radius, y + radius)
+
+        result = []
+        for r in self._iter_cells(cx_min, cx_max, cy_min, cy_max):
+            dx = r.x - x
+            dy = r.y - y
+            dist_sq = dx * dx + dy * dy
+            if dist_sq <= radius_sq:
+                result.append((dist_sq, r))
+
+        result.sort(key=lambda item: item[0])
+        return result
+
+    def query_nearest(self, x: float, y: float, k: int = 1, max_radius: float = None):
+        """
+        k ближайших сущностей (2D)
+
+        Обходит кольца ячеек вокруг точки, пока k-й найденный кандидат
+        не окажется ближе, чем ближайшая непросмотренная ячейка.
+
+        Args:
+            x, y: точка поиска
+            k: сколько сущностей вернуть
+            max_radius: ограничение радиуса поиска (None - без ограничения)
+
+        Returns:
+            list[(dist_sq, EntityRecord)], отсортировано по расстоянию
+        """
+        if k <= 0 or not self.records:
+            return []
+
+        cx0, cy0 = self._cell(x, y)
+        size = self.cell_size
+        limit_sq = max_radius * max_radius if max_radius is not None else None
+
+        # Максимальное кольцо, дальше которого ячеек нет (по границам занятых ячеек)
+        if self._bounds is not None:
+            cx_min, cx_max, cy_min, cy_max = self._bounds
+            max_ring = max(abs(cx_min - cx0), abs(cx_max - cx0), abs(cy_min - cy0), abs(cy_max - cy0))
+        else:
+            max_ring = 0
+
+        heap = []  # max-heap по -dist_sq, размер <= k
+        ring = 0
+
+        while ring <= max_ring:
+            if ring == 0:
+                ring_cells = [(cx0, cy0)]
+            else:
+                ring_cells = []
+                for cx in range(cx0 - ring, cx0 + ring + 1):
+                    ring_cells.append((cx, cy0 - ring))
+                    ring_cells.append((cx, cy0 + ring))
+                for cy in range(cy0 - ring + 1, cy0 + ring):
+                    ring_cells.append((cx0 - ring, cy))
+                    ring_cells.append((cx0 + ring, cy))
+
+            for key in ring_cells:
+                bucket = self._cells.get(key)
+                if not bucket:
+                    continue
+                for ptr in bucket:
+                    r = self.records[ptr]
+                    dx = r.x - x
+                    dy = r.y - y
+                    dist_sq = dx * dx + dy * dy
+                    if limit_sq is not None and dist_sq > limit_sq:
+                        continue
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-dist_sq, ptr))
+                    elif dist_sq < -heap[0][0]:
+                        heapq.heapreplace(heap, (-dist_sq, ptr))
+
+            # Ближайшая точка следующего кольца не ближе ring * size
+            edge = ring * size
+            edge_sq = edge * edge
+            if len(heap) == k and -heap[0][0] <= edge_sq:
+                break
+            if limit_sq is not None and edge_sq > limit_sq:
+                break
+
+            ring += 1
+
+        result = [(-neg, self.records[ptr]) for neg, ptr in heap]
+        result.sort(key=lambda item: item[0])
+        return result
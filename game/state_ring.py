@@ -0,0 +1,325 @@
+"""
+Кольцевой буфер состояния в shared memory
+Состояние всех клиентов и таблица сущностей мира за тик - в фиксированной
+схеме, чтобы читатели (GUI, радар, внешние утилиты, запись) брали последний
+кадр без pickle и блокировок, каждый в своем темпе.
+
+Раскладка блока:
+    [заголовок буфера][слот 0][слот 1]...[слот N-1]
+    слот = [заголовок кадра][клиенты x max_clients][сущности x max_entities]
+
+Писатель пишет кадр seq в слот seq % N: обнуляет seq слота, пишет данные,
+ставит seq слота и последним - latest_seq буфера. Читатель берет latest_seq,
+читает слот и сверяет seq слота после чтения (Frame.is_current()) - кадр
+перезаписывается только через N-1 публикаций.
+
+Если установлен numpy - Frame.clients / Frame.entities отдают структурные
+массивы поверх shared memory (без копии), иначе - списки namedtuple.
+"""
+import os
+import struct
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from game.offsets import OFFSETS, resolve_offset
+
+RING_MAGIC = b'XVSR'
+RING_VERSION = 1
+RING_SLOTS = 8
+RING_MAX_CLIENTS = 64
+RING_MAX_ENTITIES = 4096
+
+# Схема записи клиента: (поле, формат struct)
+CLIENT_SCHEMA = (
+    ('pid', 'i'),
+    ('char_id', 'i'),
+    ('char_class', 'i'),
+    ('hp', 'i'),
+    ('max_hp', 'i'),
+    ('x', 'f'),
+    ('y', 'f'),
+    ('z', 'f'),
+    ('target_id', 'I'),
+    ('fly_status', 'i'),
+    ('fly_speed', 'f'),
+    ('fly_speed_z', 'f'),
+    ('party_leader_id', 'i'),
+    ('party_count', 'i'),
+    ('flags', 'I'),
+)
+
+# Схема записи сущности мира
+ENTITY_SCHEMA = (
+    ('kind', 'i'),
+    ('id', 'i'),
+    ('x', 'f'),
+    ('y', 'f'),
+    ('z', 'f'),
+)
+
+ENTITY_PEOPLE = 1
+ENTITY_LOOT = 2
+
+CLIENT_FLAG_ACTIVE = 0x1   # последнее активное окно
+CLIENT_FLAG_LEADER = 0x2   # лидер своей группы
+
+ClientState = namedtuple('ClientState', [name for name, _ in CLIENT_SCHEMA])
+EntityState = namedtuple('EntityState', [name for name, _ in ENTITY_SCHEMA])
+
+CLIENT_RECORD = struct.Struct('<' + ''.join(fmt for _, fmt in CLIENT_SCHEMA))
+ENTITY_RECORD = struct.Struct('<' + ''.join(fmt for _, fmt in ENTITY_SCHEMA))
+
+# magic, version, slots, max_clients, max_entities, slot_size, latest_seq
+RING_HEADER = struct.Struct('<4sIIIIIQ')
+# seq, time, client_count, entity_count
+FRAME_HEADER = struct.Struct('<QdII')
+
+_NUMPY_TYPES = {'i': '<i4', 'I': '<u4', 'f': '<f4'}
+
+
+def _dtype(schema):
+    return numpy.dtype([(name, _NUMPY_TYPES[fmt]) for name, fmt in schema])
+
+
+def _slot_size(max_clients, max_entities):
+    size = FRAME_HEADER.size + max_clients * CLIENT_RECORD.size + max_entities * ENTITY_RECORD.size
+    return (size + 63) & ~63  # слоты по границе кэш-линии
+
+
+def _nz(value, default=0):
+    return default if value is None else value
+
+
+# Блоки, созданные StateRingWriter в этом процессе (их учитывает resource_tracker писателя)
+_owned_blocks = set()
+
+
+def _attach(name):
+    """
+    Подключиться к чужому блоку, не передавая его resource_tracker
+    (иначе на POSIX блок удаляется при выходе читателя)
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        # Свой блок (писатель в этом же процессе) трекер должен помнить до unlink()
+        if os.name == 'posix' and shm._name not in _owned_blocks:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+def capture_manager(multibox_manager, app_state=None):
+    """
+    Собрать строки кадра из MultiboxManager (значения последнего refresh)
+
+    Returns:
+        (clients, entities): списки кортежей по CLIENT_SCHEMA / ENTITY_SCHEMA
+    """
+    active = app_state.last_active_character if app_state else None
+
+    clients = []
+    for char in list(multibox_manager.characters.values()):
+        cb = char.char_base
+        if not cb.char_id:
+            continue
+
+        leader_id = party_count = 0
+        party_ptr = resolve_offset(char.memory, OFFSETS["party_ptr"], cb.cache)
+        if party_ptr:
+            cb.cache["party_ptr"] = party_ptr
+            leader_id = _nz(resolve_offset(char.memory, OFFSETS["party_leader_id"], cb.cache))
+            party_count = _nz(resolve_offset(char.memory, OFFSETS["party_count"], cb.cache))
+
+        flags = 0
+        if char is active:
+            flags |= CLIENT_FLAG_ACTIVE
+        if leader_id and leader_id == cb.char_id:
+            flags |= CLIENT_FLAG_LEADER
+
+        clients.append((
+            char.pid, cb.char_id, _nz(cb.char_class), _nz(cb.char_hp), _nz(cb.char_max_hp),
+            _nz(cb.char_pos_x, float('nan')), _nz(cb.char_pos_y, float('nan')), _nz(cb.char_pos_z, float('nan')),
+            _nz(cb.target_id), _nz(cb.fly_status, -1), _nz(cb.fly_speed, 0.0), _nz(cb.fly_speed_z, 0.0),
+            leader_id, party_count, flags,
+        ))
+
+    view = multibox_manager.world_view
+    entities = [(ENTITY_PEOPLE, r.id, r.x, r.y, r.z) for r in list(view.people_index.records.values())]
+    entities.extend((ENTITY_LOOT, 0, r.x, r.y, _nz(r.z, 0.0)) for r in list(view.loot_index.records.values()))
+    return clients, entities
+
+
+class StateRingWriter:
+    """
+    Владелец буфера (один писатель)
+
+    Пример:
+        ring = StateRingWriter("xvocmuk-state")
+        ring.publish(*capture_manager(manager, app_state))
+    """
+
+    def __init__(self, name: str = None, slots: int = RING_SLOTS,
+                 max_clients: int = RING_MAX_CLIENTS, max_entities: int = RING_MAX_ENTITIES):
+        self.slots = max(2, slots)
+        self.max_clients = max_clients
+        self.max_entities = max_entities
+        self.slot_size = _slot_size(max_clients, max_entities)
+
+        size = RING_HEADER.size + self.slots * self.slot_size
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = self.shm.name
+        _owned_blocks.add(self.shm._name)
+        self.seq = 0
+        self.dropped_entities = 0
+
+        RING_HEADER.pack_into(self.shm.buf, 0, RING_MAGIC, RING_VERSION, self.slots,
+                              max_clients, max_entities, self.slot_size, 0)
+
+    def publish(self, clients, entities=(), timestamp: float = None) -> int:
+        """
+        Записать кадр (лишние записи сверх max_clients / max_entities отбрасываются)
+
+        Returns:
+            int: номер кадра
+        """
+        clients = clients[:self.max_clients]
+        if len(entities) > self.max_entities:
+            self.dropped_entities += len(entities) - self.max_entities
+            entities = entities[:self.max_entities]
+
+        seq = self.seq + 1
+        buf = self.shm.buf
+        slot = RING_HEADER.size + (seq % self.slots) * self.slot_size
+
+        # seq = 0 - слот пишется, читатели его не возьмут
+        FRAME_HEADER.pack_into(buf, slot, 0, 0.0, 0, 0)
+
+        offset = slot + FRAME_HEADER.size
+        pack_client = CLIENT_RECORD.pack_into
+        for row in clients:
+            pack_client(buf, offset, *row)
+            offset += CLIENT_RECORD.size
+
+        offset = slot + FRAME_HEADER.size + self.max_clients * CLIENT_RECORD.size
+        pack_entity = ENTITY_RECORD.pack_into
+        for row in entities:
+            pack_entity(buf, offset, *row)
+            offset += ENTITY_RECORD.size
+
+        FRAME_HEADER.pack_into(buf, slot, seq, timestamp or time.time(), len(clients), len(entities))
+        struct.pack_into('<Q', buf, RING_HEADER.size - 8, seq)
+        self.seq = seq
+        return seq
+
+    def publish_manager(self, multibox_manager, app_state=None) -> int:
+        """Кадр из текущего состояния MultiboxManager"""
+        return self.publish(*capture_manager(multibox_manager, app_state))
+
+    def close(self):
+        """Закрыть и удалить блок"""
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+        _owned_blocks.discard(self.shm._name)
+
+
+class Frame:
+    """
+    Кадр буфера (представления поверх shared memory)
+
+    Данные валидны, пока is_current() == True - проверять после обработки.
+    """
+
+    def __init__(self, reader, seq, timestamp, client_count, entity_count, offset):
+        self._reader = reader
+        self._offset = offset
+        self.seq = seq
+        self.time = timestamp
+        self.client_count = client_count
+        self.entity_count = entity_count
+
+    @property
+    def raw_clients(self) -> memoryview:
+        start = self._offset + FRAME_HEADER.size
+        return self._reader.shm.buf[start:start + self.client_count * CLIENT_RECORD.size]
+
+    @property
+    def raw_entities(self) -> memoryview:
+        start = self._offset + FRAME_HEADER.size + self._reader.max_clients * CLIENT_RECORD.size
+        return self._reader.shm.buf[start:start + self.entity_count * ENTITY_RECORD.size]
+
+    @property
+    def clients(self):
+        """numpy-массив (без копии) или [ClientState, ...]"""
+        if numpy is not None:
+            return numpy.frombuffer(self.raw_clients, dtype=self._reader.client_dtype)
+        return [ClientState._make(row) for row in CLIENT_RECORD.iter_unpack(self.raw_clients)]
+
+    @property
+    def entities(self):
+        """numpy-массив (без копии) или [EntityState, ...]"""
+        if numpy is not None:
+            return numpy.frombuffer(self.raw_entities, dtype=self._reader.entity_dtype)
+        return [EntityState._make(row) for row in ENTITY_RECORD.iter_unpack(self.raw_entities)]
+
+    def is_current(self) -> bool:
+        """Слот еще не перезаписан"""
+        return FRAME_HEADER.unpack_from(self._reader.shm.buf, self._offset)[0] == self.seq
+
+
+class StateRingReader:
+    """
+    Читатель буфера (любое количество, в любых процессах)
+
+    Пример:
+        reader = StateRingReader("xvocmuk-state")
+        frame = reader.latest()
+        if frame and frame.seq != last_seq:
+            positions = frame.clients[['x', 'y', 'z']]
+    """
+
+    def __init__(self, name: str):
+        self.shm = _attach(name)
+        magic, version, self.slots, self.max_clients, self.max_entities, self.slot_size, _ = \
+            RING_HEADER.unpack_from(self.shm.buf, 0)
+        if magic != RING_MAGIC or version != RING_VERSION:
+            self.shm.close()
+            raise ValueError(f"{name}: not a state ring (magic={magic!r}, version={version})")
+
+        self.client_dtype = _dtype(CLIENT_SCHEMA) if numpy is not None else None
+        self.entity_dtype = _dtype(ENTITY_SCHEMA) if numpy is not None else None
+
+    @property
+    def latest_seq(self) -> int:
+        return struct.unpack_from('<Q', self.shm.buf, RING_HEADER.size - 8)[0]
+
+    def frame(self, seq: int):
+        """Кадр seq, если он еще в буфере"""
+        if seq <= 0:
+            return None
+        offset = RING_HEADER.size + (seq % self.slots) * self.slot_size
+        slot_seq, timestamp, client_count, entity_count = FRAME_HEADER.unpack_from(self.shm.buf, offset)
+        if slot_seq != seq:
+            return None
+        return Frame(self, seq, timestamp, client_count, entity_count, offset)
+
+    def latest(self):
+        """Последний опубликованный кадр (None - еще не было)"""
+        for _ in range(3):
+            frame = self.frame(self.latest_seq)
+            if frame is not None:
+                return frame
+        return None
+
+    def close(self):
+        self.shm.close()
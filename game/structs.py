@@ -2,8 +2,52 @@
 Игровые структуры для чтения/записи данных из памяти - ОБНОВЛЕНО
 Добавлено: fly_trigger
 """
-from game.offsets import OFFSETS, resolve_offset
+from config.constants import CHAR_SLOW_REFRESH_INTERVAL
+from core.metrics import metrics
+from game.offsets import OFFSETS, TIER_HOT, TIER_SLOW, TIER_STATIC_CHAR, field_offset, offset_tier, resolve_offset
+from game.spatial import EntityRecord, SpatialGrid
 import logging
+import struct
+import time
+
+
+
+def _pos_block_offset(prefix: str) -> int:
+    """Начало блока координат (y, z, x подряд по 4 байта) - из OFFSETS[prefix_pos_*]"""
+    y, z, x = (field_offset(f"{prefix}_pos_{axis}") for axis in "yzx")
+    if (z, x) != (y + 4, y + 8):
+        raise ValueError(f"{prefix}_pos_y/z/x are not contiguous in OFFSETS: {y:#x} {z:#x} {x:#x}")
+    return y
+
+
+# Координаты персонажа лежат подряд: y, z, x (char_pos_* в OFFSETS)
+CHAR_POS_BLOCK_OFFSET = _pos_block_offset("char")
+CHAR_POS_BLOCK = struct.Struct('<fff')
+
+# Координаты таргета лежат подряд: y, z, x (target_pos_* в OFFSETS)
+TARGET_POS_BLOCK_OFFSET = _pos_block_offset("target")
+TARGET_POS_BLOCK = struct.Struct('<fff')
+
+# target_id внутри char_base
+TARGET_ID_OFFSET = field_offset("target_id")
+
+# Где лежит target_ptr (последнее звено цепочки выделения)
+_TARGET_PTR_HOLDER = "addr:" + OFFSETS["target_ptr"].split(":", 1)[1]
+
+# Поля CharBase: (атрибут, имя в OFFSETS); координаты читаются блоком CHAR_POS_BLOCK
+_CHAR_FIELDS = (
+    ('char_class', 'char_class'),
+    ('char_name', 'char_name'),
+    ('char_hp', 'char_hp'),
+    ('char_max_hp', 'char_max_hp'),
+    ('target_id', 'target_id'),
+    ('fly_speed', 'fly_speed'),
+    ('fly_speed_z', 'fly_speed_z'),
+    ('fly_status', 'fly_status'),
+)
+_STATIC_CHAR_FIELDS = [f for f in _CHAR_FIELDS if offset_tier(f[1]) == TIER_STATIC_CHAR]
+_SLOW_FIELDS = [f for f in _CHAR_FIELDS if offset_tier(f[1]) == TIER_SLOW]
+_HOT_FIELDS = [f for f in _CHAR_FIELDS if offset_tier(f[1]) == TIER_HOT]
 
 
 class CharBase:
@@ -13,10 +57,31 @@ class CharBase:
         self.memory = memory
         self.cache = {}
         self._previous_char_id = None  # для отслеживания смены персонажа
+        
+        # Кеш цепочки selection -> target: (target_id, target_ptr)
+        self._target_chain = None
+        
+        # Поколение: растет при смене персонажа или адреса char_base
+        # (по нему инвалидируются планы телепорта и статические поля)
+        self.generation = 0
+        self._static_generation = None
+        self._slow_generation = None
+        self._slow_read_at = 0.0
+        
+        self.char_id = None
+        self.char_pos_x = self.char_pos_y = self.char_pos_z = None
+        for attr, _ in _STATIC_CHAR_FIELDS + _SLOW_FIELDS + _HOT_FIELDS:
+            setattr(self, attr, None)
+        
         self._update()
     
-    def _update(self):
-        """Обновить данные из памяти"""
+    def _update(self, full: bool = False):
+        """
+        Обновить данные из памяти
+        
+        char_origin, char_base и char_id читаются всегда (ключ поколения),
+        остальные поля - по частоте из OFFSET_TIERS (full=True - все сразу).
+        """
         # Получаем базовые адреса
         char_origin = resolve_offset(self.memory, OFFSETS["char_origin"], self.cache)
         if char_origin:
@@ -29,6 +94,8 @@ class CharBase:
         
         char_base = resolve_offset(self.memory, OFFSETS["char_base"], self.cache)
         if char_base:
+            if char_base != self.cache.get("char_base"):
+                self.generation += 1
             self.cache["char_base"] = char_base
         else:
             # НОВОЕ: Если char_base стал None - данные невалидны
@@ -48,28 +115,39 @@ class CharBase:
         
         # Обновляем предыдущий ID
         self._previous_char_id = new_char_id
-        
-        # Читаем все данные
         self.char_id = new_char_id
         
-        self.char_class = resolve_offset(self.memory, OFFSETS["char_class"], self.cache)
-        
-        self.char_name = resolve_offset(self.memory, OFFSETS["char_name"], self.cache)
-        self.target_id = resolve_offset(self.memory, OFFSETS["target_id"], self.cache)
-        
-        # HP/MP
-        self.char_hp = resolve_offset(self.memory, OFFSETS["char_hp"], self.cache)
-        self.char_max_hp = resolve_offset(self.memory, OFFSETS["char_max_hp"], self.cache)
-        
-        # Координаты
-        self.char_pos_x = resolve_offset(self.memory, OFFSETS["char_pos_x"], self.cache)
-        self.char_pos_y = resolve_offset(self.memory, OFFSETS["char_pos_y"], self.cache)
-        self.char_pos_z = resolve_offset(self.memory, OFFSETS["char_pos_z"], self.cache)
-        
-        # Полет
-        self.fly_speed = resolve_offset(self.memory, OFFSETS["fly_speed"], self.cache)
-        self.fly_speed_z = resolve_offset(self.memory, OFFSETS["fly_speed_z"], self.cache)
-        self.fly_status = resolve_offset(self.memory, OFFSETS["fly_status"], self.cache)
+        # Статические поля персонажа - только при смене поколения
+        if self._static_generation != self.generation or full:
+            self._read_fields(_STATIC_CHAR_FIELDS)
+            # Имя может еще не прогрузиться сразу после входа - повторим
+            if self.char_name:
+                self._static_generation = self.generation
+            if metrics.enabled:
+                metrics.incr('charbase.static_read')
+        
+        # Медленные поля - не чаще CHAR_SLOW_REFRESH_INTERVAL
+        now = time.monotonic()
+        if full or self._slow_generation != self.generation or now - self._slow_read_at >= CHAR_SLOW_REFRESH_INTERVAL:
+            self._read_fields(_SLOW_FIELDS)
+            self._slow_generation = self.generation
+            self._slow_read_at = now
+            if metrics.enabled:
+                metrics.incr('charbase.slow_read')
+        
+        # Горячие поля: координаты одним блоком + таргет и полет
+        data = self.memory.read_bytes(char_base + CHAR_POS_BLOCK_OFFSET, CHAR_POS_BLOCK.size)
+        if data is not None:
+            self.char_pos_y, self.char_pos_z, self.char_pos_x = CHAR_POS_BLOCK.unpack(data)
+        else:
+            self.char_pos_x = self.char_pos_y = self.char_pos_z = None
+        self._read_fields(_HOT_FIELDS)
+    
+    def _read_fields(self, fields):
+        """Прочитать поля [(атрибут, имя в OFFSETS)]"""
+        memory, cache = self.memory, self.cache
+        for attr, name in fields:
+            setattr(self, attr, resolve_offset(memory, OFFSETS[name], cache))
     
     def _invalidate_cache(self):
         """Очистить кеш указателей (кроме базовых адресов)"""
@@ -79,6 +157,8 @@ class CharBase:
         
         # Очищаем весь кеш
         self.cache.clear()
+        self._target_chain = None
+        self.generation += 1
         
         # Восстанавливаем базовые адреса
         if char_origin:
@@ -107,53 +187,92 @@ class CharBase:
         
         char_base = self.cache["char_base"]
         
-        # Записываем координаты
-        self.memory.write_float(char_base + 0xA00, x)  # X
-        self.memory.write_float(char_base + 0x9F8, y)  # Y
-        self.memory.write_float(char_base + 0x9FC, z)  # Z
-        
-        return True
+        # Записываем координаты одним блоком (y, z, x)
+        return self.memory.write_block(char_base + CHAR_POS_BLOCK_OFFSET, CHAR_POS_BLOCK.pack(y, z, x))
     
     def get_target_position(self):
-        """Получить координаты таргета"""
-        # Обновляем target_id
-        self.target_id = resolve_offset(self.memory, OFFSETS["target_id"], self.cache)
+        """
+        Получить координаты таргета
+        
+        Цепочка selection_origin -> selection_ptr -> target_ptr кешируется вместе
+        с адресом, где лежит target_ptr. Повторный вызов с тем же target_id =
+        3 чтения: target_id, проверка что выделение все еще указывает на
+        target_ptr (8 байт), 12 байт координат. Цепочка перечитывается при
+        смене target_id, при несовпадении проверки или неудачном чтении.
+        """
+        char_base = self.cache.get("char_base")
+        if char_base:
+            self.target_id = self.memory.read_uint(char_base + TARGET_ID_OFFSET)
+        else:
+            self.target_id = resolve_offset(self.memory, OFFSETS["target_id"], self.cache)
         
         if not self.target_id or self.target_id == 0:
+            self._target_chain = None
             return None
         
-        # Получаем selection_origin
+        # Быстрый путь: тот же таргет и выделение все еще указывает на тот же объект
+        if self._target_chain and self._target_chain[0] == self.target_id:
+            _, target_ptr, holder = self._target_chain
+            if self.memory.read_uint64(holder) == target_ptr:
+                position = self._read_target_block(target_ptr)
+                if position:
+                    return position
+        
+        # Медленный путь: разрешаем цепочку заново
+        target_ptr = self._resolve_target_ptr()
+        if not target_ptr:
+            self._target_chain = None
+            return None
+        
+        position = self._read_target_block(target_ptr)
+        holder = resolve_offset(self.memory, _TARGET_PTR_HOLDER, self.cache)
+        if not position or not holder:
+            self._target_chain = None
+            return position
+        
+        self._target_chain = (self.target_id, target_ptr, holder)
+        return position
+    
+    def _resolve_target_ptr(self):
+        """Разрешить selection_origin -> selection_ptr -> target_ptr"""
+        # Сбрасываем старые звенья, чтобы resolve_offset не взял их из кеша
+        for key in ("selection_origin", "selection_ptr", "target_ptr"):
+            self.cache.pop(key, None)
+        
         selection_origin = resolve_offset(self.memory, OFFSETS["selection_origin"], self.cache)
         if selection_origin:
             self.cache["selection_origin"] = selection_origin
         
-        # Получаем selection_ptr
         selection_ptr = resolve_offset(self.memory, OFFSETS["selection_ptr"], self.cache)
         if not selection_ptr:
             return None
         
         self.cache["selection_ptr"] = selection_ptr
         
-        # Получаем target_ptr
         target_ptr = resolve_offset(self.memory, OFFSETS["target_ptr"], self.cache)
         if not target_ptr:
             return None
         
         self.cache["target_ptr"] = target_ptr
-        
-        # Читаем координаты
-        x = resolve_offset(self.memory, OFFSETS["target_pos_x"], self.cache)
-        y = resolve_offset(self.memory, OFFSETS["target_pos_y"], self.cache)
-        z = resolve_offset(self.memory, OFFSETS["target_pos_z"], self.cache)
-        
-        if x is None or y is None or z is None:
+        return target_ptr
+    
+    def _read_target_block(self, target_ptr):
+        """Прочитать (x, y, z) таргета одним 12-байтовым чтением"""
+        data = self.memory.read_bytes(target_ptr + TARGET_POS_BLOCK_OFFSET, TARGET_POS_BLOCK.size)
+        if data is None:
             return None
         
+        y, z, x = TARGET_POS_BLOCK.unpack(data)
         return (x, y, z)
     
-    def refresh(self):
-        """Обновить все данные"""
-        self._update()
+    def refresh(self, full: bool = False):
+        """
+        Обновить данные (горячие поля всегда, медленные и статические - по OFFSET_TIERS)
+        
+        Args:
+            full: перечитать все поля независимо от частоты
+        """
+        self._update(full)
     
     def set_target_id(self, target_id):
         """Записать target_id (для Attack)"""
@@ -164,7 +283,7 @@ class CharBase:
             return False
         
         char_base = self.cache["char_base"]
-        return self.memory.write_uint(char_base + 0x7B4, target_id)
+        return self.memory.write_uint(char_base + TARGET_ID_OFFSET, target_id)
     
     def set_fly_speed_z(self, value):
         """Записать fly_speed_z (для Follow)"""
@@ -184,6 +303,11 @@ class WorldManager:
     def __init__(self, memory):
         self.memory = memory
         self.cache = {}
+        
+        # Пространственные индексы (обновляются в scan_*)
+        self.loot_index = SpatialGrid()
+        self.people_index = SpatialGrid()
+        
         self._update_base()
     
     def _update_base(self):
@@ -206,38 +330,69 @@ class WorldManager:
         loot_count = resolve_offset(self.memory, OFFSETS["loot_count"], self.cache)
         return loot_count is not None and loot_count > 0
     
-    def get_loot_nearby(self, char_position, max_distance):
+    def scan_loot(self):
+        """
+        Прочитать массив лута и обновить индекс
+        
+        Returns:
+            (added, removed, moved): изменения относительно прошлого скана
+        """
+        items = resolve_offset(self.memory, OFFSETS["loot_items"], self.cache, with_ptr=True) or []
+        
+        return self.loot_index.sync(
+            EntityRecord(item['ptr'], None, item.get('x'), item.get('y'), None)
+            for item in items
+        )
+    
+    def scan_people(self):
+        """
+        Прочитать массив людей и обновить индекс (id <= 1 - не игроки)
+        
+        Returns:
+            (added, removed, moved): изменения относительно прошлого скана
+        """
+        items = resolve_offset(self.memory, OFFSETS["people_items"], self.cache, with_ptr=True) or []
+        
+        return self.people_index.sync(
+            EntityRecord(item['ptr'], item.get('id'), item.get('x'), item.get('y'), item.get('z'))
+            for item in items
+            if item.get('id') is not None and item['id'] > 1
+        )
+    
+    def scan(self):
+        """Обновить все индексы"""
+        self.scan_loot()
+        self.scan_people()
+    
+    def get_loot_nearby(self, char_position, max_distance, rescan=True):
         """
         Получить лут в радиусе от персонажа
         
         Args:
             char_position: (x, y, z) координаты персонажа
             max_distance: максимальное расстояние в метрах
+            rescan: перечитать массив лута перед поиском
         
         Returns:
-            list: список предметов лута [{x, y}, ...]
+            list: [EntityRecord, ...] от ближнего к дальнему
         """
-        import math
-        
-        loot_items = resolve_offset(self.memory, OFFSETS["loot_items"], self.cache)
+        if rescan:
+            self.scan_loot()
         
-        if not loot_items:
-            return []
+        char_x, char_y, _ = char_position
         
-        char_x, char_y, char_z = char_position
-        nearby = []
+        # Расстояние в 2D (игнорируем Z)
+        return [record for _, record in self.loot_index.query_radius(char_x, char_y, max_distance)]
+    
+    def get_people_nearby(self, char_position, max_distance, rescan=True):
+        """
+        Получить игроков в радиусе от персонажа (2D)
         
-        for item in loot_items:
-            item_x = item.get('x')
-            item_y = item.get('y')
-            
-            if item_x is None or item_y is None:
-                continue
-            
-            # Расстояние в 2D (игнорируем Z)
-            distance = math.sqrt((item_x - char_x)**2 + (item_y - char_y)**2)
-            
-            if distance <= max_distance:
-                nearby.append(item)
+        Returns:
+            list: [EntityRecord, ...] от ближнего к дальнему
+        """
+        if rescan:
+            self.scan_people()
         
-        return nearby
\ No newline at end of file
+        char_x, char_y, _ = char_position
+        return [record for _, record in self.people_index.query_radius(char_x, char_y, max_distance)]
@@ -0,0 +1,279 @@
+"""
+Трекер сущностей мира между сканами
+Стабильные хендлы, скорость, время жизни и события появления/исчезновения
+"""
+import logging
+import time
+from array import array
+from collections import namedtuple
+
+# Снимок состояния одной отслеживаемой сущности
+TrackedEntity = namedtuple(
+    'TrackedEntity',
+    ['handle', 'ptr', 'id', 'x', 'y', 'z', 'vx', 'vy', 'vz', 'first_seen', 'last_seen']
+)
+
+# Результат одного обновления трекера
+TrackerDelta = namedtuple('TrackerDelta', ['spawned', 'despawned', 'moved'])
+
+# Сглаживание скорости (0..1, больше - быстрее реагирует)
+VELOCITY_SMOOTHING = 0.5
+
+
+class EntityTracker:
+    """
+    Отслеживание сущностей по ключу (ptr, id)
+
+    Состояние лежит в колонках array (слот = индекс), свободные слоты
+    переиспользуются. Хендл - возрастающий номер, не переиспользуется,
+    поэтому ссылка на исчезнувшую сущность не укажет на новую.
+    """
+
+    def __init__(self, despawn_after: float = 0.0):
+        """
+        Args:
+            despawn_after: сколько секунд сущность может отсутствовать в скане
+                           до события despawn (0 - сразу)
+        """
+        self.despawn_after = despawn_after
+        self._next_handle = 1
+
+        self._on_spawn = []
+        self._on_despawn = []
+
+        self._reset()
+
+    def _reset(self):
+        """Пустые колонки и индексы (подписки и счетчик хендлов не трогаем)"""
+        self._x = array('d')
+        self._y = array('d')
+        self._z = array('d')
+        self._vx = array('d')
+        self._vy = array('d')
+        self._vz = array('d')
+        self._first_seen = array('d')
+        self._last_seen = array('d')
+        self._ptr = array('Q')
+        self._id = array('q')
+        self._handle = array('q')
+
+        self._free_slots = []
+        self._slot_by_key = {}     # {(ptr, id): slot}
+        self._slot_by_handle = {}  # {handle: slot}
+
+    # ========================================
+    # ПОДПИСКИ
+    # ========================================
+
+    def on_spawn(self, callback):
+        """Подписаться на появление: callback(TrackedEntity)"""
+        self._on_spawn.append(callback)
+
+    def on_despawn(self, callback):
+        """Подписаться на исчезновение: callback(TrackedEntity)"""
+        self._on_despawn.append(callback)
+
+    def has_subscribers(self) -> bool:
+        """Есть подписчики на появление/исчезновение"""
+        return bool(self._on_spawn or self._on_despawn)
+
+    def _emit(self, callbacks, entity):
+        for callback in callbacks:
+            try:
+                callback(entity)
+            except Exception as e:
+                logging.error(f"Error in tracker callback: {e}")
+
+    # ========================================
+    # ОБНОВЛЕНИЕ
+    # ========================================
+
+    def _alloc_slot(self):
+        if self._free_slots:
+            return self._free_slots.pop()
+
+        for column in (self._x, self._y, self._z, self._vx, self._vy, self._vz,
+                       self._first_seen, self._last_seen):
+            column.append(0.0)
+        self._ptr.append(0)
+        self._id.append(0)
+        self._handle.append(0)
+        return len(self._handle) - 1
+
+    def update(self, records, now: float = None) -> TrackerDelta:
+        """
+        Применить очередной скан
+
+        Args:
+            records: итерируемое EntityRecord (ptr, id, x, y, z)
+            now: время скана (по умолчанию time.monotonic())
+
+        Returns:
+            TrackerDelta: хендлы появившихся, исчезнувших и сместившихся сущностей
+        """
+        if now is None:
+            now = time.monotonic()
+
+        spawned = []
+        moved = []
+        seen = set()
+        k = VELOCITY_SMOOTHING
+
+        for record in records:
+            if record.x is None or record.y is None:
+                continue
+
+            key = (record.ptr, record.id or 0)
+            z = record.z or 0.0
+            slot = self._slot_by_key.get(key)
+
+            if slot is None:
+                slot = self._alloc_slot()
+                handle = self._next_handle
+                self._next_handle += 1
+
+                self._slot_by_key[key] = slot
+                self._slot_by_handle[handle] = slot
+
+                self._handle[slot] = handle
+                self._ptr[slot] = record.ptr if isinstance(record.ptr, int) else 0
+                self._id[slot] = record.id or 0
+                self._x[slot] = record.x
+                self._y[slot] = record.y
+                self._z[slot] = z
+                self._vx[slot] = self._vy[slot] = self._vz[slot] = 0.0
+                self._first_seen[slot] = now
+                self._last_seen[slot] = now
+
+                spawned.append(handle)
+            else:
+                dt = now - self._last_seen[slot]
+                dx = record.x - self._x[slot]
+                dy = record.y - self._y[slot]
+                dz = z - self._z[slot]
+
+                if dt > 0:
+                    self._vx[slot] += k * (dx / dt - self._vx[slot])
+                    self._vy[slot] += k * (dy / dt - self._vy[slot])
+                    self._vz[slot] += k * (dz / dt - self._vz[slot])
+
+                if dx or dy or dz:
+                    moved.append(self._handle[slot])
+
+                self._x[slot] = record.x
+                self._y[slot] = record.y
+                self._z[slot] = z
+                self._last_seen[slot] = now
+
+            seen.add(slot)
+
+        despawned = []
+        for key, slot in list(self._slot_by_key.items()):
+            if slot in seen:
+                continue
+            if now - self._last_seen[slot] < self.despawn_after:
+                continue
+
+            entity = self._snapshot(slot)
+            del self._slot_by_key[key]
+            del self._slot_by_handle[entity.handle]
+            self._handle[slot] = 0
+            self._free_slots.append(slot)
+
+            despawned.append(entity.handle)
+            self._emit(self._on_despawn, entity)
+
+        for handle in spawned:
+            self._emit(self._on_spawn, self._snapshot(self._slot_by_handle[handle]))
+
+        return TrackerDelta(spawned, despawned, moved)
+
+    # ========================================
+    # ЧТЕНИЕ
+    # ========================================
+
+    def _snapshot(self, slot) -> TrackedEntity:
+        return TrackedEntity(
+            self._handle[slot], self._ptr[slot], self._id[slot],
+            self._x[slot], self._y[slot], self._z[slot],
+            self._vx[slot], self._vy[slot], self._vz[slot],
+            self._first_seen[slot], self._last_seen[slot]
+        )
+
+    def get(self, handle):
+        """Состояние по хендлу или None если сущность исчезла"""
+        slot = self._slot_by_handle.get(handle)
+        if slot is None:
+            return None
+        return self._snapshot(slot)
+
+    def handles(self):
+        """Хендлы всех живых сущностей"""
+        return list(self._slot_by_handle)
+
+    def lifetime(self, handle, now: float = None):
+        """Сколько секунд сущность наблюдается (None если исчезла)"""
+        slot = self._slot_by_handle.get(handle)
+        if slot is None:
+            return None
+        if now is None:
+            now = time.monotonic()
+        return now - self._first_seen[slot]
+
+    def __len__(self):
+        return len(self._slot_by_handle)
+
+    def clear(self):
+        """Забыть все сущности (без событий, подписчики остаются)"""
+        self._reset()
+
+
+class WorldTracker:
+    """
+    Трекеры лута и игроков поверх WorldManager (или MergedWorldView)
+
+    tick() делает скан и возвращает только изменения - потребителям
+    (проверка лута, радар) не нужно перебирать весь список каждый тик.
+    """
+
+    def __init__(self, world, despawn_after: float = 0.0):
+        """
+        Args:
+            world: WorldManager или MergedWorldView (нужны scan/tick и loot_index/people_index)
+            despawn_after: задержка события despawn (секунды)
+        """
+        self.world = world
+        self.loot = EntityTracker(despawn_after)
+        self.people = EntityTracker(despawn_after)
+
+    def has_subscribers(self) -> bool:
+        """Кто-то подписан на события лута или игроков"""
+        return self.loot.has_subscribers() or self.people.has_subscribers()
+
+    def scan(self):
+        """Скан мира (чтение памяти) - без обновления трекеров"""
+        if hasattr(self.world, 'scan'):
+            self.world.scan()
+        else:
+            self.world.tick()
+
+    def tick(self, now: float = None):
+        """
+        Обновить мир и трекеры
+
+        Returns:
+            (loot_delta, people_delta): TrackerDelta для лута и игроков
+        """
+        self.scan()
+        return self.update(now)
+
+    def update(self, now: float = None):
+        """
+        Обновить трекеры по последнему скану (события подписчикам - отсюда)
+
+        Returns:
+            (loot_delta, people_delta): TrackerDelta для лута и игроков
+        """
+        loot_delta = self.loot.update(self.world.loot_index.records.values(), now)
+        people_delta = self.people.update(self.world.people_index.records.values(), now)
+        return loot_delta, people_delta
@@ -0,0 +1,179 @@
+"""
+Объединенный вид мира по нескольким клиентам
+Каждый клиент видит только свою зону прогрузки - сканируем несколько
+и склеиваем лут и игроков без дублей
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from config.constants import WORLD_VIEW_MAX_CLIENTS_PER_TICK, WORLD_VIEW_LOOT_MERGE_PRECISION
+from game.spatial import SpatialGrid
+from game.structs import WorldManager
+
+
+class MergedWorldView:
+    """
+    WorldManager на каждого клиента + общий индекс без дублей
+
+    - За тик сканируется не больше max_clients_per_tick клиентов (по кругу),
+      для остальных используется их последний скан
+    - Игроки дедуплицируются по id, лут - по округленной позиции
+    - В объединенных индексах поле ptr записи - ключ дедупликации
+    - Если клиент пропал, его вклад убирается, остальные продолжают работать
+    """
+
+    def __init__(self, max_clients_per_tick: int = WORLD_VIEW_MAX_CLIENTS_PER_TICK):
+        self.max_clients_per_tick = max(1, max_clients_per_tick)
+
+        self.managers = {}        # {pid: WorldManager}
+        self._order = []          # порядок обхода pid (round-robin)
+        self._cursor = 0
+
+        # Последний скан каждого клиента
+        self._client_loot = {}    # {pid: [EntityRecord, ...]}
+        self._client_people = {}  # {pid: [EntityRecord, ...]}
+
+        # Объединенные индексы
+        self.loot_index = SpatialGrid()
+        self.people_index = SpatialGrid()
+
+        self._executor = None
+
+    def set_clients(self, memories: dict):
+        """
+        Синхронизировать список клиентов
+
+        Args:
+            memories: {pid: Memory} - текущие подключенные клиенты
+        """
+        for pid in list(self.managers):
+            manager = self.managers[pid]
+            if pid not in memories or manager.memory is not memories[pid]:
+                self._drop(pid)
+
+        for pid, memory in memories.items():
+            if pid in self.managers:
+                continue
+            try:
+                self.managers[pid] = WorldManager(memory)
+                self._order.append(pid)
+            except Exception as e:
+                logging.warning(f"⚠️ WorldManager for PID {pid} failed: {e}")
+
+    def _forget_scan(self, pid):
+        """Убрать вклад клиента в объединенный вид (клиент остается в обходе)"""
+        self._client_loot.pop(pid, None)
+        self._client_people.pop(pid, None)
+
+    def _drop(self, pid):
+        """Убрать клиента (закрыт или сменил Memory)"""
+        self.managers.pop(pid, None)
+        self._forget_scan(pid)
+        if pid in self._order:
+            self._order.remove(pid)
+        logging.info(f"🌍 World view: client PID {pid} removed")
+
+    def primary(self):
+        """
+        Первый живой WorldManager (для кода, которому нужен один клиент)
+
+        Returns:
+            (pid, WorldManager) или (None, None)
+        """
+        for pid in self._order:
+            manager = self.managers.get(pid)
+            if manager and manager.memory.is_valid():
+                return pid, manager
+        return None, None
+
+    def _next_batch(self):
+        """Следующие клиенты для сканирования (round-robin)"""
+        if not self._order:
+            return []
+
+        count = min(self.max_clients_per_tick, len(self._order))
+        start = self._cursor % len(self._order)
+        batch = [self._order[(start + i) % len(self._order)] for i in range(count)]
+        self._cursor = (start + count) % len(self._order)
+        return batch
+
+    @staticmethod
+    def _scan_client(manager):
+        """Скан одного клиента (выполняется в пуле потоков)"""
+        manager.scan()
+        return list(manager.loot_index.records.values()), list(manager.people_index.records.values())
+
+    def tick(self):
+        """
+        Просканировать очередную порцию клиентов и пересобрать объединенный вид
+
+        Returns:
+            int: сколько клиентов просканировано успешно
+        """
+        batch = self._next_batch()
+        if not batch:
+            self.loot_index.clear()
+            self.people_index.clear()
+            return 0
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_clients_per_tick,
+                thread_name_prefix="world_view"
+            )
+
+        futures = {pid: self._executor.submit(self._scan_client, self.managers[pid]) for pid in batch}
+
+        scanned = 0
+        for pid, future in futures.items():
+            try:
+                loot, people = future.result()
+                self._client_loot[pid] = loot
+                self._client_people[pid] = people
+                scanned += 1
+            except Exception as e:
+                # Вклад клиента убираем, остальные не страдают. Живой клиент
+                # остается в обходе и пересканируется на своем следующем тике,
+                # закрытый - убирается (refresh его тоже уберет)
+                logging.warning(f"⚠️ World scan failed for PID {pid}: {e}")
+                if self.managers[pid].memory.is_valid():
+                    self._forget_scan(pid)
+                else:
+                    self._drop(pid)
+
+        self._merge()
+        return scanned
+
+    def _merge(self):
+        """Склеить последние сканы всех клиентов в общий индекс"""
+        precision = WORLD_VIEW_LOOT_MERGE_PRECISION
+
+        people = {}
+        for records in self._client_people.values():
+            for r in records:
+                people.setdefault(r.id, r._replace(ptr=r.id))
+
+        loot = {}
+        for records in self._client_loot.values():
+            for r in records:
+                key = (round(r.x / precision), round(r.y / precision))
+                loot.setdefault(key, r._replace(ptr=key))
+
+        self.people_index.sync(people.values())
+        self.loot_index.sync(loot.values())
+
+    def get_loot_nearby(self, char_position, max_distance):
+        """Лут в радиусе по всем клиентам: [EntityRecord, ...] от ближнего к дальнему"""
+        char_x, char_y, _ = char_position
+        return [record for _, record in self.loot_index.query_radius(char_x, char_y, max_distance)]
+
+    def get_people_nearby(self, char_position, max_distance):
+        """Игроки в радиусе по всем клиентам: [EntityRecord, ...] от ближнего к дальнему"""
+        char_x, char_y, _ = char_position
+        return [record for _, record in self.people_index.query_radius(char_x, char_y, max_distance)]
+
+    def close(self):
+        """Остановить пул потоков"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
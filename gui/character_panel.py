@@ -2,11 +2,11 @@
 Панель персонажей - БЕЗОПАСНАЯ ВЕРСИЯ
 """
 import tkinter as tk
-from PIL import Image, ImageTk
 import logging
 import ctypes
 from ctypes import wintypes
 from gui.styles import *
+from gui.icon_atlas import IconAtlas
 
 class CharacterPanel(tk.Frame):
     """Панель списка персонажей"""
@@ -22,6 +22,9 @@ class CharacterPanel(tk.Frame):
         self.character_rows = {}
         self.class_icons = {}
         
+        # Атлас иконок (готовые 15x15, без PIL на теплом старте)
+        self.icon_atlas = IconAtlas(ICONS_PATH, ICON_SIZE, bundled_dir=ASSETS_PATH)
+        
         self._setup_ui()
     
     def _setup_ui(self):
@@ -130,7 +133,16 @@ class CharacterPanel(tk.Frame):
         if class_id in self.class_icons:
             return self.class_icons[class_id]
         
+        # Быстрый путь: нарезка из атласа
+        icons = self.icon_atlas.get(class_id)
+        if icons is not None:
+            self.class_icons[class_id] = icons
+            return icons
+        
         try:
+            # PIL - только когда иконка действительно нужна (не при старте)
+            from PIL import Image, ImageTk
+            
             icon_path = f"{ICONS_PATH}/{class_id}.png"
             image = Image.open(icon_path)
             image = image.resize((ICON_SIZE, ICON_SIZE), Image.Resampling.LANCZOS)
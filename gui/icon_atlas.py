@@ -0,0 +1,195 @@
+"""
+Атлас иконок классов
+Одна PNG: верхний ряд - цветные иконки, нижний - серые, уже в размере ICON_SIZE
+
+- build_atlas() - сборка через PIL (шаг сборки в build.spec или первый запуск)
+- IconAtlas - загрузка через tk.PhotoImage и нарезка по запросу (PIL не нужен)
+
+Модуль не импортирует ничего из gui, чтобы build.spec мог загрузить его напрямую.
+"""
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+ATLAS_IMAGE = "class_icons_atlas.png"
+ATLAS_INDEX = "class_icons_atlas.json"
+
+# Куда собирается атлас на первом запуске (папка сборки может быть только для чтения)
+ATLAS_CACHE_DIR = Path.home() / "AppData" / "Local" / "xvocmuk" / "cache"
+
+
+def _source_icons(icons_dir: Path):
+    """Исходные иконки: [(class_id, path)] по возрастанию class_id"""
+    icons = []
+    for path in Path(icons_dir).glob("*.png"):
+        if path.stem.isdigit():
+            icons.append((int(path.stem), path))
+    return sorted(icons)
+
+
+def source_fingerprint(icons_dir: Path, size: int) -> str:
+    """
+    Отпечаток исходников (имена + содержимое PNG + размер иконки)
+
+    По содержимому, а не по mtime: при копировании в сборку время файлов
+    меняется, а атлас из сборки должен остаться актуальным.
+    """
+    digest = hashlib.sha256(str(size).encode())
+    for class_id, path in _source_icons(icons_dir):
+        digest.update(f"|{class_id}:".encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def build_atlas(icons_dir: Path, out_dir: Path, size: int) -> Path:
+    """
+    Собрать атлас (нужен PIL)
+
+    Returns:
+        Path: путь к PNG атласа
+    """
+    from PIL import Image
+
+    icons = _source_icons(icons_dir)
+    atlas = Image.new("RGBA", (max(1, len(icons)) * size, 2 * size), (0, 0, 0, 0))
+
+    for column, (class_id, path) in enumerate(icons):
+        image = Image.open(path).convert("RGBA")
+        image = image.resize((size, size), Image.Resampling.LANCZOS)
+        atlas.paste(image, (column * size, 0))
+
+        # Серая версия - как раньше (convert('L'), без прозрачности)
+        atlas.paste(image.convert("L").convert("RGBA"), (column * size, size))
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    image_path = out_dir / ATLAS_IMAGE
+
+    tmp = out_dir / (ATLAS_IMAGE + ".tmp")
+    atlas.save(tmp, format="PNG")
+    os.replace(tmp, image_path)
+
+    index = {
+        "size": size,
+        "classes": [class_id for class_id, _ in icons],
+        "fingerprint": source_fingerprint(icons_dir, size),
+    }
+    with open(out_dir / ATLAS_INDEX, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+
+    logging.info(f"🖼️ Class icon atlas built: {image_path} ({len(icons)} classes)")
+    return image_path
+
+
+def _read_index(directory: Path) -> Optional[dict]:
+    try:
+        with open(Path(directory) / ATLAS_INDEX, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class IconAtlas:
+    """
+    Иконки классов из атласа
+
+    get(class_id) -> (color_photo, gray_photo) или None (нет в атласе / атласа нет).
+    Нарезанные PhotoImage кешируются.
+    """
+
+    def __init__(self, icons_dir: Path, size: int, bundled_dir: Path = None,
+                 cache_dir: Path = ATLAS_CACHE_DIR):
+        """
+        Args:
+            icons_dir: папка исходных PNG (class_icons)
+            size: размер иконки
+            bundled_dir: где искать атлас из сборки (обычно assets)
+            cache_dir: куда собрать атлас на первом запуске
+        """
+        self.icons_dir = Path(icons_dir)
+        self.size = size
+        self.bundled_dir = Path(bundled_dir) if bundled_dir else None
+        self.cache_dir = Path(cache_dir)
+
+        self._atlas = None    # tk.PhotoImage атласа
+        self._columns = None  # {class_id: column}
+        self._icons = {}      # {class_id: (color, gray)}
+        self._failed = False
+
+    def _locate(self):
+        """Найти актуальный атлас (сборка, затем кеш), иначе собрать в кеш"""
+        fingerprint = source_fingerprint(self.icons_dir, self.size)
+
+        for directory in (self.bundled_dir, self.cache_dir):
+            if directory is None:
+                continue
+            index = _read_index(directory)
+            if index and index.get("fingerprint") == fingerprint and (directory / ATLAS_IMAGE).exists():
+                return directory / ATLAS_IMAGE, index
+
+        # Первый запуск: собрать (PIL нужен только здесь)
+        build_atlas(self.icons_dir, self.cache_dir, self.size)
+        return self.cache_dir / ATLAS_IMAGE, _read_index(self.cache_dir)
+
+    def _load(self) -> bool:
+        if self._atlas is not None:
+            return True
+        if self._failed:
+            return False
+
+        try:
+            import tkinter as tk
+
+            path, index = self._locate()
+            self._atlas = tk.PhotoImage(file=str(path))
+            self._columns = {class_id: column for column, class_id in enumerate(index["classes"])}
+            return True
+        except Exception as e:
+            logging.warning(f"⚠️ Class icon atlas unavailable: {e}")
+            self._failed = True
+            return False
+
+    def _slice(self, column: int, row: int):
+        import tkinter as tk
+
+        size = self.size
+        x, y = column * size, row * size
+        photo = tk.PhotoImage(width=size, height=size)
+        photo.tk.call(photo, "copy", self._atlas, "-from", x, y, x + size, y + size, "-to", 0, 0)
+        return photo
+
+    def get(self, class_id: int):
+        """Цветная и серая иконка класса или None"""
+        icons = self._icons.get(class_id)
+        if icons is not None:
+            return icons
+
+        if not self._load():
+            return None
+
+        column = self._columns.get(class_id)
+        if column is None:
+            return None
+
+        icons = (self._slice(column, 0), self._slice(column, 1))
+        self._icons[class_id] = icons
+        return icons
+
+
+def main():
+    """Шаг сборки: python gui/icon_atlas.py [icons_dir] [out_dir] [size]"""
+    import sys
+
+    icons_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("assets/class_icons")
+    out_dir = Path(sys.argv[2]) if len(sys.argv) > 2 else Path("assets")
+    size = int(sys.argv[3]) if len(sys.argv) > 3 else 15
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    build_atlas(icons_dir, out_dir, size)
+
+
+if __name__ == "__main__":
+    main()
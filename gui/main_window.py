@@ -3,11 +3,8 @@
 Добавлена интеграция с ActionLimiter
 """
 import tkinter as tk
-from PIL import Image, ImageTk
 import logging
 import sys
-import pystray
-from pystray import MenuItem as item
 import threading
 import ctypes
 from ctypes import wintypes
@@ -20,6 +17,10 @@ from gui.hotkey_panel import HotkeyPanel
 from core import AppState, ActionManager, HotkeyManager
 from core.keygen import PERMISSION_NONE, PERMISSION_TRY, PERMISSION_PRO, PERMISSION_DEV
 from core.action_limiter import ActionLimiter
+from core.metrics import metrics
+from core.log_pipeline import stop_logging
+from core.startup import startup
+from game.module_registry import module_registry
 from ahk_local.manager import AHKManager
 from actions import (
     register_toggle_actions,
@@ -66,15 +67,22 @@ class MainWindow:
         # ActionLimiter
         self.action_limiter = ActionLimiter()
         
-        # Менеджеры
+        # Менеджеры (хук клавиатуры и движок AHK запускаются в фоне после показа окна)
         self.action_manager = ActionManager(self.app_state)
         self.hotkey_manager = HotkeyManager(
             self.action_manager,
-            on_hotkey_executed=self._on_hotkey_flash
+            on_hotkey_executed=self._on_hotkey_flash,
+            start_hook=False
         )
         
         # AHK менеджер
-        self.ahk_manager = AHKManager()
+        self.ahk_manager = AHKManager(start_engine=False)
+        
+        # Иконка трея (создается в фоне)
+        self.tray_icon = None
+        
+        # API управления (start_instance_listener)
+        self.control_server = None
         
         # Таймеры для toggle экшенов
         self.action_timers = {}
@@ -88,26 +96,20 @@ class MainWindow:
         # Создать UI (теперь HotkeyPanel сразу увидит загруженные хоткеи)
         self._create_ui()
         
-        # Создать tray icon
-        self._create_tray_icon()
-        
         # Применить topmost из настроек
         self.is_topmost = self.settings_manager.is_topmost()
         self.root.attributes('-topmost', self.is_topmost)
         
-        # Запустить polling активного окна
-        self._start_active_window_polling()
-        
         # Передаем зависимости в multibox_manager
         self.manager.set_ahk_manager(self.ahk_manager)
         self.manager.set_app_state(self.app_state)
         self.manager.set_action_limiter(self.action_limiter)
 
-        # Делаем первоначальную загрузку через _silent_refresh
-        self._silent_refresh()
-
-        # Запустить периодическое обновление цветов
-        self.root.after(500, self._update_party_colors)
+        # Остальное - после первого кадра окна (см. _on_first_frame)
+        self._startup_stage = None   # (номер, всего, название) текущей фоновой стадии
+        self._startup_done = threading.Event()
+        self._decoded_icons = {}     # {'title': PIL.Image, 'tray': PIL.Image}
+        self.root.after(0, self._on_first_frame)
 
     def _register_actions(self):
             """Зарегистрировать все действия (ОБНОВЛЕНО)"""
@@ -167,15 +169,10 @@ class MainWindow:
         self.title_bar.pack(fill=tk.X, side=tk.TOP)
         self.title_bar.pack_propagate(False)
         
-        # Иконка + название (слева)
-        try:
-            icon_image = Image.open(TRAY_ICON_PATH)
-            icon_image = icon_image.resize((18, 18), Image.Resampling.LANCZOS)
-            self.app_icon = ImageTk.PhotoImage(icon_image)
-            icon_label = tk.Label(self.title_bar, image=self.app_icon, bg=COLOR_BG)
-            icon_label.pack(side=tk.LEFT, padx=(10, 5))
-        except:
-            pass
+        # Иконка + название (слева); картинка ставится после фонового декодирования
+        self.app_icon = None
+        self.icon_label = tk.Label(self.title_bar, bg=COLOR_BG, width=0)
+        self.icon_label.pack(side=tk.LEFT, padx=(10, 5))
         
         title_label = tk.Label(
             self.title_bar,
@@ -186,6 +183,16 @@ class MainWindow:
         )
         title_label.pack(side=tk.LEFT, padx=0)
         
+        # Индикатор фоновой инициализации (скрывается по завершении)
+        self.startup_label = tk.Label(
+            self.title_bar,
+            text="⏳",
+            font=FONT_MAIN,
+            bg=COLOR_BG,
+            fg=COLOR_ACCENT
+        )
+        self.startup_label.pack(side=tk.LEFT, padx=(8, 0))
+        
         # Кнопки управления окном (ИСПРАВЛЕНО - выравнивание и отступы)
         # ПОРЯДОК: Pin, Minimize, Close (БЕЗ Refresh)
 
@@ -337,15 +344,113 @@ class MainWindow:
         # Обновить цвет кнопки
         self.pin_btn.configure(fg=COLOR_ACCENT if self.is_topmost else COLOR_TEXT)
     
-    def _create_tray_icon(self):
+    # ============================================
+    # ПОЭТАПНЫЙ ЗАПУСК
+    # ============================================
+    
+    def _on_first_frame(self):
+        """Окно показано - запускаем фоновую инициализацию"""
+        self.root.update_idletasks()
+        startup.mark('window.first_frame')
+        
+        threading.Thread(target=self._background_init, name="startup", daemon=True).start()
+        self.root.after(50, self._poll_background_init)
+    
+    def _background_init(self):
+        """
+        Фоновые стадии запуска
+        
+        Иконки (PIL), трей, движок AHK, подключение к клиентам, хук клавиатуры.
+        Хук ставится последним, чтобы хоткеи не срабатывали до подключения.
+        Виджеты Tk здесь не трогаем - только главный поток (_poll_background_init).
+        """
+        stages = [
+            ("icons", self._decode_icons),
+            ("tray", lambda: self._create_tray_icon(self._decoded_icons.get('tray'))),
+            ("ahk_engine", self.ahk_manager.start),
+            ("attach", self.manager.refresh),
+            ("keyboard_hook", self.hotkey_manager.start),
+        ]
+        
+        for index, (name, stage) in enumerate(stages, 1):
+            self._startup_stage = (index, len(stages), name)
+            try:
+                with startup.phase(f"bg.{name}"):
+                    stage()
+            except Exception as e:
+                logging.error(f"❌ Startup stage '{name}' failed: {e}")
+        
+        self._startup_done.set()
+    
+    def _decode_icons(self):
+        """Декодировать иконки окна и трея (PIL импортируется здесь)"""
+        from PIL import Image
+        
+        image = Image.open(TRAY_ICON_PATH)
+        image.load()
+        self._decoded_icons['tray'] = image
+        self._decoded_icons['title'] = image.resize((18, 18), Image.Resampling.LANCZOS)
+    
+    def _poll_background_init(self):
+        """Прогресс фоновой инициализации (главный поток)"""
+        if not self._startup_done.is_set():
+            stage = self._startup_stage
+            if stage:
+                index, total, name = stage
+                self.startup_label.configure(text=f"⏳ {name} {index}/{total}")
+            self.root.after(50, self._poll_background_init)
+            return
+        
+        self._finish_startup()
+    
+    def _finish_startup(self):
+        """Фон закончил: иконка, персонажи, периодические задачи, отчет запуска"""
+        title_image = self._decoded_icons.get('title')
+        if title_image is not None:
+            try:
+                from PIL import ImageTk
+                self.app_icon = ImageTk.PhotoImage(title_image)
+                self.icon_label.configure(image=self.app_icon)
+            except Exception:
+                pass
+        
+        self.startup_label.pack_forget()
+        
+        characters = self.manager.get_all_characters()
+        if characters:
+            self.character_panel.set_characters(characters)
+        self.character_panel.update_display()
+        
+        # Запустить polling активного окна
+        self._start_active_window_polling()
+        
+        # Запустить периодическое обновление цветов
+        self.root.after(500, self._update_party_colors)
+        
+        # Объединенный вид мира (лут и игроки всех клиентов) - в фоновом потоке,
+        # только пока он кому-то нужен (API, подписчики трекеров)
+        self.manager.start_world_ticker(lambda fn: self.root.after(0, fn))
+        
+        startup.mark('ready')
+        startup.write()
+    
+    def _create_tray_icon(self, image=None):
         """Создать иконку в трее"""
         try:
-            image = Image.open(TRAY_ICON_PATH)
+            import pystray
+            from pystray import MenuItem as item
+            
+            if image is None:
+                from PIL import Image
+                image = Image.open(TRAY_ICON_PATH)
             
             menu = pystray.Menu(
                 item('Show', self._show_window, default=True),  # default=True !
                 item('Always on Top', self._toggle_topmost_from_tray, 
                     checked=lambda item: self.settings_manager.is_topmost()),
+                item('Metrics', self._toggle_metrics_from_tray,
+                    checked=lambda item: metrics.enabled),
+                item('Dump Metrics', self._dump_metrics_from_tray),
                 item('Exit', self._exit_from_tray)
             )
             
@@ -368,6 +473,17 @@ class MainWindow:
         """Переключить topmost из трея"""
         self.toggle_topmost()
     
+    def _toggle_metrics_from_tray(self):
+        """Включить/выключить сбор метрик из трея"""
+        metrics.toggle()
+    
+    def _dump_metrics_from_tray(self):
+        """Записать дамп метрик (JSON в AppData + отчет в лог)"""
+        try:
+            metrics.dump()
+        except Exception as e:
+            logging.error(f"Failed to dump metrics: {e}")
+    
     def _exit_from_tray(self):
         """Выход из трея"""
         self.on_close()
@@ -418,6 +534,20 @@ class MainWindow:
         # Мигнуть действием в HotkeyPanel
         self.hotkey_panel.flash_action(action_id)
     
+    def revoke_license(self, reason: str):
+        """Лицензия отозвана (вызывать в потоке Tk): выключить toggle экшены и закрыть доступ"""
+        logging.error(f"🚫 License revoked: {reason}")
+        
+        # Сначала выключить (экшены проверяют уровень доступа), потом закрыть доступ
+        for action_id in list(self.app_state.active_toggle_actions):
+            self.app_state.toggle_action(action_id)
+            self.action_manager.execute(action_id)
+        
+        self.app_state.verified = False
+        self.app_state.permission_level = PERMISSION_NONE
+        self.prev_permission_level = PERMISSION_NONE
+        self.hotkey_panel.update_display()
+    
 
     def on_close(self):
         """Закрытие приложения"""
@@ -436,10 +566,30 @@ class MainWindow:
             y = self.root.winfo_y()
             self.settings_manager.set_window_position(x, y)
             
+            # Дописать настройки (фоновая запись)
+            self.settings_manager.close()
+            
             # Закрыть tray icon
             if self.tray_icon:
                 self.tray_icon.stop()
             
+            # Остановить API управления
+            if self.control_server:
+                self.control_server.stop()
+            
+            # Остановить сканирование мира
+            self.manager.stop_world_ticker()
+            self.manager.world_view.close()
+            
+            # Дописать журналы лимитов
+            self.action_limiter.close()
+            
+            # Дописать профили персонажей
+            self.manager.profiles.close()
+            
+            # Дописать реестр сборок клиента
+            module_registry.close()
+            
             # Закрыть процессы памяти
             for char in self.manager.characters.values():
                 if hasattr(char, 'memory'):
@@ -447,6 +597,9 @@ class MainWindow:
             
             logging.info("=== Завершение приложения ===")
             
+            # Дописать очередь логов
+            stop_logging()
+            
             self.root.quit()
             self.root.destroy()
             
@@ -466,7 +619,8 @@ class MainWindow:
         def loop():
             if self.app_state.is_action_active(action_id):
                 try:
-                    callback()
+                    with metrics.timer(f"loop.{action_id}"):
+                        callback()
                 except Exception as e:
                     logging.error(f"Error in {action_id} loop: {e}")
                 
@@ -531,32 +685,31 @@ class MainWindow:
         self.root.mainloop()
 
     def start_instance_listener(self):
-        """Запустить слушатель для сигналов от других экземпляров"""
-        import socket
-        
-        def listener():
-            try:
-                server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-                server.bind(('127.0.0.1', 47200))
-                server.listen(1)
-                
-                while True:
-                    try:
-                        client, addr = server.accept()
-                        data = client.recv(1024)
-                        
-                        if data == b'SHOW_WINDOW':
-                            # Показать окно в главном потоке
-                            self.root.after(0, self._show_window)
-                        
-                        client.close()
-                    except:
-                        break
-            except:
-                pass
+        """
+        Запустить API управления (127.0.0.1:47200): экшены, снимок мира, метрики
+        Старые сигналы SHOW_WINDOW / METRICS от других экземпляров тоже принимаются
+        """
+        from core.control_api import ControlServer, install_app_methods
+        
+        self.control_server = ControlServer()
+        install_app_methods(
+            self.control_server,
+            self.action_manager,
+            self.app_state,
+            self.manager,
+            show_window=lambda: self.root.after(0, self._show_window),
+            on_action_executed=self._on_api_action_executed,
+            call_soon=lambda fn: self.root.after(0, fn)
+        )
+        self.control_server.start()
+    
+    def _on_api_action_executed(self, action_id: str):
+        """Экшен выполнен через API: мигнуть и обновить состояние toggle иконок"""
+        def update():
+            self.hotkey_panel.flash_action(action_id)
+            self.hotkey_panel.update_display()
         
-        threading.Thread(target=listener, daemon=True).start()
+        self.root.after(0, update)
 
 
     def _start_active_window_polling(self):
@@ -611,6 +764,7 @@ class MainWindow:
         # Повторить через 1 секунду
         self.root.after(1000, self._update_party_colors)
 
+    @metrics.timed('tick.silent_refresh')
     def _silent_refresh(self):
         """Тихий refresh без мигания"""
         # Обновить список окон в AHK
@@ -0,0 +1,57 @@
+"""
+Журнал лимитов: оборванная последняя строка (выход посреди записи)
+"""
+from core.action_limiter import ActionLimiter
+
+
+def _limiter(tmp_path):
+    return ActionLimiter(tmp_path / "app.log", tmp_path / "action_usage.log", verify_in_background=False)
+
+
+def _record(tmp_path, count):
+    limiter = _limiter(tmp_path)
+    for _ in range(count):
+        limiter.record_usage('FROST')
+    limiter.writer.flush()
+    limiter.writer.close()
+    return limiter
+
+
+def _tear(limiter, cut):
+    for path in (limiter.main_log_file, limiter.decoy_log_file):
+        path.write_bytes(path.read_bytes()[:-cut])
+
+
+def _assert_clean_restart(tmp_path, expected):
+    limiter = _limiter(tmp_path)
+    try:
+        assert not limiter.is_blocked, limiter.block_reason
+        assert limiter.counters['FROST'] == expected
+        limiter._verify_full_chain()
+        assert not limiter.is_blocked, limiter.block_reason
+        for path in (limiter.main_log_file, limiter.decoy_log_file):
+            assert path.read_bytes().endswith(b'\n')
+    finally:
+        limiter.writer.close()
+
+
+def _torn_then_append(tmp_path, cut, drop_summary):
+    _tear(_record(tmp_path, 2), cut)
+    if drop_summary:
+        (tmp_path / "app.idx").unlink()
+    _record(tmp_path, 1)
+
+
+def test_torn_record_is_cut_before_append(tmp_path):
+    _torn_then_append(tmp_path, cut=20, drop_summary=False)
+    _assert_clean_restart(tmp_path, expected=2)
+
+
+def test_torn_record_without_summary(tmp_path):
+    _torn_then_append(tmp_path, cut=20, drop_summary=True)
+    _assert_clean_restart(tmp_path, expected=2)
+
+
+def test_missing_newline_keeps_complete_record(tmp_path):
+    _torn_then_append(tmp_path, cut=1, drop_summary=True)
+    _assert_clean_restart(tmp_path, expected=3)
@@ -3,11 +3,17 @@
 Мультибокс бот для Perfect World
 """
 import sys
+import argparse
 import logging
 from pathlib import Path
 
-# Импорты модулей приложения
-from core.app_hub import AppHub
+# Профиль запуска - первым, чтобы замерить остальные импорты
+from core.startup import startup
+
+# Импорты модулей приложения (тяжелые - GUI, AHK, keyboard - импортируются позже)
+with startup.phase('import.app_hub'):
+    from core.app_hub import AppHub
+from core.log_pipeline import setup_logging, stop_logging
 
 # Определяем рабочую директорию
 if getattr(sys, 'frozen', False):
@@ -36,14 +42,13 @@ if IS_FROZEN:
     #     ]
     # )
 else:
-    # РЕЖИМ РАЗРАБОТКИ: консоль + файл
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
+    # РЕЖИМ РАЗРАБОТКИ: консоль + файл (запись в фоновом потоке через очередь)
+    setup_logging(
         handlers=[
             logging.StreamHandler(),
             logging.FileHandler(APPDATA_DIR / 'xvocmuk.log', encoding='utf-8')
-        ]
+        ],
+        level=logging.INFO
     )
 
 
@@ -71,12 +76,14 @@ class XvocmukApp:
             bool: успешность инициализации
         """
         # 1. Инициализация AppHub и проверка лицензии
-        if not self._initialize_apphub():
-            return False
+        with startup.phase('license'):
+            if not self._initialize_apphub():
+                return False
         
         # 2. Загрузка base_address из конфигурации
-        if not self._load_base_address():
-            return False
+        with startup.phase('base_address'):
+            if not self._load_base_address():
+                return False
         
         logging.info("✅ Application initialized successfully")
         return True
@@ -145,49 +152,183 @@ class XvocmukApp:
         logging.info("🚀 Starting application...")
         
         # Импорты GUI компонентов
-        from characters.manager import MultiboxManager
-        from config.settings import SettingsManager
-        from gui import MainWindow
+        with startup.phase('import.characters'):
+            from characters.manager import MultiboxManager
+        with startup.phase('import.settings'):
+            from config.settings import SettingsManager
+        with startup.phase('import.gui'):
+            from gui import MainWindow
         
         # Создание менеджеров
-        settings_manager = SettingsManager()
-        multibox_manager = MultiboxManager()
+        with startup.phase('managers'):
+            settings_manager = SettingsManager()
+            multibox_manager = MultiboxManager()
         
         # Передаем base_address в multibox_manager
         multibox_manager.base_address = self.base_address
         
         # НОВОЕ: Передаем app_hub И license_level в GUI
-        gui_app = MainWindow(
-            multibox_manager, 
-            settings_manager, 
-            self.app_hub,
-            self.license_level  # НОВОЕ
-        )
+        # (окно - сразу, AHK / хук клавиатуры / подключение к клиентам - в фоне)
+        with startup.phase('window'):
+            gui_app = MainWindow(
+                multibox_manager, 
+                settings_manager, 
+                self.app_hub,
+                self.license_level  # НОВОЕ
+            )
         
         # Запустить слушатель для сигналов от других экземпляров
         gui_app.start_instance_listener()
         
+        # HWID из кеша - сверка с железом в фоне (отзыв - в потоке Tk)
+        self.app_hub.verify_hwid_async(
+            lambda reason: gui_app.root.after(0, lambda: gui_app.revoke_license(reason))
+        )
+        
         logging.info("GUI инициализирован")
         
         # Запуск главного цикла tkinter
         gui_app.run()
+    
+    def run_headless(self, duration=None, toggles=(), simulation=None, control_port=None, state_ring=None,
+                     workers=0, worker_backend=('win32',)):
+        """
+        Запуск без окна: менеджеры и циклы экшенов на планировщике
+        
+        Args:
+            duration: сколько секунд работать (None - до Ctrl+C)
+            toggles: toggle экшены, включаемые сразу ('follow', 'attack', ...)
+            simulation: SimulatedBackend вместо настоящих клиентов
+            control_port: порт API управления (None - без API)
+            state_ring: имя shared memory для кадров состояния (None - не публиковать)
+            workers: число рабочих процессов опроса клиентов (0 - без них)
+            worker_backend: описание backend для воркеров (симуляция - та же, что simulation)
+        """
+        logging.info("🚀 Starting headless...")
+        
+        with startup.phase('import.characters'):
+            from characters.manager import MultiboxManager
+            from characters.profiles import ProfileStore
+        with startup.phase('import.settings'):
+            from config.settings import SettingsManager
+        with startup.phase('import.headless'):
+            from core.headless import HeadlessApp
+            from core.action_limiter import ActionLimiter
+        
+        with startup.phase('managers'):
+            settings_manager = SettingsManager()
+            if simulation is None:
+                multibox_manager = MultiboxManager()
+                action_limiter = None
+            else:
+                # Профили и журналы симуляции - отдельно от настоящих
+                sim_dir = APPDATA_DIR / "simulated"
+                sim_dir.mkdir(parents=True, exist_ok=True)
+                multibox_manager = MultiboxManager(simulation, ProfileStore(sim_dir / "profiles.json"))
+                action_limiter = ActionLimiter(sim_dir / "app.log", sim_dir / "action_usage.log")
+        
+        multibox_manager.base_address = self.base_address
+        
+        with startup.phase('headless'):
+            app = HeadlessApp(
+                multibox_manager,
+                settings_manager,
+                self.license_level,
+                simulation=simulation,
+                action_limiter=action_limiter,
+                control_port=control_port,
+                state_ring=state_ring,
+                workers=workers,
+                worker_backend=worker_backend
+            )
+            app.start()
+        
+        for action_id in toggles:
+            app.scheduler.after(0, lambda action_id=action_id: app.toggle(action_id))
+        
+        # HWID из кеша - сверка с железом в фоне (в симуляции лицензии нет)
+        if self.app_hub is not None:
+            self.app_hub.verify_hwid_async(
+                lambda reason: app.scheduler.after(0, lambda: app.revoke_license(reason))
+            )
+        
+        startup.write()
+        app.run(duration)
+
+
+def parse_args(argv=None):
+    """Аргументы командной строки"""
+    parser = argparse.ArgumentParser(prog="xvocmuk")
+    parser.add_argument("--headless", action="store_true",
+                        help="без окна: менеджеры и циклы экшенов на планировщике")
+    parser.add_argument("--simulate", type=int, default=0, metavar="N",
+                        help="N симулированных клиентов вместо ElementClient.exe (подразумевает --headless)")
+    parser.add_argument("--party-size", type=int, default=5, metavar="N",
+                        help="размер групп симуляции")
+    parser.add_argument("--duration", type=float, default=None, metavar="SEC",
+                        help="остановиться через SEC секунд (headless)")
+    parser.add_argument("--toggle", action="append", default=[], metavar="ACTION",
+                        help="включить toggle экшен сразу (follow, attack, ...)")
+    parser.add_argument("--control-port", type=int, default=47200, metavar="PORT",
+                        help="порт API управления в headless режиме (0 - выключен)")
+    parser.add_argument("--state-ring", default=None, metavar="NAME",
+                        help="публиковать состояние клиентов и мира в shared memory NAME (headless)")
+    parser.add_argument("--workers", type=int, default=0, metavar="N",
+                        help="опрос клиентов и заморозка Follow в N рабочих процессах (headless)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="включить сбор метрик (отчет при выходе)")
+    return parser.parse_args(argv)
 
 
 def main():
     """Точка входа приложения"""
+    args = parse_args()
+    
     try:
         app = XvocmukApp()
         
+        if args.metrics:
+            from core.metrics import metrics
+            metrics.enable()
+        
+        if args.simulate:
+            # Симуляция: без лицензии и конфига (в игру ничего не пишется)
+            from game.simulated import SimulatedBackend
+            app.license_level = "dev"
+            app.run_headless(
+                args.duration,
+                args.toggle,
+                SimulatedBackend.fleet(args.simulate, args.party_size),
+                args.control_port or None,
+                args.state_ring,
+                args.workers,
+                ('simulated', args.simulate, args.party_size)
+            )
+            stop_logging()
+            return
+        
         if not app.initialize():
             logging.error("❌ Failed to initialize application")
+            stop_logging()
             sys.exit(1)
         
-        app.run()
+        if args.headless:
+            app.run_headless(args.duration, args.toggle, control_port=args.control_port or None,
+                             state_ring=args.state_ring, workers=args.workers)
+        else:
+            app.run()
         
     except Exception as e:
         logging.error(f"❌ Fatal error: {e}", exc_info=True)
+        stop_logging()
         sys.exit(1)
+    
+    # Дописать очередь логов перед выходом
+    stop_logging()
 
 
 if __name__ == "__main__":
+    # Воркеры (characters.workers) стартуют через spawn - нужно для exe
+    import multiprocessing
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file